@@ -3,19 +3,36 @@ FastAPI Application for Content Recommendation Service
 ML 기반 콘텐츠 추천 API 서버
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional, Tuple
 import uvicorn
 from loguru import logger
+import asyncio
+import numpy as np
+import orjson
 import sys
+import uuid
 from datetime import datetime
 
 from config import Config
 from database import db
-from recommendation_engine import recommendation_engine
-import redis
+from metrics import (
+    HTTP_REQUEST_SECONDS,
+    MODEL_SIZE_BYTES,
+    MODEL_SNAPSHOT_AGE_SECONDS,
+    SCORING_SECONDS,
+    SERIALIZATION_SECONDS,
+    render as render_metrics
+)
+from profiler import profiler
+from cache import cache
+from compute_pool import ComputePoolSaturated, compute_pool
+from single_flight import SingleFlight
+from timing import request_timer, stage
+from utils import decode_cursor, encode_cursor, split_ranked
 
 # 로깅 설정
 logger.remove()
@@ -47,31 +64,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Redis 클라이언트 (캐싱용)
-redis_client = None
-if Config.CACHE_ENABLED:
-    try:
-        redis_client = redis.Redis(
-            host=Config.REDIS_HOST,
-            port=Config.REDIS_PORT,
-            db=Config.REDIS_DB,
-            password=Config.REDIS_PASSWORD,
-            decode_responses=True
-        )
-        redis_client.ping()
-        logger.info("Redis connection established")
-    except Exception as e:
-        logger.warning(f"Redis connection failed: {e}. Caching disabled.")
-        redis_client = None
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """라우트별 요청 처리 시간 기록 + 단계별 시간(Server-Timing 헤더, 느린 요청 로그)"""
+    with request_timer() as timer:
+        response = await call_next(request)
+    elapsed = timer.elapsed
+    route = request.scope.get('route')
+    route_path = route.path if route else 'unmatched'
+    HTTP_REQUEST_SECONDS.labels(request.method, route_path, response.status_code).observe(elapsed)
+    if Config.SERVER_TIMING_ENABLED:
+        response.headers['Server-Timing'] = timer.server_timing()
+    if 0 <= Config.REQUEST_TIMING_LOG_MS <= elapsed * 1000:
+        logger.info(f"request_timing method={request.method} route={route_path} "
+                    f"status={response.status_code} {timer.log_fields()}")
+    return response
+
+
+# 추천 타입 (그 밖의 값은 422, 캐시 키에 검증된 값만 사용)
+RecommendationType = Literal['hybrid', 'collaborative', 'content', 'als']
 
 
 # Pydantic 모델
 class RecommendationRequest(BaseModel):
     user_id: int = Field(..., gt=0, description="사용자 ID")
     limit: int = Field(10, ge=1, le=50, description="추천 개수")
-    recommendation_type: str = Field(
+    recommendation_type: RecommendationType = Field(
         "hybrid",
-        description="추천 타입: hybrid, collaborative, content"
+        description="추천 타입: hybrid, collaborative, content, als"
     )
 
 
@@ -80,6 +101,24 @@ class SimilarPostsRequest(BaseModel):
     limit: int = Field(10, ge=1, le=50, description="유사 게시물 개수")
 
 
+class InteractionEvent(BaseModel):
+    user_id: int = Field(..., gt=0, description="사용자 ID")
+    post_id: int = Field(..., gt=0, description="게시물 ID")
+    interaction_type: str = Field(..., description="상호작용 유형: view, like, comment")
+    created_at: Optional[datetime] = Field(None, description="발생 시각 (기본: 수신 시각)")
+
+
+class FeedRequest(BaseModel):
+    user_id: int = Field(..., gt=0, description="사용자 ID")
+    limit: int = Field(20, ge=1, le=50, description="페이지 크기")
+    cursor: Optional[str] = Field(None, description="이전 응답의 next_cursor (없으면 첫 페이지)")
+    recommendation_type: RecommendationType = Field(
+        "hybrid",
+        description="추천 타입: hybrid, collaborative, content, als"
+    )
+    exclude_seen: bool = Field(False, description="피드 생성 이후 상호작용한 게시물 제외")
+
+
 class RecommendationResponse(BaseModel):
     post_id: int
     title: str
@@ -90,6 +129,21 @@ class RecommendationResponse(BaseModel):
     created_at: str
 
 
+class FeedResponse(BaseModel):
+    items: List[RecommendationResponse]
+    next_cursor: Optional[str]
+
+
+class JSONBytesResponse(Response):
+    """
+    미리 인코딩된 JSON 본문 응답
+    
+    엔드포인트가 Response를 반환하면 FastAPI는 response_model 검증/재직렬화를 건너뛰고,
+    OpenAPI 스키마는 데코레이터의 response_model로 그대로 생성된다.
+    """
+    media_type = "application/json"
+
+
 class HealthResponse(BaseModel):
     status: str
     timestamp: str
@@ -105,53 +159,214 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None)):
     return x_api_key
 
 
-# 데이터 로드 상태
+# 데이터 로드 상태 (recommendation_engine은 첫 스냅샷 로드 때 임포트)
+recommendation_engine = None
 data_loaded = False
 last_load_time = None
+load_error: Optional[str] = None
+initial_load_task: Optional[asyncio.Task] = None
+MODEL_SNAPSHOT_AGE_SECONDS.set_function(
+    lambda: (datetime.now() - last_load_time).total_seconds() if last_load_time else 0.0
+)
 
+# 캐시 미스 동시 요청 병합
+single_flight = SingleFlight(cache)
 
-async def ensure_data_loaded():
-    """데이터 로드 확인"""
-    global data_loaded, last_load_time
+
+def load_snapshot():
+    """
+    DB에서 데이터를 읽어 모델 스냅샷 빌드 (동기 함수, compute_pool.run_exclusive로 실행)
     
-    # 데이터베이스가 연결되지 않은 경우 건너뛰기
+    pandas/sklearn을 쓰는 recommendation_engine 모듈은 여기서 처음 임포트한다.
+    """
+    global recommendation_engine, data_loaded, last_load_time
+    
+    # 시작 시 연결에 실패했으면 다시 시도
+    if not db.pool:
+        db.connect()
     if not db.pool:
-        logger.warning("Database not connected. Skipping data load.")
-        return
+        raise RuntimeError("Database not connected")
     
-    # 데이터가 로드되지 않았거나 리프레시 주기가 지난 경우
-    if not data_loaded or (
-        last_load_time and 
-        (datetime.now() - last_load_time).seconds > Config.DATA_REFRESH_INTERVAL
-    ):
+    from recommendation_engine import recommendation_engine as engine
+    
+    with stage('load'):
+        logger.info("Loading data from database...")
+        
+        # 데이터 조회
+        posts = db.get_posts(limit=Config.MAX_POSTS_LOAD)
+        users = db.get_users(limit=Config.MAX_USERS_LOAD)
+        interactions = db.get_user_interactions(days=Config.INTERACTION_DAYS)
+        
+        # 추천 엔진에 데이터 로드
+        engine.load_data(posts, users, interactions)
+        if Config.ALS_ENABLED:
+            engine.fit_factorization(
+                factors=Config.ALS_FACTORS,
+                regularization=Config.ALS_REGULARIZATION,
+                alpha=Config.ALS_ALPHA,
+                iterations=Config.ALS_ITERATIONS,
+                cg_steps=Config.ALS_CG_STEPS,
+                num_threads=Config.ALS_NUM_THREADS,
+                quantize=Config.VECTOR_QUANTIZATION,
+                rerank=Config.VECTOR_RERANK
+            )
+        engine.embed_posts(Config.EMBEDDING_DIM)
+        engine.build_ann_index(
+            nlist=Config.ANN_NLIST,
+            nprobe=Config.ANN_NPROBE,
+            exact_threshold=Config.ANN_EXACT_THRESHOLD,
+            path=Config.ANN_INDEX_PATH or None,
+            quantize=Config.VECTOR_QUANTIZATION,
+            rerank=Config.VECTOR_RERANK
+        )
+        recommendation_engine = engine
+        cache.bump_generation()
+        update_model_size_metrics()
+        
+        data_loaded = True
+        last_load_time = datetime.now()
+        
+        logger.info(f"Data loaded successfully: {len(posts)} posts, "
+                   f"{len(users)} users, {len(interactions)} interactions")
+
+
+async def load_initial_snapshot():
+    """시작 시 백그라운드 로드: DB/Redis 연결 후 첫 스냅샷이 준비될 때까지 재시도"""
+    global load_error
+    
+    await asyncio.to_thread(db.connect)
+    await asyncio.to_thread(cache.connect)
+    while not data_loaded:
         try:
-            logger.info("Loading data from database...")
-            
-            # 데이터 조회
-            posts = db.get_posts(limit=Config.MAX_POSTS_LOAD)
-            users = db.get_users(limit=Config.MAX_USERS_LOAD)
-            interactions = db.get_user_interactions(days=Config.INTERACTION_DAYS)
-            
-            # 추천 엔진에 데이터 로드
-            recommendation_engine.load_data(posts, users, interactions)
-            
-            data_loaded = True
-            last_load_time = datetime.now()
-            
-            logger.info(f"Data loaded successfully: {len(posts)} posts, "
-                       f"{len(users)} users, {len(interactions)} interactions")
-            
+            await compute_pool.run_exclusive(load_snapshot)
+            load_error = None
+        except Exception as e:
+            load_error = str(e)
+            logger.error(f"Error loading data: {e}. Retrying in {Config.STARTUP_RETRY_INTERVAL}s")
+            await asyncio.sleep(Config.STARTUP_RETRY_INTERVAL)
+
+
+def snapshot_is_stale() -> bool:
+    """리프레시 주기 경과 여부"""
+    return (datetime.now() - last_load_time).total_seconds() > Config.DATA_REFRESH_INTERVAL
+
+
+def refresh_stale_snapshot():
+    """주기가 지났으면 다시 로드 (먼저 끝난 동시 요청이 이미 로드했으면 건너뜀)"""
+    if snapshot_is_stale():
+        load_snapshot()
+
+
+async def ensure_data_loaded():
+    """스냅샷 확인 (첫 로드 전이면 503, 리프레시 주기가 지났으면 다시 로드)"""
+    if not data_loaded:
+        raise HTTPException(status_code=503, detail="Model snapshot is not loaded yet")
+    
+    if snapshot_is_stale():
+        try:
+            await compute_pool.run_exclusive(refresh_stale_snapshot)
         except Exception as e:
             logger.error(f"Error loading data: {e}")
             raise HTTPException(status_code=500, detail="Failed to load data")
 
 
+def update_model_size_metrics():
+    """모델 구성 요소별 메모리 크기 게이지 갱신"""
+    for component, size in recommendation_engine.memory_usage().items():
+        MODEL_SIZE_BYTES.labels(component).set(size)
+
+
+def get_blocked_user_ids(user_id: int) -> np.ndarray:
+    """차단한 사용자 ID (사용자 epoch 키로 순위 목록과 함께 캐시, 차단 변경 시 /cache/clear/user로 무효화)"""
+    cache_key = cache.user_key(user_id, 'blocked')
+    cached = cache.get_raw(cache_key)
+    if cached is not None:
+        return np.frombuffer(cached, dtype=np.int64)
+    
+    blocked = np.asarray(db.get_blocked_user_ids(user_id), dtype=np.int64)
+    cache.set_raw(cache_key, blocked.tobytes(), Config.CACHE_TTL)
+    return blocked
+
+
+def ranked_by_type(user_id: int, recommendation_type: str, top_n: int) -> List[dict]:
+    """collaborative/als/content 타입의 추천 리스트 (제외 필터 전)"""
+    if recommendation_type == "collaborative":
+        return recommendation_engine.get_collaborative_recommendations(user_id, top_n)
+    
+    if recommendation_type == "als":
+        return recommendation_engine.get_als_recommendations(user_id, top_n)
+    
+    # content: 사용자의 최근 게시물 기반 (메모리 내 사용자별 이력 인덱스)
+    recent_post_id = recommendation_engine.recent_post_id(user_id)
+    if recent_post_id is not None:
+        return recommendation_engine.get_content_based_recommendations(recent_post_id, top_n)
+    return recommendation_engine._get_popular_posts(top_n)
+
+
+def generate_post_recommendations(
+    user_id: int,
+    recommendation_type: str,
+    top_n: int,
+    min_budget: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """추천 타입별 게시물 순위 (post_id 배열, 점수 배열), min_budget은 하이브리드 소스 예산 하한"""
+    blocked_user_ids = get_blocked_user_ids(user_id)
+    if recommendation_type in ("collaborative", "als", "content"):
+        # 본 게시물/삭제된 게시물/차단한 사용자의 게시물을 하이브리드와 같게 제외
+        # (제외될 수 있는 개수만큼 더 받아 걸러도 top_n개가 남도록)
+        excluded_ids = recommendation_engine.excluded_post_ids(user_id, blocked_user_ids)
+        fetch_n = top_n + len(excluded_ids)
+        return split_ranked(
+            ranked_by_type(user_id, recommendation_type, fetch_n),
+            excluded_ids,
+            top_n
+        )
+    
+    # hybrid (default): 다중 소스 후보 파이프라인 (제외 마스크를 후보 생성 전에 적용)
+    return recommendation_engine.rank_hybrid(
+        user_id,
+        top_n,
+        blocked_user_ids,
+        min_budget=min_budget
+    )
+
+
 # 엔드포인트
 @app.on_event("startup")
 async def startup_event():
-    """서버 시작 시 데이터 로드"""
+    """서버 시작: 설정 검증 후 연결과 첫 데이터 로드는 백그라운드에서 진행 (liveness는 즉시 응답)"""
+    global initial_load_task
     logger.info("Starting ML Recommendation Service...")
-    await ensure_data_loaded()
+    Config.validate()
+    initial_load_task = asyncio.create_task(load_initial_snapshot())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """진행 중인 첫 로드 취소, 계산 풀 정리"""
+    if initial_load_task is not None and not initial_load_task.done():
+        initial_load_task.cancel()
+    compute_pool.shutdown()
+    if recommendation_engine is not None:
+        recommendation_engine.pipeline.shutdown()
+
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness: 프로세스가 요청을 받을 수 있으면 항상 200"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness: 모델 스냅샷이 로드된 뒤에만 200 (그 전에는 503)"""
+    body = {
+        "status": "ready" if data_loaded else "loading",
+        "timestamp": datetime.now().isoformat(),
+        "last_load_time": last_load_time.isoformat() if last_load_time else None,
+        "error": load_error
+    }
+    return JSONResponse(status_code=200 if data_loaded else 503, content=body)
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -161,10 +376,47 @@ async def health_check():
         status="healthy",
         timestamp=datetime.now().isoformat(),
         data_loaded=data_loaded,
-        cache_enabled=Config.CACHE_ENABLED and redis_client is not None
+        cache_enabled=cache.enabled
     )
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 지표 (단계별 지연 히스토그램, 캐시 적중 카운터, 모델 크기/스냅샷 나이)"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@app.post("/admin/profile")
+async def profile(
+    seconds: float = 10,
+    interval_ms: float = 10,
+    api_key: str = Depends(verify_api_key)
+):
+    """샘플링 프로파일러를 N초 동안 실행하고 folded stack(flamegraph 호환) 반환"""
+    if not 0 < seconds <= Config.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"seconds must be between 0 and {Config.PROFILER_MAX_SECONDS}"
+        )
+    if not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be between 1 and 1000")
+    if not profiler.start(interval_ms / 1000):
+        raise HTTPException(status_code=409, detail="Profiler already running")
+    
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        folded = profiler.stop()
+    
+    summary = profiler.summary()
+    logger.info(f"Profiled {summary['seconds']}s: {summary['samples']} samples, {summary['stacks']} stacks")
+    return PlainTextResponse(folded, headers={
+        'X-Profile-Samples': str(summary['samples']),
+        'X-Profile-Seconds': str(summary['seconds'])
+    })
+
+
 @app.post("/recommend/posts", response_model=List[RecommendationResponse])
 async def recommend_posts(
     request: RecommendationRequest,
@@ -174,54 +426,108 @@ async def recommend_posts(
     try:
         await ensure_data_loaded()
         
-        # 캐시 확인
-        cache_key = f"recommend:posts:{request.user_id}:{request.limit}:{request.recommendation_type}"
-        if redis_client:
-            cached = redis_client.get(cache_key)
-            if cached:
-                logger.info(f"Cache hit for user {request.user_id}")
-                import json
-                return json.loads(cached)
+        # 캐시 확인 (사용자/타입별 최대 길이 목록 하나를 잘라서 사용)
+        cache_key = cache.user_key(request.user_id, 'posts', request.recommendation_type)
+        cached = cache.get_ranked(cache_key)
+        if cached is not None:
+            logger.info(f"Cache hit for user {request.user_id}")
+            with SERIALIZATION_SECONDS.labels('posts').time(), stage('hydrate'):
+                return JSONBytesResponse(recommendation_engine.hydrate_json(*cached, limit=request.limit))
         
-        # 추천 생성
-        if request.recommendation_type == "collaborative":
-            recommendations = recommendation_engine.get_collaborative_recommendations(
-                request.user_id,
-                request.limit
-            )
-        elif request.recommendation_type == "content":
-            # 사용자의 최근 게시물 기반
-            user_interactions = db.get_user_recent_interactions(request.user_id)
-            if user_interactions:
-                recent_post_id = user_interactions[0]['post_id']
-                recommendations = recommendation_engine.get_content_based_recommendations(
-                    recent_post_id,
-                    request.limit
+        # 추천 생성 (같은 키의 동시 요청은 한 번만 계산)
+        async def compute():
+            with SCORING_SECONDS.labels(request.recommendation_type).time(), stage('scoring'):
+                post_ids, scores = await compute_pool.run(
+                    generate_post_recommendations,
+                    request.user_id,
+                    request.recommendation_type,
+                    Config.MAX_RECOMMENDATIONS
                 )
-            else:
-                recommendations = recommendation_engine._get_popular_posts(request.limit)
-        else:  # hybrid (default)
-            recommendations = recommendation_engine.get_hybrid_recommendations(
-                request.user_id,
-                request.limit,
-                Config.COLLABORATIVE_WEIGHT,
-                Config.CONTENT_WEIGHT
+            if len(post_ids):
+                cache.set_ranked(cache_key, post_ids, scores, Config.CACHE_TTL)
+            return post_ids, scores
+        
+        ranked = await single_flight.do(
+            cache_key,
+            compute,
+            lookup=lambda: cache.get_ranked(cache_key)
+        )
+        with SERIALIZATION_SECONDS.labels('posts').time(), stage('hydrate'):
+            body = recommendation_engine.hydrate_json(*ranked, limit=request.limit)
+        
+        logger.info(f"Generated {len(ranked[0])} ranked recommendations for user {request.user_id}")
+        return JSONBytesResponse(body)
+        
+    except HTTPException:
+        raise
+    except ComputePoolSaturated as e:
+        # 바쁜 계산 워커 뒤에 줄 세우지 않고 바로 거절
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in recommend_posts: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/recommend/feed", response_model=FeedResponse)
+async def recommend_feed(
+    request: FeedRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    무한 스크롤 피드
+    
+    첫 페이지(cursor 없음)에서 FEED_DEPTH개 순위를 한 번 계산해 피드 ID 키로 저장하고,
+    이후 페이지는 커서의 위치부터 잘라서 구성한다. 키는 캐시 세대로 네임스페이스가 지정되어
+    모델이 갱신되거나 FEED_TTL이 지나면 410을 반환하고, 클라이언트는 첫 페이지부터 다시 요청한다.
+    """
+    try:
+        await ensure_data_loaded()
+        
+        if request.cursor:
+            try:
+                feed_id, offset, created = decode_cursor(request.cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            ranked = cache.get_ranked(cache.key('feed', request.user_id, feed_id))
+            if ranked is None:
+                raise HTTPException(status_code=410, detail="Feed expired, request the first page again")
+            shared = True
+        else:
+            feed_id, offset, created = uuid.uuid4().hex, 0, datetime.now()
+            with SCORING_SECONDS.labels('feed').time(), stage('scoring'):
+                ranked = await compute_pool.run(
+                    generate_post_recommendations,
+                    request.user_id,
+                    request.recommendation_type,
+                    Config.FEED_DEPTH,
+                    Config.FEED_DEPTH
+                )
+            shared = len(ranked[0]) > 0 and cache.set_ranked(
+                cache.key('feed', request.user_id, feed_id), *ranked, Config.FEED_TTL
             )
         
-        # 캐시 저장
-        if redis_client and recommendations:
-            import json
-            redis_client.setex(
-                cache_key,
-                Config.CACHE_TTL,
-                json.dumps(recommendations)
+        with SERIALIZATION_SECONDS.labels('feed').time(), stage('hydrate'):
+            # 피드 생성 이후 본 게시물 (사용자별 이력 인덱스의 최신 구간)
+            seen = (
+                recommendation_engine.seen_since(request.user_id, created)
+                if request.exclude_seen and request.cursor else ()
             )
+            items, offset = recommendation_engine.page_json(*ranked, offset, request.limit, seen)
+            # 다음 페이지는 다른 워커가 받을 수 있으므로 Redis(L2)에 저장된 목록만 이어 줄 수 있음
+            next_cursor = (
+                encode_cursor(feed_id, offset, created)
+                if offset < len(ranked[0]) and shared else None
+            )
+            body = b'{"items":' + items + b',"next_cursor":' + orjson.dumps(next_cursor) + b'}'
         
-        logger.info(f"Generated {len(recommendations)} recommendations for user {request.user_id}")
-        return recommendations
+        return JSONBytesResponse(body)
         
+    except HTTPException:
+        raise
+    except ComputePoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in recommend_posts: {e}")
+        logger.error(f"Error in recommend_feed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -235,33 +541,36 @@ async def recommend_similar_posts(
     try:
         await ensure_data_loaded()
         
-        # 캐시 확인
-        cache_key = f"recommend:similar:{post_id}:{limit}"
-        if redis_client:
-            cached = redis_client.get(cache_key)
-            if cached:
-                logger.info(f"Cache hit for similar posts to {post_id}")
-                import json
-                return json.loads(cached)
+        # 캐시 확인 (게시물별 최대 길이 목록 하나를 잘라서 사용)
+        cache_key = cache.key('similar', post_id)
+        cached = cache.get_ranked(cache_key)
+        if cached is not None:
+            logger.info(f"Cache hit for similar posts to {post_id}")
+            with SERIALIZATION_SECONDS.labels('similar').time(), stage('hydrate'):
+                return JSONBytesResponse(recommendation_engine.hydrate_json(*cached, limit=limit))
         
         # 유사 게시물 추천
-        recommendations = recommendation_engine.get_content_based_recommendations(
-            post_id,
-            limit
-        )
+        with SCORING_SECONDS.labels('similar').time(), stage('scoring'):
+            post_ids, scores = split_ranked(await compute_pool.run(
+                recommendation_engine.get_content_based_recommendations,
+                post_id,
+                Config.MAX_RECOMMENDATIONS
+            ))
         
         # 캐시 저장
-        if redis_client and recommendations:
-            import json
-            redis_client.setex(
-                cache_key,
-                Config.CACHE_TTL,
-                json.dumps(recommendations)
-            )
+        if len(post_ids):
+            cache.set_ranked(cache_key, post_ids, scores, Config.CACHE_TTL)
         
-        logger.info(f"Generated {len(recommendations)} similar posts for post {post_id}")
-        return recommendations
+        with SERIALIZATION_SECONDS.labels('similar').time(), stage('hydrate'):
+            body = recommendation_engine.hydrate_json(post_ids, scores, limit=limit)
+        logger.info(f"Generated {len(post_ids)} similar posts for post {post_id}")
+        return JSONBytesResponse(body)
         
+    except HTTPException:
+        raise
+    except ComputePoolSaturated as e:
+        # 바쁜 계산 워커 뒤에 줄 세우지 않고 바로 거절
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error in recommend_similar_posts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -275,43 +584,38 @@ async def recommend_trending_posts(
 ):
     """트렌딩 게시물 추천"""
     try:
-        # 캐시 확인
-        cache_key = f"recommend:trending:{limit}:{days}"
-        if redis_client:
-            cached = redis_client.get(cache_key)
-            if cached:
-                logger.info("Cache hit for trending posts")
-                import json
-                return json.loads(cached)
+        # 캐시 확인 (인코딩된 응답 본문 그대로 반환)
+        cache_key = cache.key('trending', limit, days)
+        cached = cache.get_raw(cache_key)
+        if cached is not None:
+            logger.info("Cache hit for trending posts")
+            return JSONBytesResponse(cached)
         
         # 트렌딩 게시물 조회
         trending = db.get_trending_posts(days=days, limit=limit)
         
         # 응답 형식 변환
-        recommendations = [
-            {
-                'post_id': post['post_id'],
-                'title': post['title'],
-                'score': float(post['trending_score']),
-                'category_id': post['category_id'],
-                'likes_count': post['likes_count'],
-                'views_count': post['views_count'],
-                'created_at': post['created_at'].isoformat()
-            }
-            for post in trending
-        ]
+        with SERIALIZATION_SECONDS.labels('trending').time(), stage('hydrate'):
+            recommendations = [
+                {
+                    'post_id': post['post_id'],
+                    'title': post['title'],
+                    'score': float(post['trending_score']),
+                    'category_id': post['category_id'],
+                    'likes_count': post['likes_count'],
+                    'views_count': post['views_count'],
+                    'created_at': post['created_at'].isoformat()
+                }
+                for post in trending
+            ]
+            body = orjson.dumps(recommendations)
         
         # 캐시 저장 (10분)
-        if redis_client and recommendations:
-            import json
-            redis_client.setex(
-                cache_key,
-                600,  # 10분
-                json.dumps(recommendations)
-            )
+        if recommendations:
+            cache.set_raw(cache_key, body, 600)  # 10분
         
         logger.info(f"Generated {len(recommendations)} trending posts")
-        return recommendations
+        return JSONBytesResponse(body)
         
     except Exception as e:
         logger.error(f"Error in recommend_trending_posts: {e}")
@@ -320,12 +624,12 @@ async def recommend_trending_posts(
 
 @app.post("/cache/clear")
 async def clear_cache(api_key: str = Depends(verify_api_key)):
-    """캐시 클리어"""
-    if redis_client:
+    """캐시 클리어 (세대 번호 증가, 이전 항목은 TTL로 만료)"""
+    if cache.enabled:
         try:
-            redis_client.flushdb()
-            logger.info("Cache cleared")
-            return {"message": "Cache cleared successfully"}
+            generation = cache.clear()
+            logger.info(f"Cache cleared (generation {generation})")
+            return {"message": "Cache cleared successfully", "generation": generation}
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -333,13 +637,101 @@ async def clear_cache(api_key: str = Depends(verify_api_key)):
         return {"message": "Cache not enabled"}
 
 
+@app.post("/cache/clear/user/{user_id}")
+async def clear_user_cache(user_id: int, api_key: str = Depends(verify_api_key)):
+    """특정 사용자 캐시 클리어 (사용자 epoch 증가)"""
+    if cache.enabled:
+        epoch = cache.invalidate_user(user_id)
+        logger.info(f"Cache cleared for user {user_id} (epoch {epoch})")
+        return {"message": "User cache cleared successfully", "epoch": epoch}
+    else:
+        return {"message": "Cache not enabled"}
+
+
+@app.get("/cache/stats")
+async def cache_stats(api_key: str = Depends(verify_api_key)):
+    """캐시 계층별 적중/실패 통계"""
+    return {
+        **cache.get_stats(),
+        'single_flight': single_flight.stats,
+        'compute_pool': compute_pool.get_stats(),
+        'pipeline': recommendation_engine.pipeline.get_stats() if recommendation_engine is not None else None
+    }
+
+
+@app.post("/index/posts/{post_id}")
+async def index_post(post_id: int, api_key: str = Depends(verify_api_key)):
+    """새 게시물을 전체 리프레시 없이 유사 게시물 인덱스에 추가"""
+    try:
+        await ensure_data_loaded()
+        
+        post = db.get_post_by_id(post_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+        
+        added = await compute_pool.run_exclusive(recommendation_engine.add_posts, [post])
+        update_model_size_metrics()
+        return {"post_id": post_id, "added": bool(added)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error indexing post {post_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/index/interactions")
+async def index_interactions(events: List[InteractionEvent], api_key: str = Depends(verify_api_key)):
+    """새 상호작용을 전체 리프레시 없이 협업 필터링 매트릭스에 추가 (해당 사용자 캐시 무효화)"""
+    try:
+        await ensure_data_loaded()
+        
+        now = datetime.now()
+        rows = [
+            {
+                'user_id': event.user_id,
+                'post_id': event.post_id,
+                'interaction_type': event.interaction_type,
+                # DB 시각과 같은 로컬 naive datetime으로 저장
+                'created_at': (
+                    event.created_at.astimezone().replace(tzinfo=None)
+                    if event.created_at and event.created_at.tzinfo else event.created_at or now
+                )
+            }
+            for event in events
+        ]
+        added = await compute_pool.run_exclusive(recommendation_engine.add_interactions, rows)
+        if cache.enabled:
+            for user_id in {event.user_id for event in events}:
+                cache.invalidate_user(user_id)
+        update_model_size_metrics()
+        return {"added": added}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error indexing interactions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.delete("/index/posts/{post_id}")
+async def remove_post(post_id: int, api_key: str = Depends(verify_api_key)):
+    """삭제된 게시물을 다음 리프레시 전까지 추천/응답에서 제외"""
+    try:
+        await ensure_data_loaded()
+        
+        removed = await compute_pool.run_exclusive(recommendation_engine.remove_posts, [post_id])
+        return {"post_id": post_id, "removed": bool(removed)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error removing post {post_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/data/refresh")
 async def refresh_data(api_key: str = Depends(verify_api_key)):
     """데이터 리프레시"""
     try:
-        global data_loaded, last_load_time
-        data_loaded = False
-        await ensure_data_loaded()
+        await compute_pool.run_exclusive(load_snapshot)
         return {
             "message": "Data refreshed successfully",
             "timestamp": last_load_time.isoformat()
@@ -0,0 +1,269 @@
+"""
+Synthetic-data benchmark for RecommendationEngine
+합성 데이터로 추천 엔진의 빌드 시간, 요청 지연 백분위, 최대 RSS, 모델 크기 측정
+
+MySQL 없이 synthetic_data로 만든 데이터를 엔진에 직접 넣으며,
+규모마다 별도 프로세스에서 실행해 최대 RSS가 섞이지 않게 한다.
+
+사용법:
+    python benchmark.py --scales 1000,10000,100000 --output bench.json
+    python benchmark.py --compare bench-before.json bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config import Config
+
+OPERATIONS = ('collaborative', 'hybrid', 'content', 'als')
+
+
+def peak_rss_mb() -> Optional[float]:
+    """현재 프로세스의 최대 RSS (MB)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """지연 시간 백분위 (ms)"""
+    values = np.array(samples) * 1000
+    return {
+        'count': len(values),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p90_ms': round(float(np.percentile(values, 90)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+        'max_ms': round(float(values.max()), 3)
+    }
+
+
+def measure(
+    fn: Callable[[int], Any],
+    args: List[int],
+    time_budget: float
+) -> Dict[str, float]:
+    """요청별 지연 측정 (시간 예산을 넘으면 중단)"""
+    samples = []
+    started = time.perf_counter()
+    for arg in args:
+        t0 = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - t0)
+        if time.perf_counter() - started > time_budget:
+            break
+    return latency_stats(samples)
+
+
+def run_scale(scale: int, requests: int, time_budget: float, max_dense_gb: float, seed: int) -> Dict[str, Any]:
+    """한 규모의 데이터 생성 → 모델 빌드 → 요청 지연 측정 (별도 프로세스에서 실행)"""
+    from recommendation_engine import RecommendationEngine
+    from synthetic_data import generate_dataset
+
+    result: Dict[str, Any] = {'scale': scale}
+
+    started = time.perf_counter()
+    posts, users, interactions = generate_dataset(scale, seed=seed)
+    result['generate_seconds'] = round(time.perf_counter() - started, 3)
+    result['num_posts'] = len(posts)
+    result['num_users'] = len(users)
+    result['num_interactions'] = len(interactions)
+
+    # app.ensure_data_loaded와 같은 순서로 빌드
+    engine = RecommendationEngine(dtype=Config.MODEL_DTYPE)
+    build: Dict[str, float] = {}
+    steps = [
+        ('load_data', lambda: engine.load_data(posts, users, interactions)),
+        ('fit_factorization', lambda: engine.fit_factorization(
+            factors=Config.ALS_FACTORS,
+            regularization=Config.ALS_REGULARIZATION,
+            alpha=Config.ALS_ALPHA,
+            iterations=Config.ALS_ITERATIONS,
+            cg_steps=Config.ALS_CG_STEPS,
+            num_threads=Config.ALS_NUM_THREADS,
+            quantize=Config.VECTOR_QUANTIZATION,
+            rerank=Config.VECTOR_RERANK
+        ) if Config.ALS_ENABLED else None),
+        ('embed_posts', lambda: engine.embed_posts(Config.EMBEDDING_DIM)),
+        ('build_ann_index', lambda: engine.build_ann_index(
+            nlist=Config.ANN_NLIST,
+            nprobe=Config.ANN_NPROBE,
+            exact_threshold=Config.ANN_EXACT_THRESHOLD,
+            quantize=Config.VECTOR_QUANTIZATION,
+            rerank=Config.VECTOR_RERANK
+        ))
+    ]
+    for name, step in steps:
+        t0 = time.perf_counter()
+        step()
+        build[name] = round(time.perf_counter() - t0, 3)
+    build['total'] = round(sum(build.values()), 3)
+    result['build_seconds'] = build
+    del posts, users, interactions
+
+    rng = np.random.default_rng(seed)
+    active_users = engine.interactions_df['user_id'].unique()
+    user_ids = [int(u) for u in rng.choice(active_users, requests)]
+    post_ids = [int(p) for p in rng.choice(engine.posts_df['post_id'].to_numpy(), requests)]
+
+    # 협업 필터링은 요청마다 밀집 사용자 x 게시물 매트릭스를 만듦 (하이브리드는 로드 시 만든 희소 행렬 사용)
+    dense_bytes = (
+        len(active_users) * engine.interactions_df['post_id'].nunique() * engine.dtype.itemsize
+    )
+    dense_skip = (
+        f"dense user-item matrix would need {dense_bytes / 1024 ** 3:.1f} GB per request"
+        if dense_bytes > max_dense_gb * 1024 ** 3 else None
+    )
+
+    operations = {
+        'collaborative': (lambda u: engine.get_collaborative_recommendations(u, 10), user_ids, dense_skip),
+        'hybrid': (lambda u: engine.get_hybrid_recommendations(
+            u, 10, Config.COLLABORATIVE_WEIGHT, Config.CONTENT_WEIGHT
+        ), user_ids, None),
+        'content': (lambda p: engine.get_content_based_recommendations(p, 10), post_ids, None),
+        'als': (lambda u: engine.get_als_recommendations(u, 10), user_ids,
+                None if engine.als_model is not None else "ALS disabled")
+    }
+    result['latency'] = {}
+    for name in OPERATIONS:
+        fn, args, skip = operations[name]
+        if skip:
+            result['latency'][name] = {'skipped': skip}
+            continue
+        fn(args[0])  # 워밍업
+        result['latency'][name] = measure(fn, args, time_budget)
+
+    result['model_bytes'] = engine.memory_usage()
+    result['model_bytes']['total'] = sum(result['model_bytes'].values())
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def git_commit() -> Optional[str]:
+    """현재 git 커밋 (없으면 None)"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def run(scales: List[int], requests: int, time_budget: float, max_dense_gb: float, seed: int) -> Dict[str, Any]:
+    """규모별 벤치마크 실행 (규모마다 새 프로세스)"""
+    report: Dict[str, Any] = {
+        'service': 'ml-service',
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'settings': {
+            'requests': requests,
+            'time_budget_seconds': time_budget,
+            'seed': seed,
+            'MODEL_DTYPE': Config.MODEL_DTYPE,
+            'ALS_ENABLED': Config.ALS_ENABLED,
+            'ALS_FACTORS': Config.ALS_FACTORS,
+            'EMBEDDING_DIM': Config.EMBEDDING_DIM,
+            'VECTOR_QUANTIZATION': Config.VECTOR_QUANTIZATION,
+            'ANN_NPROBE': Config.ANN_NPROBE,
+            'ANN_EXACT_THRESHOLD': Config.ANN_EXACT_THRESHOLD
+        },
+        'results': []
+    }
+    context = multiprocessing.get_context('spawn')
+    for scale in scales:
+        print(f"Benchmarking scale {scale}...", file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                result = executor.submit(run_scale, scale, requests, time_budget, max_dense_gb, seed).result()
+            except Exception as e:
+                result = {'scale': scale, 'error': repr(e)}
+        report['results'].append(result)
+    return report
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]) -> List[str]:
+    """두 결과 파일의 주요 지표 비율 (after / before)"""
+    lines = [f"{before.get('commit')} -> {after.get('commit')}"]
+    previous = {result['scale']: result for result in before['results']}
+    for result in after['results']:
+        old = previous.get(result['scale'])
+        if old is None or 'error' in old or 'error' in result:
+            continue
+
+        def ratio(new_value, old_value):
+            return f"{new_value / old_value:.2f}x" if old_value else "n/a"
+
+        lines.append(f"scale {result['scale']}:")
+        lines.append(f"  build      {old['build_seconds']['total']:.3f}s -> "
+                     f"{result['build_seconds']['total']:.3f}s "
+                     f"({ratio(result['build_seconds']['total'], old['build_seconds']['total'])})")
+        lines.append(f"  model size {old['model_bytes']['total']} -> {result['model_bytes']['total']} "
+                     f"({ratio(result['model_bytes']['total'], old['model_bytes']['total'])})")
+        if old.get('peak_rss_mb') and result.get('peak_rss_mb'):
+            lines.append(f"  peak RSS   {old['peak_rss_mb']}MB -> {result['peak_rss_mb']}MB "
+                         f"({ratio(result['peak_rss_mb'], old['peak_rss_mb'])})")
+        for name in OPERATIONS:
+            new_op, old_op = result['latency'].get(name, {}), old['latency'].get(name, {})
+            if 'p50_ms' in new_op and 'p50_ms' in old_op:
+                lines.append(f"  {name:13s} p50 {old_op['p50_ms']}ms -> {new_op['p50_ms']}ms "
+                             f"({ratio(new_op['p50_ms'], old_op['p50_ms'])}), "
+                             f"p99 {old_op['p99_ms']}ms -> {new_op['p99_ms']}ms "
+                             f"({ratio(new_op['p99_ms'], old_op['p99_ms'])})")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="합성 데이터 추천 엔진 벤치마크")
+    parser.add_argument('--scales', default='1000,10000,100000',
+                        help="게시물(=사용자) 수, 쉼표 구분")
+    parser.add_argument('--requests', type=int, default=200, help="연산별 요청 수")
+    parser.add_argument('--time-budget', type=float, default=30.0,
+                        help="연산별 최대 측정 시간 (초)")
+    parser.add_argument('--max-dense-gb', type=float, default=2.0,
+                        help="요청당 밀집 매트릭스가 이보다 크면 해당 연산 생략")
+    parser.add_argument('--seed', type=int, default=42, help="데이터 생성 시드")
+    parser.add_argument('--output', help="결과 JSON 파일 (기본: 표준 출력)")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help="두 결과 JSON 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        print('\n'.join(compare(before, after)))
+        return 0
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    report = run(scales, args.requests, args.time_budget, args.max_dense_gb, args.seed)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+"""
+Two-tier cache for recommendation results
+프로세스 내 LRU 캐시(L1) + Redis 공유 캐시(L2)
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+import numpy as np
+import redis
+
+from config import Config
+from metrics import CACHE_LOOKUPS
+from timing import stage, timed_stage
+
+logger = logging.getLogger(__name__)
+
+
+RANKED_FORMAT_VERSION = b'\x01'
+RANKED_ID_DTYPE = np.dtype('<i8')
+RANKED_SCORE_DTYPE = np.dtype('<f4')
+
+
+def pack_ranked(post_ids: np.ndarray, scores: np.ndarray) -> bytes:
+    """순위 목록 직렬화: 버전(1B) + int64 id 배열 + float32 score 배열"""
+    return (
+        RANKED_FORMAT_VERSION +
+        np.ascontiguousarray(post_ids, dtype=RANKED_ID_DTYPE).tobytes() +
+        np.ascontiguousarray(scores, dtype=RANKED_SCORE_DTYPE).tobytes()
+    )
+
+
+def unpack_ranked(packed: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """pack_ranked의 역변환"""
+    if packed[:1] != RANKED_FORMAT_VERSION:
+        raise ValueError("Unknown ranked list format")
+
+    item_size = RANKED_ID_DTYPE.itemsize + RANKED_SCORE_DTYPE.itemsize
+    count = (len(packed) - 1) // item_size
+    ids_end = 1 + count * RANKED_ID_DTYPE.itemsize
+    post_ids = np.frombuffer(packed, dtype=RANKED_ID_DTYPE, count=count, offset=1)
+    scores = np.frombuffer(packed, dtype=RANKED_SCORE_DTYPE, count=count, offset=ids_end)
+    return post_ids, scores
+
+
+class LocalCache:
+    """크기 제한, TTL, LRU 축출을 지원하는 프로세스 내 캐시"""
+
+    def __init__(self, max_size: int = 10000, ttl: int = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """값 조회 (만료되었거나 없으면 None)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """값 저장 (L1 TTL을 넘지 않도록 제한)"""
+        ttl = min(ttl or self.ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        """키 삭제"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """전체 삭제"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RecommendationCache:
+    """
+    L1(프로세스 내) → L2(Redis) 순으로 조회하는 추천 결과 캐시
+
+    모든 키는 세대(generation) 번호로, 사용자 단위 키는 사용자 epoch로
+    네임스페이스가 지정되므로 무효화는 카운터 1회 증가로 끝나고
+    이전 항목은 TTL로 자연 만료된다.
+    """
+
+    GENERATION_KEY = 'recommend:generation'
+    USER_EPOCH_KEY = 'recommend:epoch:{user_id}'
+    RELEASE_LOCK_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self):
+        self.local: Optional[LocalCache] = None
+        self.client: Optional[redis.Redis] = None
+        self.model_version: Optional[int] = None
+        self.generation: int = 0
+        self._generation_synced_at: float = 0.0
+        self.stats: Dict[str, int] = {
+            'l1_hits': 0,
+            'l1_misses': 0,
+            'l2_hits': 0,
+            'l2_misses': 0
+        }
+
+        if not Config.CACHE_ENABLED:
+            return
+
+        if Config.L1_CACHE_SIZE > 0:
+            self.local = LocalCache(Config.L1_CACHE_SIZE, Config.L1_CACHE_TTL)
+
+    def connect(self) -> bool:
+        """Redis(L2) 연결 (임포트 시가 아니라 서버 시작 시 호출, 실패하면 L1만 사용)"""
+        if not Config.CACHE_ENABLED or self.client is not None:
+            return self.client is not None
+
+        try:
+            self.client = redis.Redis(
+                host=Config.REDIS_HOST,
+                port=Config.REDIS_PORT,
+                db=Config.REDIS_DB,
+                password=Config.REDIS_PASSWORD,
+                decode_responses=False  # 순위 목록은 바이너리로 저장
+            )
+            self.client.ping()
+            logger.info("Redis connection established")
+        except Exception as e:
+            logger.warning(f"Redis connection failed: {e}. Using local cache only.")
+            self.client = None
+
+        self._sync_generation(force=True)
+        return self.client is not None
+
+    @property
+    def enabled(self) -> bool:
+        """캐시 사용 가능 여부"""
+        return self.local is not None or self.client is not None
+
+    @timed_stage('cache')
+    def get(self, key: str) -> Optional[Any]:
+        """캐시 조회 (L1 적중 시 네트워크 왕복 없음)"""
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                self._record('l1', key, True)
+                return value
+            self._record('l1', key, False)
+
+        if self.client is None:
+            return None
+
+        try:
+            cached = self.client.get(key)
+        except Exception as e:
+            logger.error(f"Error getting cache key {key}: {e}")
+            return None
+
+        if cached is None:
+            self._record('l2', key, False)
+            return None
+
+        self._record('l2', key, True)
+        value = json.loads(cached)
+        if self.local is not None:
+            self.local.set(key, value)
+        return value
+
+    @timed_stage('cache')
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """캐시 저장 (L1 + L2)"""
+        ttl = ttl or Config.CACHE_TTL
+        if self.local is not None:
+            self.local.set(key, value, ttl)
+
+        if self.client is None:
+            return
+
+        try:
+            self.client.setex(key, ttl, json.dumps(value))
+        except Exception as e:
+            logger.error(f"Error setting cache key {key}: {e}")
+
+    @timed_stage('cache')
+    def get_ranked(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """순위 목록 조회 (post_id 배열, score 배열)"""
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                self._record('l1', key, True)
+                return value
+            self._record('l1', key, False)
+
+        if self.client is None:
+            return None
+
+        try:
+            packed = self.client.get(key)
+        except Exception as e:
+            logger.error(f"Error getting cache key {key}: {e}")
+            return None
+
+        if packed is None:
+            self._record('l2', key, False)
+            return None
+
+        self._record('l2', key, True)
+        value = unpack_ranked(packed)
+        if self.local is not None:
+            self.local.set(key, value)
+        return value
+
+    @timed_stage('cache')
+    def set_ranked(
+        self,
+        key: str,
+        post_ids: np.ndarray,
+        scores: np.ndarray,
+        ttl: Optional[int] = None
+    ) -> bool:
+        """순위 목록을 압축 바이너리(id/score 배열)로 저장 (L2 저장 성공 시 True, 모든 워커가 읽을 수 있음)"""
+        ttl = ttl or Config.CACHE_TTL
+        packed = pack_ranked(post_ids, scores)
+        if self.local is not None:
+            self.local.set(key, unpack_ranked(packed), ttl)
+
+        if self.client is None:
+            return False
+
+        try:
+            self.client.setex(key, ttl, packed)
+            return True
+        except Exception as e:
+            logger.error(f"Error setting cache key {key}: {e}")
+            return False
+
+    @timed_stage('cache')
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """인코딩된 응답 본문 조회 (디코딩 없이 그대로 반환)"""
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                self._record('l1', key, True)
+                return value
+            self._record('l1', key, False)
+
+        if self.client is None:
+            return None
+
+        try:
+            value = self.client.get(key)
+        except Exception as e:
+            logger.error(f"Error getting cache key {key}: {e}")
+            return None
+
+        self._record('l2', key, value is not None)
+        if value is not None and self.local is not None:
+            self.local.set(key, value)
+        return value
+
+    @timed_stage('cache')
+    def set_raw(self, key: str, value: bytes, ttl: Optional[int] = None):
+        """인코딩된 응답 본문 저장 (L1 + L2)"""
+        ttl = ttl or Config.CACHE_TTL
+        if self.local is not None:
+            self.local.set(key, value, ttl)
+
+        if self.client is None:
+            return
+
+        try:
+            self.client.setex(key, ttl, value)
+        except Exception as e:
+            logger.error(f"Error setting cache key {key}: {e}")
+
+    def _record(self, tier: str, key: str, hit: bool):
+        """계층별 적중/실패 집계 (get_stats + Prometheus)"""
+        self.stats[f"{tier}_{'hits' if hit else 'misses'}"] += 1
+        CACHE_LOOKUPS.labels(tier, self.key_family(key), 'hit' if hit else 'miss').inc()
+
+    @staticmethod
+    def key_family(key: str) -> str:
+        """키 종류 (세대/사용자/epoch 네임스페이스 다음의 첫 부분, 예: posts, similar, trending)"""
+        for part in key.split(':')[2:]:
+            if part and not (part[0] in 'ue' and part[1:].isdigit()):
+                return part
+        return 'other'
+
+    def key(self, *parts: Any) -> str:
+        """현재 세대 네임스페이스가 적용된 캐시 키 생성"""
+        self._sync_generation()
+        return ':'.join([f"recommend:g{self.generation}", *map(str, parts)])
+
+    def user_key(self, user_id: int, *parts: Any) -> str:
+        """세대 + 사용자 epoch 네임스페이스가 적용된 캐시 키 생성"""
+        epoch = self._get_user_epoch(user_id)
+        return self.key(f"u{user_id}", f"e{epoch}", *parts)
+
+    def acquire_lock(self, name: str, ttl: int) -> Optional[str]:
+        """프로세스 간 락 획득 (토큰 반환, 다른 곳에서 보유 중이면 None, Redis 없으면 항상 획득)"""
+        if self.client is None:
+            return ''
+
+        token = uuid.uuid4().hex
+        try:
+            if self.client.set(name, token, nx=True, ex=ttl):
+                return token
+            return None
+        except Exception as e:
+            logger.error(f"Error acquiring lock {name}: {e}")
+            return ''
+
+    def release_lock(self, name: str, token: str):
+        """토큰이 일치할 때만 락 해제"""
+        if not token or self.client is None:
+            return
+
+        try:
+            self.client.eval(self.RELEASE_LOCK_SCRIPT, 1, name, token)
+        except Exception as e:
+            logger.error(f"Error releasing lock {name}: {e}")
+
+    def is_locked(self, name: str) -> bool:
+        """락 보유 여부"""
+        if self.client is None:
+            return False
+
+        try:
+            return bool(self.client.exists(name))
+        except Exception as e:
+            logger.error(f"Error checking lock {name}: {e}")
+            return False
+
+    def bump_generation(self) -> int:
+        """세대 번호 증가 (전체 무효화, O(1))"""
+        generation = self.generation + 1
+        if self.client is not None:
+            try:
+                generation = int(self.client.incr(self.GENERATION_KEY))
+            except Exception as e:
+                logger.error(f"Error bumping cache generation: {e}")
+
+        self.generation = generation
+        self._generation_synced_at = time.monotonic()
+        self.set_model_version(generation)
+        return generation
+
+    def invalidate_user(self, user_id: int) -> int:
+        """사용자 epoch 증가 (사용자 단위 무효화, O(1))"""
+        epoch_key = self.USER_EPOCH_KEY.format(user_id=user_id)
+        epoch = self._get_user_epoch(user_id) + 1
+
+        if self.client is not None:
+            try:
+                pipe = self.client.pipeline()
+                pipe.incr(epoch_key)
+                # 이전 epoch 항목이 모두 만료된 뒤에만 카운터가 사라지도록 TTL 2배
+                pipe.expire(epoch_key, Config.CACHE_TTL * 2)
+                epoch = int(pipe.execute()[0])
+            except Exception as e:
+                logger.error(f"Error bumping epoch for user {user_id}: {e}")
+
+        if self.local is not None:
+            self.local.set(epoch_key, epoch)
+        return epoch
+
+    @timed_stage('cache')
+    def _get_user_epoch(self, user_id: int) -> int:
+        """사용자 epoch 조회 (L1에 짧게 캐시)"""
+        epoch_key = self.USER_EPOCH_KEY.format(user_id=user_id)
+        if self.local is not None:
+            epoch = self.local.get(epoch_key)
+            if epoch is not None:
+                return epoch
+
+        epoch = 0
+        if self.client is not None:
+            try:
+                epoch = int(self.client.get(epoch_key) or 0)
+            except Exception as e:
+                logger.error(f"Error getting epoch for user {user_id}: {e}")
+
+        if self.local is not None:
+            self.local.set(epoch_key, epoch)
+        return epoch
+
+    def _sync_generation(self, force: bool = False):
+        """다른 워커가 올린 세대 번호를 주기적으로 반영"""
+        if self.client is None:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._generation_synced_at < Config.CACHE_GENERATION_SYNC_INTERVAL:
+            return
+
+        self._generation_synced_at = now
+        try:
+            with stage('cache'):
+                generation = int(self.client.get(self.GENERATION_KEY) or 0)
+        except Exception as e:
+            logger.error(f"Error syncing cache generation: {e}")
+            return
+
+        if generation > self.generation:
+            self.generation = generation
+            self.set_model_version(generation)
+
+    def set_model_version(self, version: int):
+        """모델 버전 변경 시 L1 캐시 무효화"""
+        if version != self.model_version and self.local is not None:
+            self.local.clear()
+        self.model_version = version
+
+    def clear(self) -> int:
+        """캐시 전체 무효화 (FLUSHDB 대신 세대 증가)"""
+        return self.bump_generation()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """계층별 적중/실패 통계"""
+        return {
+            **self.stats,
+            'l1_size': len(self.local) if self.local is not None else 0,
+            'l1_enabled': self.local is not None,
+            'l2_enabled': self.client is not None,
+            'model_version': self.model_version,
+            'generation': self.generation
+        }
+
+
+# 싱글톤 인스턴스
+cache = RecommendationCache()
@@ -0,0 +1,200 @@
+"""
+Multi-source candidate generation and ranking
+후보 소스 → 통합 랭커 → 제외 마스크 단계로 구성한 하이브리드 추천 파이프라인
+
+후보 소스(협업 이웃, 콘텐츠 이웃, 트렌딩, 카테고리 인기, 동시 조회)는 각자 예산(최대 후보 수)만큼
+(게시물 위치 배열, 점수 배열)을 돌려주고 소스끼리 병렬로 실행된다. 랭커는 후보 합집합에서
+소스별 점수를 최댓값으로 정규화한 가중합을 bincount 한 번으로 구하고, 제외 대상(본 게시물,
+삭제된 게시물, 차단한 사용자의 게시물)은 게시물 위치별 불리언 마스크로 한 번에 걸러낸다.
+단계별 시간은 Server-Timing과 ml_pipeline_stage_seconds 히스토그램, get_stats()로 보고한다.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from metrics import CANDIDATE_COUNT, PIPELINE_STAGE_SECONDS
+from timing import stage
+
+logger = logging.getLogger(__name__)
+
+Candidates = Tuple[np.ndarray, np.ndarray]
+
+
+def no_candidates() -> Candidates:
+    """빈 후보 (위치, 점수)"""
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 인덱스 (내림차순)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+class PipelineRequest:
+    """요청별 입력: 사용자, 상호작용한 게시물 위치(최신순), 게시물 위치별 제외 마스크"""
+
+    def __init__(self, user_id: int, history: np.ndarray, excluded: np.ndarray):
+        self.user_id = user_id
+        self.history = history
+        self.excluded = excluded
+
+    def keep(self, positions: np.ndarray) -> np.ndarray:
+        """제외 대상이 아닌 후보 마스크"""
+        return ~self.excluded[positions]
+
+
+CandidateSource = Callable[[PipelineRequest, int], Candidates]
+
+
+class CandidatePipeline:
+    """등록된 후보 소스를 예산만큼 실행하고 합집합을 가중합으로 랭킹"""
+
+    def __init__(self, workers: int = 0):
+        self.sources: Dict[str, Tuple[CandidateSource, int, float]] = {}
+        self.workers = workers
+        # 소스 병렬 실행용 (NumPy/SciPy 연산은 GIL을 놓음), 1 이하이면 호출 스레드에서 순차 실행
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix='candidates')
+            if workers > 1 else None
+        )
+        self._lock = threading.Lock()
+        self._seconds: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._candidates: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self.runs = 0
+
+    def register(self, name: str, source: CandidateSource, budget: int, weight: float):
+        """후보 소스 추가 (예산이나 가중치가 0이면 실행하지 않음)"""
+        if budget > 0 and weight > 0:
+            self.sources[name] = (source, budget, weight)
+
+    def run(
+        self,
+        request: PipelineRequest,
+        limit: int,
+        weights: Optional[Dict[str, float]] = None,
+        min_budget: int = 0
+    ) -> Candidates:
+        """소스 실행 → 통합 랭킹 → 상위 limit개 (게시물 위치, 점수), weights는 소스별 가중치 덮어쓰기, min_budget은 소스 예산 하한 (깊은 피드용)"""
+        with self.timed('candidates'):
+            candidates = self._generate(request, min_budget)
+        with self.timed('rank'):
+            ranked = self._rank(request, candidates, limit, weights or {})
+        with self._lock:
+            self.runs += 1
+        return ranked
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        """단계 시간 기록 (요청 Server-Timing, 히스토그램, 누적 통계)"""
+        started = time.perf_counter()
+        try:
+            with stage(name):
+                yield
+        finally:
+            elapsed = time.perf_counter() - started
+            PIPELINE_STAGE_SECONDS.labels(name).observe(elapsed)
+            with self._lock:
+                self._seconds[name] = self._seconds.get(name, 0.0) + elapsed
+                self._counts[name] = self._counts.get(name, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """소스 설정, 단계별 평균 시간(ms), 소스별 평균 후보 수/오류 수"""
+        with self._lock:
+            return {
+                'runs': self.runs,
+                'workers': self.workers,
+                'sources': {
+                    name: {'budget': budget, 'weight': weight}
+                    for name, (_, budget, weight) in self.sources.items()
+                },
+                'stage_avg_ms': {
+                    name: round(seconds * 1000 / self._counts[name], 3)
+                    for name, seconds in self._seconds.items()
+                },
+                'candidates_avg': {
+                    name: round(total / max(1, self._counts.get(f'candidates_{name}', 0)), 1)
+                    for name, total in self._candidates.items()
+                },
+                'errors': dict(self._errors)
+            }
+
+    def shutdown(self):
+        """소스 워커 스레드 정리"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _generate(self, request: PipelineRequest, min_budget: int = 0) -> Dict[str, Candidates]:
+        """모든 소스 실행 (워커가 있으면 병렬)"""
+        if self._executor is None or len(self.sources) < 2:
+            return {
+                name: self._call(name, source, max(budget, min_budget), request)
+                for name, (source, budget, _) in self.sources.items()
+            }
+
+        # 요청 컨텍스트(단계별 타이머)를 소스 스레드마다 복사해 전달
+        futures = {
+            name: self._executor.submit(
+                contextvars.copy_context().run, self._call, name, source, max(budget, min_budget), request
+            )
+            for name, (source, budget, _) in self.sources.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+    def _call(self, name: str, source: CandidateSource, budget: int, request: PipelineRequest) -> Candidates:
+        """소스 하나 실행 (실패한 소스는 후보 없이 건너뜀)"""
+        try:
+            with self.timed(f'candidates_{name}'):
+                positions, scores = source(request, budget)
+        except Exception as e:
+            logger.error(f"Candidate source {name} failed: {e}")
+            with self._lock:
+                self._errors[name] = self._errors.get(name, 0) + 1
+            return no_candidates()
+
+        positions, scores = positions[:budget], scores[:budget]
+        CANDIDATE_COUNT.labels(name).observe(len(positions))
+        with self._lock:
+            self._candidates[name] = self._candidates.get(name, 0) + len(positions)
+        return positions, scores
+
+    def _rank(
+        self,
+        request: PipelineRequest,
+        candidates: Dict[str, Candidates],
+        limit: int,
+        weights: Dict[str, float]
+    ) -> Candidates:
+        """합집합에서 정규화 점수 가중합 + 제외 마스크 + 상위 limit개"""
+        positions, scores = [], []
+        for name, (source_positions, source_scores) in candidates.items():
+            if len(source_positions) == 0:
+                continue
+            peak = float(np.max(source_scores))
+            if peak <= 0:
+                continue
+            weight = weights.get(name, self.sources[name][2])
+            positions.append(source_positions)
+            scores.append(source_scores.astype(np.float64) * (weight / peak))
+        if not positions:
+            return no_candidates()
+
+        union, inverse = np.unique(np.concatenate(positions), return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=np.concatenate(scores), minlength=len(union))
+        keep = request.keep(union) & (totals > 0)
+        union, totals = union[keep], totals[keep]
+
+        top = top_k(totals, limit)
+        return union[top], totals[top].astype(np.float32)
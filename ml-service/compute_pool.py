@@ -0,0 +1,142 @@
+"""
+Worker pool for CPU-bound model work
+점수 계산과 모델 로드를 이벤트 루프 밖의 스레드 풀에서 실행 (대기열 한도 + 메트릭)
+
+NumPy/SciPy의 무거운 연산은 GIL을 놓으므로 점수 계산(shared)은 스레드에서 병렬로 돈다.
+모델 로드/색인 추가(exclusive)는 실행 중인 점수 계산이 끝나길 기다리고 새 계산을 막아
+요청이 반쯤 바뀐 모델을 보지 않게 한다. COMPUTE_POOL_WORKERS=0이면 점수 계산은 이벤트 루프에서
+바로 실행하고, 모델 로드만 기본 스레드 풀에서 실행한다.
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from config import Config
+from metrics import COMPUTE_QUEUE_DEPTH, COMPUTE_REJECTED, COMPUTE_WAIT_SECONDS
+
+
+class ComputePoolSaturated(Exception):
+    """대기열 한도(COMPUTE_QUEUE_LIMIT) 초과"""
+
+
+class ComputePool:
+    """공유(점수 계산)/단독(모델 교체) 호출을 구분하는 스레드 풀"""
+
+    def __init__(self, name: str = 'compute'):
+        self.name = name
+        self.workers = Config.COMPUTE_POOL_WORKERS
+        self.queue_limit = Config.COMPUTE_QUEUE_LIMIT
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+            if self.workers > 0 else None
+        )
+        self._queued = 0
+        self._shared = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+        self._waiters: List[asyncio.Future] = []
+        self.stats: Dict[str, int] = {
+            'completed': 0,
+            'rejected': 0,
+            'exclusive': 0
+        }
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """점수 계산 실행 (다른 공유 호출과 동시 실행, 한도 초과 시 ComputePoolSaturated)"""
+        return await self._submit(fn, args, exclusive=False)
+
+    async def run_exclusive(self, fn: Callable[..., Any], *args) -> Any:
+        """모델 교체 실행 (실행 중인 점수 계산이 끝난 뒤 단독 실행)"""
+        return await self._submit(fn, args, exclusive=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """풀 통계"""
+        return {
+            **self.stats,
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'depth': self._queued
+        }
+
+    def shutdown(self):
+        """워커 스레드 정리"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    async def _submit(self, fn: Callable[..., Any], args: tuple, exclusive: bool) -> Any:
+        mode = 'exclusive' if exclusive else 'shared'
+        if not exclusive and 0 < self.queue_limit <= self._queued:
+            self.stats['rejected'] += 1
+            COMPUTE_REJECTED.labels(self.name).inc()
+            raise ComputePoolSaturated(
+                f"{self.name} pool has {self._queued} calls queued (limit {self.queue_limit})"
+            )
+
+        submitted = time.perf_counter()
+        self._queued += 1
+        COMPUTE_QUEUE_DEPTH.labels(self.name).set(self._queued)
+        try:
+            await self._acquire(exclusive)
+        except BaseException:
+            self._finish()
+            raise
+
+        def call():
+            COMPUTE_WAIT_SECONDS.labels(self.name, mode).observe(time.perf_counter() - submitted)
+            return fn(*args)
+
+        if self._executor is None and not exclusive:
+            try:
+                return call()
+            finally:
+                self._release(exclusive)
+
+        # 요청 컨텍스트(단계별 타이머)를 워커 스레드로 전달 (풀이 없으면 단독 호출은 기본 스레드 풀)
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(self._executor, context.run, call)
+        # 호출자가 취소돼도 스레드는 계속 돌므로 끝날 때까지 자리를 유지
+        future.add_done_callback(lambda _: self._release(exclusive))
+        return await asyncio.shield(future)
+
+    async def _acquire(self, exclusive: bool):
+        """공유 자리 또는 모델 단독 사용 대기 (단독 호출이 먼저)"""
+        if exclusive:
+            self._exclusive_waiting += 1
+            try:
+                await self._wait_until(lambda: not self._exclusive and self._shared == 0)
+            finally:
+                self._exclusive_waiting -= 1
+            self._exclusive = True
+            self.stats['exclusive'] += 1
+        else:
+            await self._wait_until(lambda: not self._exclusive and not self._exclusive_waiting)
+            self._shared += 1
+
+    def _release(self, exclusive: bool):
+        if exclusive:
+            self._exclusive = False
+        else:
+            self._shared -= 1
+        self.stats['completed'] += 1
+        self._finish()
+
+    def _finish(self):
+        self._queued -= 1
+        COMPUTE_QUEUE_DEPTH.labels(self.name).set(self._queued)
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _wait_until(self, ready: Callable[[], bool]):
+        while not ready():
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+
+
+# 전역 인스턴스
+compute_pool = ComputePool()
@@ -36,24 +36,90 @@ class Config:
     MAX_RECOMMENDATIONS: int = 50
     MIN_RECOMMENDATIONS: int = 1
     
+    # 무한 스크롤 피드 (첫 페이지에서 FEED_DEPTH개 순위를 한 번 계산해 저장, 이후 커서로 잘라서 제공)
+    FEED_DEPTH: int = int(os.getenv('FEED_DEPTH', 500))
+    FEED_TTL: int = int(os.getenv('FEED_TTL', 1800))  # 30분
+    
     # 캐시 설정
     CACHE_TTL: int = int(os.getenv('CACHE_TTL', 3600))  # 1시간
     CACHE_ENABLED: bool = os.getenv('CACHE_ENABLED', 'True').lower() == 'true'
+    L1_CACHE_SIZE: int = int(os.getenv('L1_CACHE_SIZE', 10000))  # 프로세스 내 최대 항목 수
+    L1_CACHE_TTL: int = int(os.getenv('L1_CACHE_TTL', 60))  # 1분
+    CACHE_GENERATION_SYNC_INTERVAL: int = int(os.getenv('CACHE_GENERATION_SYNC_INTERVAL', 5))  # 5초
+    
+    # 캐시 미스 동시 요청 병합 (멀티 워커 시 Redis 락 사용)
+    SINGLE_FLIGHT_REDIS_LOCK: bool = os.getenv('SINGLE_FLIGHT_REDIS_LOCK', 'False').lower() == 'true'
+    SINGLE_FLIGHT_LOCK_TTL: int = int(os.getenv('SINGLE_FLIGHT_LOCK_TTL', 30))
+    SINGLE_FLIGHT_WAIT_TIMEOUT: float = float(os.getenv('SINGLE_FLIGHT_WAIT_TIMEOUT', 10))
+    
+    # 점수 계산/모델 로드 스레드 풀 (0이면 이벤트 루프에서 실행), 대기열 한도 초과 시 503 (0이면 무제한)
+    COMPUTE_POOL_WORKERS: int = int(os.getenv('COMPUTE_POOL_WORKERS', min(4, os.cpu_count() or 1)))
+    COMPUTE_QUEUE_LIMIT: int = int(os.getenv('COMPUTE_QUEUE_LIMIT', 256))
     
     # 데이터 로드 설정
     DATA_REFRESH_INTERVAL: int = int(os.getenv('DATA_REFRESH_INTERVAL', 3600))  # 1시간
     MAX_POSTS_LOAD: int = int(os.getenv('MAX_POSTS_LOAD', 5000))
     MAX_USERS_LOAD: int = int(os.getenv('MAX_USERS_LOAD', 10000))
     INTERACTION_DAYS: int = int(os.getenv('INTERACTION_DAYS', 90))  # 최근 90일
+    # 시작 시 첫 로드 실패 후 재시도 간격 (초, 성공 전까지 /health/ready는 503)
+    STARTUP_RETRY_INTERVAL: float = float(os.getenv('STARTUP_RETRY_INTERVAL', 10))
     
     # 하이브리드 추천 가중치
     COLLABORATIVE_WEIGHT: float = float(os.getenv('COLLABORATIVE_WEIGHT', 0.6))
     CONTENT_WEIGHT: float = float(os.getenv('CONTENT_WEIGHT', 0.4))
+    TRENDING_WEIGHT: float = float(os.getenv('TRENDING_WEIGHT', 0.1))
+    CATEGORY_WEIGHT: float = float(os.getenv('CATEGORY_WEIGHT', 0.1))
+    COVISIT_WEIGHT: float = float(os.getenv('COVISIT_WEIGHT', 0.2))
+    
+    # 하이브리드 후보 소스별 예산 (요청당 최대 후보 수, 0이면 소스 끔)
+    CF_CANDIDATES: int = int(os.getenv('CF_CANDIDATES', 100))
+    CONTENT_CANDIDATES: int = int(os.getenv('CONTENT_CANDIDATES', 100))
+    TRENDING_CANDIDATES: int = int(os.getenv('TRENDING_CANDIDATES', 50))
+    CATEGORY_CANDIDATES: int = int(os.getenv('CATEGORY_CANDIDATES', 50))
+    COVISIT_CANDIDATES: int = int(os.getenv('COVISIT_CANDIDATES', 100))
+    CANDIDATE_SOURCE_WORKERS: int = int(os.getenv('CANDIDATE_SOURCE_WORKERS', min(4, os.cpu_count() or 1)))  # 1 이하이면 순차 실행
+    CATEGORY_TOP_N: int = int(os.getenv('CATEGORY_TOP_N', 200))  # 로드 시 미리 만드는 카테고리별 인기 목록 길이
+    
+    # 상호작용 시간 감쇠 exp(-경과일 / TIME_DECAY_DAYS), 가중치는 고정 기준 시각 대비 로그값으로 저장
+    TIME_DECAY_DAYS: float = float(os.getenv('TIME_DECAY_DAYS', 30))
+    TIME_DECAY_EPOCH: str = os.getenv('TIME_DECAY_EPOCH', '2025-01-01')
+    
+    # 모델 배열 정밀도 (float32: 메모리 절반 + 빠른 BLAS, float64: 검증용)
+    MODEL_DTYPE: str = os.getenv('MODEL_DTYPE', 'float32')
+    
+    # 행렬 분해(ALS) 설정 - recommendation_type="als"
+    ALS_ENABLED: bool = os.getenv('ALS_ENABLED', 'True').lower() == 'true'
+    ALS_FACTORS: int = int(os.getenv('ALS_FACTORS', 64))
+    ALS_REGULARIZATION: float = float(os.getenv('ALS_REGULARIZATION', 0.01))
+    ALS_ALPHA: float = float(os.getenv('ALS_ALPHA', 10.0))
+    ALS_ITERATIONS: int = int(os.getenv('ALS_ITERATIONS', 15))
+    ALS_CG_STEPS: int = int(os.getenv('ALS_CG_STEPS', 3))
+    ALS_NUM_THREADS: Optional[int] = int(os.getenv('ALS_NUM_THREADS')) if os.getenv('ALS_NUM_THREADS') else None  # BLAS 스레드 수 (기본: 전체 코어)
+    
+    # 게시물 임베딩 (TF-IDF -> 절단 SVD, 0이면 TF-IDF 그대로 사용, 권장 64~256)
+    EMBEDDING_DIM: int = int(os.getenv('EMBEDDING_DIM', 0))
+    
+    # 벡터 int8 양자화 (ANN 인덱스 밀집 벡터, ALS 아이템 요인)
+    VECTOR_QUANTIZATION: bool = os.getenv('VECTOR_QUANTIZATION', 'False').lower() == 'true'
+    VECTOR_RERANK: int = int(os.getenv('VECTOR_RERANK', 0))  # 상위 k x N개 float 재정렬 (0이면 float 사본 미보관)
+    
+    # 유사 게시물 ANN 인덱스 설정
+    ANN_NLIST: Optional[int] = int(os.getenv('ANN_NLIST')) if os.getenv('ANN_NLIST') else None  # 군집 수 (기본: sqrt(게시물 수))
+    ANN_NPROBE: int = int(os.getenv('ANN_NPROBE', 8))  # 질의당 탐색 군집 수 (클수록 재현율↑ 지연↑)
+    ANN_EXACT_THRESHOLD: int = int(os.getenv('ANN_EXACT_THRESHOLD', 5000))  # 이하이면 전수 비교
+    ANN_INDEX_PATH: str = os.getenv('ANN_INDEX_PATH', '')  # 인덱스 저장 경로 (비우면 저장 안 함)
     
     # 로깅 설정
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE: str = os.getenv('LOG_FILE', 'ml_service.log')
     
+    # 요청 단계별 시간 (Server-Timing 헤더, 이 값(ms) 이상 걸린 요청은 단계별 시간 로그, 음수면 로그 안 함)
+    SERVER_TIMING_ENABLED: bool = os.getenv('SERVER_TIMING_ENABLED', 'True').lower() == 'true'
+    REQUEST_TIMING_LOG_MS: float = float(os.getenv('REQUEST_TIMING_LOG_MS', 500))
+    
+    # 샘플링 프로파일러 (/admin/profile) 최대 실행 시간 (초)
+    PROFILER_MAX_SECONDS: int = int(os.getenv('PROFILER_MAX_SECONDS', 120))
+    
     # CORS 설정
     ALLOWED_ORIGINS: list = [
         "http://localhost:3000",
@@ -78,11 +144,16 @@ class Config:
         if cls.COLLABORATIVE_WEIGHT + cls.CONTENT_WEIGHT != 1.0:
             errors.append("COLLABORATIVE_WEIGHT + CONTENT_WEIGHT must equal 1.0")
         
+        if cls.TIME_DECAY_DAYS <= 0:
+            errors.append("TIME_DECAY_DAYS must be positive")
+        
+        if cls.FEED_DEPTH < cls.MAX_RECOMMENDATIONS:
+            errors.append("FEED_DEPTH must be at least MAX_RECOMMENDATIONS")
+        
+        if cls.MODEL_DTYPE not in ('float32', 'float64'):
+            errors.append("MODEL_DTYPE must be float32 or float64")
+        
         if errors:
             raise ValueError(f"Configuration errors: {', '.join(errors)}")
         
         return True
-
-
-# 설정 검증
-Config.validate()
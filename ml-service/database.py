@@ -10,6 +10,8 @@ import os
 from dotenv import load_dotenv
 import logging
 
+from metrics import observe_query
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -18,8 +20,14 @@ class Database:
     """MySQL 데이터베이스 연결 풀 관리"""
     
     def __init__(self):
+        # 풀은 connect()에서 생성 (임포트 시 네트워크 접속 없음)
         self.pool = None
-        self._create_pool()
+    
+    def connect(self) -> bool:
+        """커넥션 풀 생성 (이미 있으면 유지, 성공 여부 반환)"""
+        if not self.pool:
+            self._create_pool()
+        return self.pool is not None
     
     def _create_pool(self):
         """커넥션 풀 생성"""
@@ -78,6 +86,7 @@ class Database:
             if connection:
                 connection.close()
     
+    @observe_query
     def get_posts(self, limit: int = 1000) -> List[Dict]:
         """게시물 데이터 조회"""
         query = """
@@ -102,6 +111,7 @@ class Database:
         """
         return self.execute_query(query, (limit,))
     
+    @observe_query
     def get_users(self, limit: int = 1000) -> List[Dict]:
         """사용자 데이터 조회"""
         query = """
@@ -117,6 +127,7 @@ class Database:
         """
         return self.execute_query(query, (limit,))
     
+    @observe_query
     def get_user_interactions(self, days: int = 90) -> List[Dict]:
         """사용자 상호작용 데이터 조회 (최근 N일)"""
         # 조회 기록
@@ -160,6 +171,7 @@ class Database:
         all_interactions = views + likes + comments
         return all_interactions
     
+    @observe_query
     def get_post_by_id(self, post_id: int) -> Optional[Dict]:
         """특정 게시물 조회"""
         query = """
@@ -182,6 +194,7 @@ class Database:
         results = self.execute_query(query, (post_id,))
         return results[0] if results else None
     
+    @observe_query
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         """특정 사용자 조회"""
         query = """
@@ -192,6 +205,7 @@ class Database:
         results = self.execute_query(query, (user_id,))
         return results[0] if results else None
     
+    @observe_query
     def get_user_recent_interactions(
         self, 
         user_id: int, 
@@ -228,6 +242,17 @@ class Database:
             (user_id, days, user_id, days, user_id, days)
         )
     
+    @observe_query
+    def get_blocked_user_ids(self, user_id: int) -> List[int]:
+        """사용자가 차단한 사용자 ID 목록"""
+        query = """
+            SELECT blocked_id
+            FROM blocked_users
+            WHERE blocker_id = %s
+        """
+        return [row['blocked_id'] for row in self.execute_query(query, (user_id,))]
+    
+    @observe_query
     def get_trending_posts(self, days: int = 7, limit: int = 20) -> List[Dict]:
         """트렌딩 게시물 조회"""
         query = """
@@ -255,6 +280,7 @@ class Database:
         """
         return self.execute_query(query, (days, days, days, limit))
     
+    @observe_query
     def get_category_posts(
         self, 
         category_ids: List[int], 
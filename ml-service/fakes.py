@@ -0,0 +1,215 @@
+"""
+In-process stand-ins for MySQL and Redis
+부하 테스트용 인메모리 Database / Redis 대체 구현 (합성 데이터 기반)
+"""
+
+import fnmatch
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from synthetic_data import generate_dataset
+
+
+class FakeRedis:
+    """
+    redis.Redis 중 캐시/락/세대 카운터가 쓰는 명령만 구현한 인메모리 저장소
+
+    값은 실제 Redis처럼 bytes(decode_responses=True이면 str)로 저장하고,
+    TTL은 조회 시점에 만료를 확인한다. eval은 락 해제 스크립트
+    (값이 같으면 삭제)만 지원한다.
+    """
+
+    def __init__(self, decode_responses: bool = False):
+        self.decode_responses = decode_responses
+        self._data: Dict[str, Tuple[Optional[float], Any]] = {}
+        self._lock = threading.Lock()
+        self.commands = 0
+
+    def _encode(self, value: Any) -> Any:
+        """값을 Redis 응답 형식(bytes 또는 str)으로 변환"""
+        if isinstance(value, bytes):
+            return value.decode() if self.decode_responses else value
+        value = str(value)
+        return value if self.decode_responses else value.encode()
+
+    def _live(self, key: str) -> Optional[Any]:
+        """만료되지 않은 값 (락 보유 상태에서 호출)"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            self.commands += 1
+            return self._live(key)
+
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        with self._lock:
+            self.commands += 1
+            return [self._live(key) for key in keys]
+
+    def set(self, key: str, value: Any, nx: bool = False, ex: Optional[int] = None) -> Optional[bool]:
+        with self._lock:
+            self.commands += 1
+            if nx and self._live(key) is not None:
+                return None
+            self._data[key] = (time.monotonic() + ex if ex else None, self._encode(value))
+            return True
+
+    def setex(self, key: str, ttl: int, value: Any) -> bool:
+        return self.set(key, value, ex=ttl)
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            self.commands += 1
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    unlink = delete
+
+    def exists(self, *keys: str) -> int:
+        with self._lock:
+            self.commands += 1
+            return sum(self._live(key) is not None for key in keys)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self.commands += 1
+            entry = self._data.get(key)
+            expires_at = entry[0] if entry else None
+            value = int(self._live(key) or 0) + 1
+            self._data[key] = (expires_at, self._encode(value))
+            return value
+
+    def expire(self, key: str, ttl: int) -> bool:
+        with self._lock:
+            self.commands += 1
+            value = self._live(key)
+            if value is None:
+                return False
+            self._data[key] = (time.monotonic() + ttl, value)
+            return True
+
+    def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> int:
+        """락 해제 스크립트: KEYS[1]의 값이 ARGV[1]과 같으면 삭제"""
+        key, token = keys_and_args[0], keys_and_args[numkeys]
+        with self._lock:
+            self.commands += 1
+            if self._live(key) == self._encode(token):
+                del self._data[key]
+                return 1
+            return 0
+
+    def scan_iter(self, match: str = '*', count: Optional[int] = None) -> Iterator[Any]:
+        with self._lock:
+            self.commands += 1
+            keys = [key for key in self._data if fnmatch.fnmatchcase(key, match)]
+        for key in keys:
+            yield self._encode(key)
+
+    def pipeline(self, transaction: bool = True) -> 'FakePipeline':
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """명령을 모았다가 execute()에서 순서대로 실행"""
+
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self._calls: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self) -> List[Any]:
+        results = [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+        self._calls = []
+        return results
+
+
+class FakeDatabase:
+    """
+    database.Database와 같은 조회 메서드를 합성 데이터로 제공
+
+    SQL 쿼리의 필터/정렬(기간, 최신순, 트렌딩 점수)을 인메모리로 재현한다.
+    """
+
+    def __init__(self, num_posts: int, num_users: Optional[int] = None, seed: int = 42, **kwargs):
+        self.posts, self.users, self.interactions = generate_dataset(
+            num_posts, num_users, seed=seed, **kwargs
+        )
+        self.pool = True  # app.load_snapshot이 연결 여부로 확인
+        self._posts_by_id = {post['post_id']: post for post in self.posts}
+        self._by_user: Dict[int, List[Dict]] = {}
+        for row in self.interactions:
+            self._by_user.setdefault(row['user_id'], []).append(row)
+        for rows in self._by_user.values():
+            rows.sort(key=lambda row: row['created_at'], reverse=True)
+
+    def get_posts(self, limit: int = 1000) -> List[Dict]:
+        """최신 게시물"""
+        return sorted(self.posts, key=lambda post: post['created_at'], reverse=True)[:limit]
+
+    def get_users(self, limit: int = 1000) -> List[Dict]:
+        """최근 가입 사용자"""
+        return sorted(self.users, key=lambda user: user['created_at'], reverse=True)[:limit]
+
+    def get_user_interactions(self, days: int = 90) -> List[Dict]:
+        """최근 N일 상호작용"""
+        since = datetime.now() - timedelta(days=days)
+        return [row for row in self.interactions if row['created_at'] >= since]
+
+    def get_post_by_id(self, post_id: int) -> Optional[Dict]:
+        """게시물 단건 조회"""
+        return self._posts_by_id.get(post_id)
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict]:
+        """사용자 단건 조회"""
+        if 1 <= user_id <= len(self.users):
+            return self.users[user_id - 1]
+        return None
+
+    def get_user_recent_interactions(self, user_id: int, days: int = 30) -> List[Dict]:
+        """특정 사용자의 최근 상호작용 (최신순)"""
+        since = datetime.now() - timedelta(days=days)
+        return [
+            {'post_id': row['post_id'], 'created_at': row['created_at']}
+            for row in self._by_user.get(user_id, [])
+            if row['created_at'] >= since
+        ]
+
+    def get_blocked_user_ids(self, user_id: int) -> List[int]:
+        """차단 관계 (합성 데이터에는 없음)"""
+        return []
+
+    def get_trending_posts(self, days: int = 7, limit: int = 20) -> List[Dict]:
+        """트렌딩 게시물 (좋아요 x3 + 댓글 x2 + 조회수 x0.5)"""
+        since = datetime.now() - timedelta(days=days)
+        trending = [
+            {**post, 'trending_score': post['likes_count'] * 3 + post['comments_count'] * 2 + post['views_count'] * 0.5}
+            for post in self.posts
+            if post['created_at'] >= since
+        ]
+        trending.sort(key=lambda post: post['trending_score'], reverse=True)
+        return trending[:limit]
+
+    def get_category_posts(self, category_ids: List[int], limit: int = 50) -> List[Dict]:
+        """특정 카테고리 게시물 (최신순)"""
+        categories = set(category_ids)
+        posts = [post for post in self.posts if post['category_id'] in categories]
+        return sorted(posts, key=lambda post: post['created_at'], reverse=True)[:limit]
@@ -0,0 +1,243 @@
+"""
+HTTP load test against the FastAPI app with in-process fakes
+합성 데이터 FakeDatabase + FakeRedis로 app.py 엔드포인트 처리량(RPS)과 지연 백분위 측정
+
+MySQL/Redis 없이 app 모듈의 db와 캐시 Redis 클라이언트를 대체하고,
+httpx ASGI 전송으로 같은 프로세스 안에서 요청을 보낸다 (네트워크 비용 제외).
+캐시 적중률은 요청마다 미리 채운 키를 쓰거나(적중) 보내기 전에 키를 지워(미스) 맞춘다.
+
+사용법:
+    python loadtest.py --posts 2000 --concurrency 16 --requests 2000 --hit-ratio 0.8
+    python loadtest.py --mix posts=1 --recommendation-type als --output loadtest.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+import numpy as np
+
+from config import Config
+from fakes import FakeDatabase, FakeRedis
+
+ENDPOINTS = ('posts', 'similar', 'trending')
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """'posts=5,similar=3,trending=2' 형식의 엔드포인트 비중"""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def latency_stats(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """처리량과 지연 백분위 (ms)"""
+    if not samples:
+        return {'count': 0}
+    values = np.array(samples) * 1000
+    return {
+        'count': len(values),
+        'rps': round(len(values) / elapsed, 1),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+        'max_ms': round(float(values.max()), 3)
+    }
+
+
+class LoadTest:
+    """app 모듈을 가짜 의존성에 연결하고 요청 부하를 생성"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+
+        # app 임포트는 MySQL/Redis에 접속하지 않으므로 가짜 구현으로 교체 후 직접 로드
+        import app as service
+        self.service = service
+        self.db = FakeDatabase(args.posts, args.users, seed=args.seed)
+        self.redis = FakeRedis()
+        service.db = self.db
+        service.cache.client = self.redis
+        service.cache._sync_generation(force=True)
+        if args.quiet:
+            service.logger.disable('app')
+
+        self.user_ids = sorted({row['user_id'] for row in self.db.interactions})
+        self.post_ids = [post['post_id'] for post in self.db.posts]
+        headers = {'X-API-Key': Config.API_KEY} if Config.API_KEY else {}
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=service.app),
+            base_url='http://loadtest',
+            headers=headers,
+            timeout=None
+        )
+
+    def request(self, endpoint: str, item_id: int) -> Tuple[str, str, Dict[str, Any], Any]:
+        """(메서드, 경로, 쿼리, JSON 본문)"""
+        if endpoint == 'posts':
+            body = {
+                'user_id': item_id,
+                'limit': self.args.limit,
+                'recommendation_type': self.args.recommendation_type
+            }
+            return 'POST', '/recommend/posts', {}, body
+        if endpoint == 'similar':
+            return 'POST', f"/recommend/similar/{item_id}", {'limit': self.args.limit}, None
+        return 'POST', '/recommend/trending', {'limit': self.args.limit, 'days': 7}, None
+
+    def cache_key(self, endpoint: str, item_id: int) -> str:
+        """app.py와 같은 규칙의 캐시 키"""
+        cache = self.service.cache
+        if endpoint == 'posts':
+            return cache.user_key(item_id, 'posts', self.args.recommendation_type)
+        if endpoint == 'similar':
+            return cache.key('similar', item_id)
+        return cache.key('trending', self.args.limit, 7)
+
+    def evict(self, endpoint: str, item_id: int):
+        """다음 요청이 미스가 되도록 L1/L2에서 키 삭제"""
+        key = self.cache_key(endpoint, item_id)
+        if self.service.cache.local is not None:
+            self.service.cache.local.delete(key)
+        self.redis.delete(key)
+
+    def plan(self) -> List[Tuple[str, int, bool]]:
+        """(엔드포인트, ID, 적중 여부) 요청 목록"""
+        weights = parse_mix(self.args.mix)
+        names, probabilities = list(weights), list(weights.values())
+        self.warm = {
+            'posts': self.rng.sample(self.user_ids, min(self.args.warm_keys, len(self.user_ids))),
+            'similar': self.rng.sample(self.post_ids, min(self.args.warm_keys, len(self.post_ids))),
+            'trending': [0]
+        }
+        pools = {'posts': self.user_ids, 'similar': self.post_ids, 'trending': [0]}
+        requests = []
+        for endpoint in self.rng.choices(names, probabilities, k=self.args.requests):
+            hit = self.rng.random() < self.args.hit_ratio
+            item_id = self.rng.choice(self.warm[endpoint] if hit else pools[endpoint])
+            requests.append((endpoint, item_id, hit))
+        return requests
+
+    async def send(self, endpoint: str, item_id: int) -> int:
+        method, path, params, body = self.request(endpoint, item_id)
+        response = await self.client.request(method, path, params=params, json=body)
+        return response.status_code
+
+    async def run(self) -> Dict[str, Any]:
+        """데이터 로드 → 캐시 예열 → 동시 요청 측정"""
+        started = time.perf_counter()
+        self.service.load_snapshot()
+        load_seconds = time.perf_counter() - started
+
+        requests = self.plan()
+        for endpoint, item_ids in self.warm.items():
+            if endpoint in {name for name, _, _ in requests}:
+                for item_id in item_ids:
+                    await self.send(endpoint, item_id)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for request in requests:
+            queue.put_nowait(request)
+        samples: Dict[str, List[float]] = {name: [] for name in ENDPOINTS}
+        errors: Dict[str, int] = {name: 0 for name in ENDPOINTS}
+        stats_before = dict(self.service.cache.stats)
+
+        async def worker():
+            while not queue.empty():
+                endpoint, item_id, hit = queue.get_nowait()
+                if not hit:
+                    self.evict(endpoint, item_id)
+                t0 = time.perf_counter()
+                try:
+                    status = await self.send(endpoint, item_id)
+                except Exception:
+                    status = 0
+                samples[endpoint].append(time.perf_counter() - t0)
+                if status != 200:
+                    errors[endpoint] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        elapsed = time.perf_counter() - started
+        await self.client.aclose()
+
+        stats = self.service.cache.stats
+        lookups = {name: stats[name] - stats_before[name] for name in stats}
+        hits = lookups['l1_hits'] + lookups['l2_hits']
+        report = {
+            'service': 'ml-service',
+            'settings': {
+                key: getattr(self.args, key)
+                for key in ('posts', 'users', 'concurrency', 'requests', 'hit_ratio', 'mix',
+                            'recommendation_type', 'limit', 'seed')
+            },
+            'data_load_seconds': round(load_seconds, 3),
+            'elapsed_seconds': round(elapsed, 3),
+            'total': {
+                **latency_stats([s for values in samples.values() for s in values], elapsed),
+                'errors': sum(errors.values())
+            },
+            'endpoints': {
+                name: {**latency_stats(values, elapsed), 'errors': errors[name]}
+                for name, values in samples.items() if values
+            },
+            'cache': {
+                **lookups,
+                'observed_hit_ratio': round(hits / (hits + lookups['l2_misses']), 3)
+                if hits + lookups['l2_misses'] else None,
+                'redis_commands': self.redis.commands
+            }
+        }
+        return report
+
+
+def print_report(report: Dict[str, Any], out: Callable[[str], None] = print):
+    """요약 표 출력"""
+    total = report['total']
+    out(f"{total['count']} requests in {report['elapsed_seconds']}s: "
+        f"{total['rps']} req/s, {total['errors']} errors, "
+        f"cache hit ratio {report['cache']['observed_hit_ratio']}")
+    for name, stats in report['endpoints'].items():
+        out(f"  {name:9s} {stats['count']:6d} req  {stats['rps']:8.1f} req/s  "
+            f"p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms  p99 {stats['p99_ms']:8.2f}ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="가짜 DB/Redis로 app.py HTTP 부하 테스트")
+    parser.add_argument('--posts', type=int, default=2000, help="합성 게시물 수")
+    parser.add_argument('--users', type=int, default=None, help="합성 사용자 수 (기본: 게시물 수)")
+    parser.add_argument('--concurrency', type=int, default=16, help="동시 요청 수")
+    parser.add_argument('--requests', type=int, default=2000, help="총 요청 수")
+    parser.add_argument('--hit-ratio', type=float, default=0.8, help="캐시 적중 요청 비율 (0-1)")
+    parser.add_argument('--mix', default='posts=5,similar=3,trending=2',
+                        help="엔드포인트 비중 (posts, similar, trending)")
+    parser.add_argument('--recommendation-type', default='hybrid',
+                        choices=['hybrid', 'collaborative', 'content', 'als'])
+    parser.add_argument('--limit', type=int, default=10, help="요청당 추천 개수")
+    parser.add_argument('--warm-keys', type=int, default=200, help="엔드포인트별 미리 채울 키 수")
+    parser.add_argument('--seed', type=int, default=42, help="데이터/요청 시드")
+    parser.add_argument('--quiet', action='store_true', help="요청별 app 로그 끄기")
+    parser.add_argument('--output', help="결과 JSON 파일")
+    args = parser.parse_args()
+
+    report = asyncio.run(LoadTest(args).run())
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report['total']['errors'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Prometheus metrics
+단계별 지연 히스토그램, 캐시 적중 카운터, 모델 크기/스냅샷 나이 게이지 (/metrics로 노출)
+"""
+
+import functools
+from typing import Callable
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from timing import stage
+
+# 요청 경로(수백 μs ~ 수 초)
+REQUEST_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+# 모델 빌드(수십 ms ~ 수 분)
+BUILD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'ml_http_request_seconds', 'HTTP 요청 처리 시간 (응답 직렬화 포함)',
+    ['method', 'route', 'status'], buckets=REQUEST_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    'ml_db_query_seconds', 'DB 조회 메서드별 소요 시간',
+    ['method'], buckets=REQUEST_BUCKETS + (30.0, 60.0)
+)
+MODEL_BUILD_SECONDS = Histogram(
+    'ml_model_build_seconds', '모델 빌드 단계별 소요 시간 (tfidf, interaction_matrix, als, embed, ann_index 등)',
+    ['stage'], buckets=BUILD_BUCKETS
+)
+SCORING_SECONDS = Histogram(
+    'ml_scoring_seconds', '추천 타입별 점수 계산 시간 (캐시 미스 경로)',
+    ['type'], buckets=REQUEST_BUCKETS
+)
+SERIALIZATION_SECONDS = Histogram(
+    'ml_serialization_seconds', '엔드포인트별 응답 목록 구성 시간 (hydrate)',
+    ['endpoint'], buckets=REQUEST_BUCKETS
+)
+COMPUTE_QUEUE_DEPTH = Gauge(
+    'ml_compute_queue_depth', '계산 풀에서 대기 중이거나 실행 중인 호출 수',
+    ['pool']
+)
+COMPUTE_WAIT_SECONDS = Histogram(
+    'ml_compute_wait_seconds', '계산 풀 호출이 워커(shared) 또는 모델 단독 사용(exclusive)을 기다린 시간',
+    ['pool', 'mode'], buckets=REQUEST_BUCKETS
+)
+COMPUTE_REJECTED = Counter(
+    'ml_compute_rejected_total', '대기열 한도 초과로 거절된 계산 호출 수',
+    ['pool']
+)
+PIPELINE_STAGE_SECONDS = Histogram(
+    'ml_pipeline_stage_seconds', '후보 파이프라인 단계별 시간 (context, filter, candidates, candidates_<소스>, rank)',
+    ['stage'], buckets=REQUEST_BUCKETS
+)
+CANDIDATE_COUNT = Histogram(
+    'ml_candidate_count', '후보 소스별 요청당 후보 수 (예산 이내)',
+    ['source'], buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+CACHE_LOOKUPS = Counter(
+    'ml_cache_lookups_total', '캐시 계층/키 종류별 조회 결과',
+    ['tier', 'family', 'result']
+)
+MODEL_SIZE_BYTES = Gauge(
+    'ml_model_size_bytes', '모델 구성 요소별 메모리 크기',
+    ['component']
+)
+MODEL_SNAPSHOT_AGE_SECONDS = Gauge(
+    'ml_model_snapshot_age_seconds', '현재 모델 데이터를 로드한 뒤 지난 시간'
+)
+
+
+def render():
+    """Prometheus 텍스트 형식 (본문, Content-Type)"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def observe_query(func: Callable) -> Callable:
+    """DB 조회 메서드 소요 시간 기록 (메서드 이름이 라벨, 요청 중이면 db 단계에도 누적)"""
+    histogram = DB_QUERY_SECONDS.labels(method=func.__name__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with histogram.time(), stage('db'):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,100 @@
+"""
+On-demand sampling profiler
+재시작 없이 켜는 저부하 샘플링 프로파일러 (flamegraph 호환 folded stack 출력)
+
+별도 데몬 스레드가 일정 간격으로 sys._current_frames()의 모든 스레드 스택을 읽어
+"스레드;바깥 함수;...;안쪽 함수 횟수" 형식(folded stack)으로 집계한다.
+결과는 flamegraph.pl, inferno, speedscope에 그대로 넣을 수 있다.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+
+class SamplingProfiler:
+    """스레드 스택 주기 샘플링 (한 번에 하나의 세션만 실행)"""
+
+    def __init__(self, max_depth: int = 128):
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01) -> bool:
+        """샘플링 시작 (이미 실행 중이면 False)"""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._stacks = Counter()
+            self.samples = 0
+            self.started_at = time.monotonic()
+            self.stopped_at = None
+            self._thread = threading.Thread(
+                target=self._run, args=(interval,), name='sampling-profiler', daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self) -> str:
+        """샘플링 중지 후 folded stack 반환"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.stopped_at = time.monotonic()
+        return self.folded()
+
+    def folded(self) -> str:
+        """folded stack 텍스트 (많이 잡힌 스택 순)"""
+        return '\n'.join(f"{stack} {count}" for stack, count in self._stacks.most_common())
+
+    def _run(self, interval: float):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                self._stacks[self._fold(names.get(ident, str(ident)), frame)] += 1
+            self.samples += 1
+
+    def _fold(self, thread_name: str, frame) -> str:
+        """프레임 체인 → '스레드;바깥;...;안쪽'"""
+        frames = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ';'.join(reversed(frames))
+
+    def summary(self) -> Dict[str, float]:
+        """마지막 세션 요약"""
+        end = self.stopped_at or time.monotonic()
+        return {
+            'samples': self.samples,
+            'stacks': len(self._stacks),
+            'seconds': round(end - self.started_at, 3) if self.started_at else 0.0
+        }
+
+
+def _short_path(path: str) -> str:
+    """마지막 두 경로 요소만 사용 (예: site-packages/numpy/... → numpy/linalg.py)"""
+    parts = path.replace('\\', '/').split('/')
+    return '/'.join(parts[-2:]) if len(parts) > 1 else os.path.basename(path)
+
+
+# 전역 인스턴스
+profiler = SamplingProfiler()
@@ -0,0 +1,126 @@
+"""
+Int8-quantized vector store
+벡터별 스케일 + int8 코드로 압축한 밀집 벡터 저장소
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class QuantizedVectors:
+    """
+    int8 양자화 벡터 저장소 (float32 대비 약 4배, float64 대비 약 8배 절감)
+
+    각 벡터를 scale = max|v| / 127로 나눈 int8 코드로 저장하고, 점수는
+    행 묶음 단위로 코드 x 질의 내적에 scale을 곱해 계산한다. keep_float이면
+    원본 float32 벡터를 함께 보관해 상위 후보를 정확한 점수로 재정렬한다.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        scales: np.ndarray,
+        float_vectors: Optional[np.ndarray] = None
+    ):
+        self.codes = np.ascontiguousarray(codes, dtype=np.int8)
+        self.scales = np.ascontiguousarray(scales, dtype=np.float32)
+        self.float_vectors = float_vectors
+
+    @classmethod
+    def quantize(cls, vectors: np.ndarray, keep_float: bool = False) -> 'QuantizedVectors':
+        """float 벡터(n x d)를 양자화"""
+        vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+        codes, scales = cls._encode(vectors)
+        return cls(codes, scales, vectors if keep_float else None)
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        """메모리 사용량 (바이트)"""
+        float_bytes = self.float_vectors.nbytes if self.float_vectors is not None else 0
+        return self.codes.nbytes + self.scales.nbytes + float_bytes
+
+    def append(self, vectors: np.ndarray):
+        """벡터 추가"""
+        vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+        codes, scales = self._encode(vectors)
+        self.codes = np.vstack([self.codes, codes])
+        self.scales = np.concatenate([self.scales, scales])
+        if self.float_vectors is not None:
+            self.float_vectors = np.vstack([self.float_vectors, vectors])
+
+    def reconstruct(self, rows) -> np.ndarray:
+        """근사 float 벡터 복원 (원본이 있으면 원본)"""
+        if self.float_vectors is not None:
+            return self.float_vectors[rows]
+        return self.codes[rows].astype(np.float32) * self.scales[rows, None]
+
+    def scores(
+        self,
+        queries: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+        chunk_size: int = 16384
+    ) -> np.ndarray:
+        """근사 내적 점수 (질의 q개 x 행 n개, 질의가 1차원이면 n개)"""
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = np.atleast_2d(queries)
+
+        codes = self.codes if rows is None else self.codes[rows]
+        scales = self.scales if rows is None else self.scales[rows]
+        result = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        # 묶음 단위로만 float 변환해 임시 메모리를 제한
+        for start in range(0, codes.shape[0], chunk_size):
+            stop = start + chunk_size
+            block = codes[start:stop].astype(np.float32)
+            result[:, start:stop] = (queries @ block.T) * scales[start:stop]
+
+        return result[0] if single else result
+
+    def top_k(
+        self,
+        query: np.ndarray,
+        k: int,
+        rows: Optional[np.ndarray] = None,
+        exclude: Optional[np.ndarray] = None,
+        rerank: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        질의와 내적이 가장 큰 k개 (행 번호, 점수)
+
+        rerank > 0이고 원본 벡터가 있으면 근사 점수 상위 k * rerank개를
+        정확한 float 내적으로 다시 계산해 정렬한다.
+        """
+        scores = self.scores(query, rows)
+        positions = np.arange(len(self)) if rows is None else np.asarray(rows)
+        if exclude is not None and len(exclude):
+            scores[np.isin(positions, exclude)] = -np.inf
+
+        exact = rerank > 0 and self.float_vectors is not None
+        shortlist = min(k * rerank if exact else k, len(scores))
+        if shortlist <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+        top = top[np.isfinite(scores[top])]
+        if exact:
+            scores = scores.copy()
+            scores[top] = self.float_vectors[positions[top]] @ np.asarray(query, dtype=np.float32)
+
+        top = top[np.argsort(-scores[top], kind='stable')][:k]
+        return positions[top], scores[top]
+
+    @staticmethod
+    def _encode(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """벡터별 스케일과 int8 코드 계산"""
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).clip(-127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
@@ -4,31 +4,103 @@ Content Recommendation Engine
 """
 
 import numpy as np
+import orjson
 import pandas as pd
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import MinMaxScaler
-from typing import List, Dict, Optional, Tuple
+from sklearn.preprocessing import MinMaxScaler, normalize
+from typing import List, Dict, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
+import hashlib
+import os
 import logging
 
+from ann_index import IVFIndex
+from candidate_pipeline import CandidatePipeline, PipelineRequest, no_candidates, top_k
+from config import Config
+from factorization import ImplicitALS
+from metrics import MODEL_BUILD_SECONDS
+
 logger = logging.getLogger(__name__)
 
+# 상호작용 유형 가중치 (좋아요 > 댓글 > 조회)
+INTERACTION_TYPE_WEIGHTS = {
+    'like': 3.0,
+    'comment': 2.0,
+    'view': 1.0
+}
+
 
 class RecommendationEngine:
-    """추천 엔진 메인 클래스"""
+    """
+    추천 엔진 메인 클래스
+    
+    모델 배열(상호작용 가중치, 사용자-게시물 매트릭스, TF-IDF, 유사도, 임베딩)은
+    dtype(기본 float32)으로 유지하고, 응답 구성 시에만 파이썬 float로 변환한다.
+    """
     
-    def __init__(self):
+    def __init__(self, dtype: str = 'float32'):
+        self.dtype = np.dtype(dtype)
         self.tfidf_vectorizer = TfidfVectorizer(
             max_features=1000,
             stop_words='english',
-            ngram_range=(1, 2)
+            ngram_range=(1, 2),
+            dtype=self.dtype
         )
         self.scaler = MinMaxScaler()
         self.posts_df = None
         self.users_df = None
         self.interactions_df = None
         self.tfidf_matrix = None
+        self.svd: Optional[TruncatedSVD] = None
+        self.post_embeddings: Optional[np.ndarray] = None
+        self.post_index: Dict[int, int] = {}
+        self.post_payloads: List[Dict] = []
+        self.post_json: List[bytes] = []  # 게시물별 미리 인코딩한 JSON (닫는 괄호 제외)
+        # 게시물 위치별 배열 (후보 생성/필터용)
+        self.post_ids = np.empty(0, dtype=np.int64)
+        self.post_popularity = np.empty(0, dtype=np.float32)
+        self.post_categories = np.empty(0, dtype=np.int64)
+        self.post_authors = np.empty(0, dtype=np.int64)
+        self.post_created = np.empty(0, dtype='datetime64[ns]')
+        self.post_deleted = np.empty(0, dtype=bool)
+        # 카테고리 열별 인기순 게시물 위치 목록 (상위 CATEGORY_TOP_N개)
+        self.category_index: Dict[int, int] = {}
+        self.category_ids = np.empty(0, dtype=np.int64)
+        self.category_top: List[np.ndarray] = []
+        self.post_category_codes = np.empty(0, dtype=np.int64)
+        # 사용자 x 카테고리 상호작용 수 (행은 interaction_users 순서)
+        self.category_affinity: Optional[sparse.csr_matrix] = None
+        # 사용자별 상호작용 게시물 위치 CSR 인덱스 (최신순, 로드된 게시물만)
+        self.history_users: Dict[int, int] = {}
+        self.history_indptr = np.zeros(1, dtype=np.int64)
+        self.history_positions = np.empty(0, dtype=np.int64)
+        self.history_created = np.empty(0, dtype='datetime64[ns]')
+        # 로드 이후 상호작용이 추가된 사용자의 병합된 이력 (다음 로드 전까지)
+        self.history_updates: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        # 사용자 x 게시물 위치 상호작용 가중치 (협업 이웃/동시 조회 후보)
+        self.interaction_matrix: Optional[sparse.csr_matrix] = None
+        self.interaction_normalized: Optional[sparse.csr_matrix] = None
+        self.covisit_matrix: Optional[sparse.csr_matrix] = None
+        self.interaction_users: Dict[int, int] = {}
+        # 시간 감쇠 기준 시각 (로그 가중치의 원점)과 매트릭스 저장 값의 로그 기준값
+        self.decay_epoch = pd.Timestamp(Config.TIME_DECAY_EPOCH)
+        self.interaction_scale = 0.0
+        self.als_model: Optional[ImplicitALS] = None
+        self.als_user_index: Dict[int, int] = {}
+        self.als_post_ids: Optional[np.ndarray] = None
+        self.ann_index: Optional[IVFIndex] = None
+        self.model_version = 0
+        
+        # 하이브리드 추천 후보 소스 (소스별 예산/가중치)
+        self.pipeline = CandidatePipeline(workers=Config.CANDIDATE_SOURCE_WORKERS)
+        self.pipeline.register('cf', self._cf_candidates, Config.CF_CANDIDATES, Config.COLLABORATIVE_WEIGHT)
+        self.pipeline.register('content', self._content_candidates, Config.CONTENT_CANDIDATES, Config.CONTENT_WEIGHT)
+        self.pipeline.register('trending', self._trending_candidates, Config.TRENDING_CANDIDATES, Config.TRENDING_WEIGHT)
+        self.pipeline.register('category', self._category_candidates, Config.CATEGORY_CANDIDATES, Config.CATEGORY_WEIGHT)
+        self.pipeline.register('covisit', self._covisit_candidates, Config.COVISIT_CANDIDATES, Config.COVISIT_WEIGHT)
         
     def load_data(self, posts: List[Dict], users: List[Dict], interactions: List[Dict]):
         """데이터 로드 및 전처리"""
@@ -46,9 +118,21 @@ class RecommendationEngine:
                 
                 # TF-IDF 벡터화
                 if len(self.posts_df) > 0:
-                    self.tfidf_matrix = self.tfidf_vectorizer.fit_transform(
-                        self.posts_df['combined_text']
-                    )
+                    with MODEL_BUILD_SECONDS.labels(stage='tfidf').time():
+                        self.tfidf_matrix = self.tfidf_vectorizer.fit_transform(
+                            self.posts_df['combined_text']
+                        )
+            
+            # 응답 구성용 게시물 저장소 (post_id -> 위치, 위치 -> 응답 필드)
+            with MODEL_BUILD_SECONDS.labels(stage='post_store').time():
+                self._build_post_store()
+            with MODEL_BUILD_SECONDS.labels(stage='category_lists').time():
+                self._update_category_lists()
+            
+            # 임베딩/ANN 인덱스는 새 TF-IDF 기준으로 다시 생성해야 함
+            self.svd = None
+            self.post_embeddings = None
+            self.ann_index = None
             
             # 사용자 데이터
             self.users_df = pd.DataFrame(users) if users else pd.DataFrame()
@@ -59,6 +143,13 @@ class RecommendationEngine:
                 self.interactions_df['created_at'] = pd.to_datetime(
                     self.interactions_df['created_at']
                 )
+                self.interactions_df['log_weight'] = self._log_weights(self.interactions_df)
+            
+            with MODEL_BUILD_SECONDS.labels(stage='interaction_matrix').time():
+                self._build_history_index()
+                self._build_interaction_matrix()
+            
+            self.model_version += 1
             
             logger.info(f"Data loaded: {len(self.posts_df)} posts, "
                        f"{len(self.users_df)} users, "
@@ -68,6 +159,328 @@ class RecommendationEngine:
             logger.error(f"Error loading data: {e}")
             raise
     
+    def _build_post_store(self):
+        """캐시된 순위 목록(id/score)을 응답으로 복원하기 위한 게시물 저장소 구성"""
+        self.post_index = {}
+        self.post_payloads = []
+        self.post_json = []
+        self.post_ids = np.empty(0, dtype=np.int64)
+        self.post_popularity = np.empty(0, dtype=np.float32)
+        self.post_categories = np.empty(0, dtype=np.int64)
+        self.post_authors = np.empty(0, dtype=np.int64)
+        self.post_created = np.empty(0, dtype='datetime64[ns]')
+        self.post_deleted = np.empty(0, dtype=bool)
+        if self.posts_df is None or self.posts_df.empty:
+            return
+        
+        self._append_post_store(self.posts_df)
+    
+    def _append_post_store(self, posts_df: pd.DataFrame):
+        """게시물 저장소 뒤에 게시물 추가"""
+        offset = len(self.post_payloads)
+        for idx, post in enumerate(posts_df.itertuples(index=False), start=offset):
+            self.post_index[int(post.post_id)] = idx
+            payload = {
+                'post_id': int(post.post_id),
+                'title': post.title,
+                'category_id': int(post.category_id),
+                'likes_count': int(getattr(post, 'likes_count', 0)),
+                'views_count': int(getattr(post, 'views_count', 0)),
+                'created_at': post.created_at.isoformat()
+            }
+            self.post_payloads.append(payload)
+            self.post_json.append(orjson.dumps(payload)[:-1])
+        
+        # 인기 점수는 _get_popular_posts와 같은 식 (좋아요 x3 + 조회 x0.5 + 댓글 x2)
+        def column(name: str, dtype) -> np.ndarray:
+            if name not in posts_df:
+                return np.zeros(len(posts_df), dtype=dtype)
+            return posts_df[name].fillna(0).to_numpy(dtype=dtype)
+        
+        popularity = (
+            column('likes_count', np.float32) * 3 +
+            column('views_count', np.float32) * 0.5 +
+            column('comments_count', np.float32) * 2
+        )
+        self.post_ids = np.concatenate([self.post_ids, posts_df['post_id'].to_numpy(dtype=np.int64)])
+        self.post_popularity = np.concatenate([self.post_popularity, popularity])
+        self.post_categories = np.concatenate([self.post_categories, column('category_id', np.int64)])
+        self.post_authors = np.concatenate([
+            self.post_authors,
+            posts_df['user_id'].fillna(-1).to_numpy(dtype=np.int64) if 'user_id' in posts_df
+            else np.full(len(posts_df), -1, dtype=np.int64)
+        ])
+        self.post_created = np.concatenate([
+            self.post_created, posts_df['created_at'].to_numpy(dtype='datetime64[ns]')
+        ])
+        self.post_deleted = np.concatenate([self.post_deleted, np.zeros(len(posts_df), dtype=bool)])
+    
+    def embed_posts(self, dim: int = 128):
+        """TF-IDF를 절단 SVD로 dim차원 밀집 임베딩으로 투영 (L2 정규화, 연속 float32)"""
+        self.svd = None
+        self.post_embeddings = None
+        if self.tfidf_matrix is None or dim <= 0:
+            return
+        
+        dim = min(dim, min(self.tfidf_matrix.shape) - 1)
+        if dim < 1:
+            return
+        
+        with MODEL_BUILD_SECONDS.labels(stage='embed').time():
+            self.svd = TruncatedSVD(n_components=dim, random_state=42)
+            self.post_embeddings = self._normalize_embeddings(
+                self.svd.fit_transform(self.tfidf_matrix), self.dtype
+            )
+        logger.info(
+            f"Post embeddings: {self.post_embeddings.shape[1]} dims, "
+            f"explained variance {self.svd.explained_variance_ratio_.sum():.2f}"
+        )
+    
+    @property
+    def content_vectors(self):
+        """유사도 계산용 게시물 벡터 (임베딩이 있으면 밀집 임베딩, 없으면 TF-IDF)"""
+        return self.post_embeddings if self.post_embeddings is not None else self.tfidf_matrix
+    
+    def _embed(self, tfidf_rows):
+        """TF-IDF 행을 현재 벡터 공간으로 변환"""
+        if self.svd is None:
+            return tfidf_rows
+        return self._normalize_embeddings(self.svd.transform(tfidf_rows), self.dtype)
+    
+    @staticmethod
+    def _normalize_embeddings(embeddings: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        """L2 정규화 후 C 연속 배열로 변환 (내적 = 코사인 유사도)"""
+        return np.ascontiguousarray(normalize(embeddings), dtype=dtype)
+    
+    def build_ann_index(
+        self,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        exact_threshold: int = 5000,
+        path: Optional[str] = None,
+        quantize: bool = False,
+        rerank: int = 0
+    ):
+        """유사 게시물 검색용 ANN 인덱스 생성 (path가 있으면 같은 모델의 저장본 재사용 후 저장)"""
+        self.ann_index = None
+        if self.tfidf_matrix is None or not self.post_payloads:
+            return
+        
+        post_ids = self.posts_df['post_id'].to_numpy()
+        signature = self._content_signature()
+        
+        index = None
+        if path and os.path.exists(path):
+            try:
+                index = IVFIndex.load(path)
+            except Exception as e:
+                logger.warning(f"Failed to load ANN index from {path}: {e}")
+            if index is not None and (
+                index.signature != signature or
+                (index.quantize, index.rerank) != (quantize, rerank)
+            ):
+                index = None
+        
+        if index is None:
+            with MODEL_BUILD_SECONDS.labels(stage='ann_index').time():
+                index = IVFIndex(
+                    nlist, nprobe, exact_threshold, quantize=quantize, rerank=rerank
+                ).build(
+                    post_ids, self.content_vectors, signature
+                )
+        else:
+            index.nprobe = nprobe
+            logger.info(f"Reusing ANN index from {path}")
+        
+        if path:
+            index.save(path)
+        self.ann_index = index
+    
+    def add_posts(self, posts: List[Dict]) -> int:
+        """새 게시물을 재학습 없이 추가 (기존 TF-IDF 어휘로 변환 후 저장소/ANN 인덱스에 삽입)"""
+        if self.tfidf_matrix is None:
+            return 0
+        
+        posts = [post for post in posts if int(post['post_id']) not in self.post_index]
+        if not posts:
+            return 0
+        
+        new_posts = pd.DataFrame(posts)
+        new_posts['created_at'] = pd.to_datetime(new_posts['created_at'])
+        new_posts['combined_text'] = (
+            new_posts['title'].fillna('') + ' ' + 
+            new_posts['content'].fillna('')
+        )
+        vectors = self.tfidf_vectorizer.transform(new_posts['combined_text'])
+        
+        embeddings = self._embed(vectors)
+        
+        self.posts_df = pd.concat([self.posts_df, new_posts], ignore_index=True)
+        self.tfidf_matrix = sparse.vstack([self.tfidf_matrix, vectors], format='csr')
+        if self.post_embeddings is not None:
+            self.post_embeddings = np.vstack([self.post_embeddings, embeddings])
+        start = len(self.post_ids)
+        self._append_post_store(new_posts)
+        self._update_category_lists(start)
+        for matrix in (self.interaction_matrix, self.interaction_normalized, self.covisit_matrix):
+            if matrix is not None:
+                matrix.resize((matrix.shape[0], len(self.post_ids)))
+        if self.category_affinity is not None:
+            self.category_affinity.resize((self.category_affinity.shape[0], len(self.category_top)))
+        if self.ann_index is not None:
+            self.ann_index.add(new_posts['post_id'].to_numpy(), embeddings)
+        
+        return len(new_posts)
+    
+    def add_interactions(self, interactions: List[Dict]) -> int:
+        """
+        새 상호작용을 전체 재빌드 없이 추가 (이벤트 수집/증분 로드)
+        
+        로그 가중치는 고정 기준 시각 기준이라 기존 행은 다시 계산하지 않고, 새 행의 가중치만
+        매트릭스에 더한다. 사용자별 이력은 해당 사용자만 병합한다. ALS 요인은 다음 전체 로드에서 반영된다.
+        """
+        if not interactions:
+            return 0
+        
+        new_rows = pd.DataFrame(interactions)
+        new_rows['created_at'] = pd.to_datetime(new_rows['created_at'])
+        new_rows['log_weight'] = self._log_weights(new_rows)
+        self.interactions_df = pd.concat([self.interactions_df, new_rows], ignore_index=True)
+        
+        if self.interaction_matrix is None:
+            self._build_history_index()
+            self._build_interaction_matrix()
+            return len(new_rows)
+        
+        positions = new_rows['post_id'].map(self.post_index)
+        known = new_rows[positions.notna()]
+        positions = positions.dropna().to_numpy(dtype=np.int64)
+        for user_id in known['user_id'].unique():
+            self.interaction_users.setdefault(int(user_id), len(self.interaction_users))
+        rows = known['user_id'].map(self.interaction_users).to_numpy(dtype=np.int64)
+        self._merge_history(
+            known['user_id'].to_numpy(dtype=np.int64),
+            positions,
+            known['created_at'].to_numpy(dtype='datetime64[ns]')
+        )
+        shape = (len(self.interaction_users), len(self.post_ids))
+        delta = sparse.csr_matrix(
+            (self._stored_weights(known['log_weight']), (rows, positions)),
+            shape=shape
+        )
+        matrix = self.interaction_matrix.copy()
+        matrix.resize(shape)
+        self._set_interaction_matrix(matrix + delta)
+        
+        affinity = self.category_affinity.copy()
+        affinity.resize((shape[0], len(self.category_top)))
+        self.category_affinity = affinity + self._category_counts(rows, positions, shape[0])
+        return len(new_rows)
+    
+    def remove_posts(self, post_ids: List[int]) -> int:
+        """삭제된 게시물을 추천/응답에서 제외 (다음 로드 전까지 마스크로 처리)"""
+        positions = [self.post_index[post_id] for post_id in post_ids if post_id in self.post_index]
+        positions = [idx for idx in positions if not self.post_deleted[idx]]
+        self.post_deleted[positions] = True
+        return len(positions)
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """모델 구성 요소별 메모리 크기 (바이트)"""
+        def frame_bytes(df: Optional[pd.DataFrame]) -> int:
+            return int(df.memory_usage(deep=True).sum()) if df is not None else 0
+        
+        def csr_bytes(matrix: Optional[sparse.csr_matrix]) -> int:
+            if matrix is None:
+                return 0
+            return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        
+        tfidf = self.tfidf_matrix
+        return {
+            'posts_df': frame_bytes(self.posts_df),
+            'interactions_df': frame_bytes(self.interactions_df),
+            'tfidf_matrix': csr_bytes(tfidf),
+            'interaction_matrix': sum(
+                csr_bytes(matrix)
+                for matrix in (self.interaction_matrix, self.interaction_normalized, self.covisit_matrix)
+            ),
+            'history_index': (
+                self.history_indptr.nbytes + self.history_positions.nbytes + self.history_created.nbytes
+            ),
+            'category_lists': (
+                sum(top.nbytes for top in self.category_top) +
+                self.post_category_codes.nbytes +
+                csr_bytes(self.category_affinity)
+            ),
+            'post_embeddings': self.post_embeddings.nbytes if self.post_embeddings is not None else 0,
+            'als': self.als_model.nbytes if self.als_model is not None else 0,
+            'ann_index': self.ann_index.nbytes if self.ann_index is not None else 0,
+            'post_json': sum(len(fragment) for fragment in self.post_json)
+        }
+    
+    def _content_signature(self) -> str:
+        """TF-IDF 모델 식별값 (어휘 + IDF) - 저장된 인덱스 재사용 판단용"""
+        digest = hashlib.sha1()
+        for term, column in sorted(self.tfidf_vectorizer.vocabulary_.items()):
+            digest.update(f"{term}:{column};".encode())
+        digest.update(self.tfidf_vectorizer.idf_.tobytes())
+        digest.update(self.posts_df['post_id'].to_numpy(dtype=np.int64).tobytes())
+        if self.svd is not None:
+            digest.update(self.svd.components_.tobytes())
+        return digest.hexdigest()
+    
+    def hydrate(
+        self,
+        post_ids: np.ndarray,
+        scores: np.ndarray,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """순위 목록(id/score)을 메모리 내 게시물 정보로 응답 형식 복원"""
+        recommendations = []
+        for post_id, score in zip(post_ids, scores):
+            idx = self.post_index.get(int(post_id))
+            if idx is None or self.post_deleted[idx]:
+                continue
+            recommendations.append({**self.post_payloads[idx], 'score': float(score)})
+            if limit is not None and len(recommendations) >= limit:
+                break
+        return recommendations
+    
+    def hydrate_json(
+        self,
+        post_ids: np.ndarray,
+        scores: np.ndarray,
+        limit: Optional[int] = None
+    ) -> bytes:
+        """hydrate와 같은 응답을 JSON 바이트로 바로 구성 (게시물 JSON 조각 + score만 인코딩)"""
+        return self.page_json(post_ids, scores, 0, len(post_ids) if limit is None else limit)[0]
+    
+    def page_json(
+        self,
+        post_ids: np.ndarray,
+        scores: np.ndarray,
+        offset: int,
+        limit: int,
+        skip_ids: Sequence[int] = ()
+    ) -> Tuple[bytes, int]:
+        """
+        순위 목록의 offset부터 limit개를 JSON 배열로 구성 (피드 페이지)
+        
+        삭제된 게시물과 skip_ids는 건너뛰고, 읽은 만큼만 진행하므로 비용은 페이지 크기에 비례한다.
+        반환값은 (JSON 바이트, 다음 페이지 시작 위치).
+        """
+        skip = set(int(post_id) for post_id in skip_ids)
+        items = []
+        position = offset
+        while position < len(post_ids) and len(items) < limit:
+            post_id = int(post_ids[position])
+            score = scores[position]
+            position += 1
+            idx = self.post_index.get(post_id)
+            if idx is None or self.post_deleted[idx] or post_id in skip:
+                continue
+            items.append(self.post_json[idx] + b',"score":' + orjson.dumps(float(score)) + b'}')
+        return b'[' + b','.join(items) + b']', position
+    
     def get_content_based_recommendations(
         self, 
         post_id: int, 
@@ -78,6 +491,17 @@ class RecommendationEngine:
             if self.posts_df is None or self.tfidf_matrix is None:
                 return []
             
+            if self.ann_index is not None:
+                if post_id not in self.ann_index:
+                    logger.warning(f"Post {post_id} not found")
+                    return []
+                
+                post_ids, scores = self.ann_index.search_by_id(post_id, top_n)
+                recommendations = self.hydrate(post_ids, scores)
+                for rec in recommendations:
+                    rec['similarity_score'] = rec.pop('score')
+                return recommendations
+            
             # 해당 게시물의 인덱스 찾기
             post_idx = self.posts_df[self.posts_df['post_id'] == post_id].index
             if len(post_idx) == 0:
@@ -86,11 +510,14 @@ class RecommendationEngine:
             
             post_idx = post_idx[0]
             
-            # 코사인 유사도 계산
-            cosine_sim = cosine_similarity(
-                self.tfidf_matrix[post_idx:post_idx+1],
-                self.tfidf_matrix
-            ).flatten()
+            # 코사인 유사도 계산 (정규화된 밀집 임베딩이면 내적 1회)
+            if self.post_embeddings is not None:
+                cosine_sim = self.post_embeddings @ self.post_embeddings[post_idx]
+            else:
+                cosine_sim = cosine_similarity(
+                    self.tfidf_matrix[post_idx:post_idx+1],
+                    self.tfidf_matrix
+                ).flatten()
             
             # 유사도 점수로 정렬 (자기 자신 제외)
             similar_indices = cosine_sim.argsort()[-top_n-1:-1][::-1]
@@ -120,200 +547,323 @@ class RecommendationEngine:
         user_id: int, 
         top_n: int = 10
     ) -> List[Dict]:
-        """협업 필터링 - 사용자 기반 추천"""
+        """협업 필터링 - 사용자 기반 추천 (로드 시 만든 가중치 CSR, 감쇠는 질의 시점 배율 1회)"""
         try:
-            if self.interactions_df is None or self.interactions_df.empty:
-                return self._get_popular_posts(top_n)
-            
-            # 사용자-게시물 상호작용 매트릭스 생성
-            user_item_matrix = self._create_user_item_matrix()
-            
-            # 해당 사용자의 인덱스 찾기
-            if user_id not in user_item_matrix.index:
+            row = self.interaction_users.get(user_id)
+            if row is None or self.interaction_normalized is None:
                 logger.info(f"User {user_id} not in matrix, returning popular posts")
                 return self._get_popular_posts(top_n)
             
-            # 사용자 간 유사도 계산
-            user_similarity = self._calculate_user_similarity(user_item_matrix)
-            
-            # 추천 점수 계산
-            recommendations = self._calculate_recommendation_scores(
-                user_id, 
-                user_item_matrix, 
-                user_similarity,
-                top_n
-            )
-            
-            return recommendations
+            # 이웃 가중합에서 이미 본 게시물/삭제된 게시물 제외
+            scores = self._neighbour_scores(row)
+            scores[self.interaction_matrix[row].indices] = 0
+            positions = np.flatnonzero(scores > 0)
+            positions = positions[~self.post_deleted[positions]]
+            top = positions[top_k(scores[positions], top_n)]
+            return self.hydrate(self.post_ids[top], scores[top])
             
         except Exception as e:
             logger.error(f"Error in collaborative recommendations: {e}")
             return self._get_popular_posts(top_n)
     
-    def get_hybrid_recommendations(
+    def fit_factorization(self, **params):
+        """암시적 피드백 ALS 학습 (params는 ImplicitALS 인자)"""
+        self.als_model = None
+        if self.interactions_df is None or self.interactions_df.empty:
+            return
+        
+        if self.interaction_matrix is None or self.interaction_matrix.nnz == 0:
+            return
+        
+        # 저장된 가중치 CSR에서 상호작용이 있는 게시물 열만, 현재 시점 감쇠 배율은 스칼라로 한 번 곱함
+        columns = np.flatnonzero(self.interaction_matrix.getnnz(axis=0))
+        matrix = (self.interaction_matrix[:, columns] * self.decay_normalizer()).astype(self.dtype)
+        
+        with MODEL_BUILD_SECONDS.labels(stage='als').time():
+            self.als_model = ImplicitALS(**params).fit(matrix)
+        self.als_user_index = dict(self.interaction_users)
+        self.als_post_ids = self.post_ids[columns]
+    
+    def get_als_recommendations(
         self, 
         user_id: int, 
-        top_n: int = 10,
-        collaborative_weight: float = 0.6,
-        content_weight: float = 0.4
+        top_n: int = 10
     ) -> List[Dict]:
-        """하이브리드 추천 - 협업 + 콘텐츠 기반"""
+        """행렬 분해 협업 필터링 - 사용자 요인 x 아이템 요인 1회 곱 + 상위 N개"""
         try:
-            # 사용자가 최근에 본 게시물들 가져오기
-            user_interactions = self.interactions_df[
-                self.interactions_df['user_id'] == user_id
-            ].sort_values('created_at', ascending=False)
-            
-            if len(user_interactions) == 0:
+            if self.als_model is None or user_id not in self.als_user_index:
+                # 요인 학습 이후 상호작용이 추가된 사용자는 선호 카테고리 인기 게시물
                 return self._get_personalized_popular_posts(user_id, top_n)
             
-            # 협업 필터링 점수
-            collab_recs = self.get_collaborative_recommendations(user_id, top_n * 2)
-            collab_scores = {
-                rec['post_id']: rec['score'] 
-                for rec in collab_recs
-            }
-            
-            # 최근 본 게시물 기반 콘텐츠 추천
-            recent_post_id = user_interactions.iloc[0]['post_id']
-            content_recs = self.get_content_based_recommendations(recent_post_id, top_n * 2)
-            content_scores = {
-                rec['post_id']: rec['similarity_score']
-                for rec in content_recs
-            }
-            
-            # 하이브리드 점수 계산
-            all_post_ids = set(collab_scores.keys()) | set(content_scores.keys())
-            hybrid_scores = {}
-            
-            for post_id in all_post_ids:
-                collab_score = collab_scores.get(post_id, 0)
-                content_score = content_scores.get(post_id, 0)
-                
-                hybrid_scores[post_id] = (
-                    collaborative_weight * collab_score +
-                    content_weight * content_score
-                )
-            
-            # 상위 N개 선택
-            top_posts = sorted(
-                hybrid_scores.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:top_n]
-            
-            # 결과 구성
-            recommendations = []
-            for post_id, score in top_posts:
-                post = self.posts_df[self.posts_df['post_id'] == post_id].iloc[0]
-                recommendations.append({
-                    'post_id': int(post_id),
-                    'title': post['title'],
-                    'score': float(score),
-                    'category_id': int(post['category_id']),
-                    'likes_count': int(post.get('likes_count', 0)),
-                    'views_count': int(post.get('views_count', 0)),
-                    'created_at': post['created_at'].isoformat()
-                })
-            
-            return recommendations
+            positions, scores = self.als_model.recommend(self.als_user_index[user_id], top_n)
+            return self.hydrate(self.als_post_ids[positions], scores)
             
         except Exception as e:
-            logger.error(f"Error in hybrid recommendations: {e}")
+            logger.error(f"Error in ALS recommendations: {e}")
             return self._get_popular_posts(top_n)
     
-    def _create_user_item_matrix(self) -> pd.DataFrame:
-        """사용자-게시물 상호작용 매트릭스 생성"""
-        # 상호작용 가중치 (좋아요 > 댓글 > 조회)
-        interaction_weights = {
-            'like': 3.0,
-            'comment': 2.0,
-            'view': 1.0
-        }
+    def get_hybrid_recommendations(
+        self, 
+        user_id: int, 
+        top_n: int = 10,
+        collaborative_weight: float = 0.6,
+        content_weight: float = 0.4,
+        blocked_user_ids: Sequence[int] = ()
+    ) -> List[Dict]:
+        """하이브리드 추천 - 다중 소스 후보 파이프라인 결과를 응답 형식으로 구성"""
+        post_ids, scores = self.rank_hybrid(
+            user_id,
+            top_n,
+            blocked_user_ids,
+            weights={'cf': collaborative_weight, 'content': content_weight}
+        )
+        return self.hydrate(post_ids, scores)
+    
+    def rank_hybrid(
+        self,
+        user_id: int,
+        top_n: int = 10,
+        blocked_user_ids: Sequence[int] = (),
+        weights: Optional[Dict[str, float]] = None,
+        min_budget: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        하이브리드 순위 (post_id 배열, 점수 배열)
+        
+        후보 소스(cf, content, trending, category, covisit)를 예산만큼 실행하고 합집합을 한 번에
+        랭킹한다. 본 게시물/삭제된 게시물/차단한 사용자의 게시물은 제외 마스크로 거른다.
+        min_budget은 소스별 예산 하한으로, 피드처럼 깊은 목록을 만들 때 top_n과 같이 준다.
+        """
+        with self.pipeline.timed('context'):
+            history = self._user_history(user_id)
+        with self.pipeline.timed('filter'):
+            excluded = self._exclusion_mask(history, blocked_user_ids)
         
-        # 가중치 적용
-        interactions = self.interactions_df.copy()
-        interactions['weight'] = interactions['interaction_type'].map(
-            interaction_weights
-        ).fillna(1.0)
-        
-        # 시간 감쇠 적용 (최근 상호작용에 더 높은 가중치)
-        now = datetime.now()
-        interactions['days_ago'] = (
-            now - interactions['created_at']
-        ).dt.days
-        interactions['time_weight'] = np.exp(-interactions['days_ago'] / 30.0)
-        
-        interactions['final_weight'] = (
-            interactions['weight'] * interactions['time_weight']
+        positions, scores = self.pipeline.run(PipelineRequest(user_id, history, excluded), top_n, weights, min_budget)
+        return self.post_ids[positions], scores
+    
+    def excluded_post_ids(self, user_id: int, blocked_user_ids: Sequence[int] = ()) -> np.ndarray:
+        """추천에서 뺄 게시물 ID (본 게시물, 삭제된 게시물, 차단한 사용자의 게시물)"""
+        return self.post_ids[self._exclusion_mask(self._user_history(user_id), blocked_user_ids)]
+    
+    def _exclusion_mask(self, history: np.ndarray, blocked_user_ids: Sequence[int]) -> np.ndarray:
+        """게시물 위치별 제외 여부 (삭제 + 이력 + 차단한 사용자의 게시물)"""
+        excluded = self.post_deleted.copy()
+        excluded[history] = True
+        if len(blocked_user_ids):
+            excluded |= np.isin(self.post_authors, np.asarray(blocked_user_ids, dtype=np.int64))
+        return excluded
+    
+    def _user_history(self, user_id: int) -> np.ndarray:
+        """사용자가 상호작용한 게시물 위치 (최신순, 로드된 게시물만) - 인덱스 구간 슬라이스"""
+        return self._history_slice(user_id)[0]
+    
+    def recent_post_id(self, user_id: int, days: int = 30) -> Optional[int]:
+        """최근 N일 안에 가장 마지막으로 상호작용한 게시물 ID (없으면 None)"""
+        positions, created = self._history_slice(user_id)
+        if len(positions) == 0 or created[0] < np.datetime64(datetime.now() - timedelta(days=days)):
+            return None
+        return int(self.post_ids[positions[0]])
+    
+    def seen_since(self, user_id: int, since: datetime) -> np.ndarray:
+        """since 이후 상호작용한 게시물 ID (이력이 최신순이라 앞부분)"""
+        positions, created = self._history_slice(user_id)
+        count = np.count_nonzero(created >= np.datetime64(since, 'ns'))
+        return self.post_ids[positions[:count]]
+    
+    def _history_slice(self, user_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """사용자 이력 (게시물 위치, 상호작용 시각), 최신순"""
+        updated = self.history_updates.get(user_id)
+        if updated is not None:
+            return updated
+        
+        row = self.history_users.get(user_id)
+        if row is None:
+            return self.history_positions[:0], self.history_created[:0]
+        start, end = self.history_indptr[row:row + 2]
+        return self.history_positions[start:end], self.history_created[start:end]
+    
+    def _build_history_index(self):
+        """
+        사용자별 이력 CSR 인덱스
+        
+        interactions_df를 (user_id, 최신순)으로 한 번 정렬해 사용자별 이력을 연속 구간으로 만들고,
+        구간 시작 위치(history_indptr)만 저장한다.
+        """
+        self.history_users = {}
+        self.history_indptr = np.zeros(1, dtype=np.int64)
+        self.history_positions = np.empty(0, dtype=np.int64)
+        self.history_created = np.empty(0, dtype='datetime64[ns]')
+        self.history_updates = {}
+        if self.interactions_df is None or self.interactions_df.empty:
+            return
+        
+        self.interactions_df = self.interactions_df.sort_values(
+            ['user_id', 'created_at'], ascending=[True, False], ignore_index=True
         )
+        positions = self.interactions_df['post_id'].map(self.post_index)
+        loaded = positions.notna().to_numpy()
+        user_ids = self.interactions_df['user_id'].to_numpy(dtype=np.int64)[loaded]
+        users, starts = np.unique(user_ids, return_index=True)
+        self.history_users = {int(user_id): row for row, user_id in enumerate(users)}
+        self.history_indptr = np.append(starts, len(user_ids)).astype(np.int64)
+        self.history_positions = positions[loaded].to_numpy(dtype=np.int64)
+        self.history_created = self.interactions_df['created_at'].to_numpy(dtype='datetime64[ns]')[loaded]
+    
+    def _merge_history(self, user_ids: np.ndarray, positions: np.ndarray, created: np.ndarray):
+        """추가된 상호작용을 해당 사용자 이력에 병합 (최신순 유지)"""
+        for user_id in np.unique(user_ids):
+            mine = user_ids == user_id
+            old_positions, old_created = self._history_slice(int(user_id))
+            merged_positions = np.concatenate([positions[mine], old_positions])
+            merged_created = np.concatenate([created[mine], old_created])
+            order = np.argsort(-merged_created.view(np.int64), kind='stable')
+            self.history_updates[int(user_id)] = (merged_positions[order], merged_created[order])
+    
+    def _build_interaction_matrix(self):
+        """사용자 x 게시물 위치 가중치 CSR (행 정규화본, 이진 동시 조회본 포함)"""
+        self.interaction_matrix = None
+        self.interaction_normalized = None
+        self.covisit_matrix = None
+        self.category_affinity = None
+        self.interaction_users = {}
+        if self.interactions_df is None or self.interactions_df.empty or not self.post_index:
+            return
         
-        # 피벗 테이블 생성
-        matrix = interactions.pivot_table(
-            index='user_id',
-            columns='post_id',
-            values='final_weight',
-            aggfunc='sum',
-            fill_value=0
+        interactions = self.interactions_df
+        positions = interactions['post_id'].map(self.post_index)
+        interactions = interactions[positions.notna()]
+        # 스냅샷 동안 고정되는 기준값 (증분 추가 행도 같은 기준으로 저장)
+        self.interaction_scale = float(interactions['log_weight'].max()) if len(interactions) else 0.0
+        positions = positions.dropna().to_numpy(dtype=np.int64)
+        user_codes, user_ids = pd.factorize(interactions['user_id'])
+        matrix = sparse.csr_matrix(
+            (self._stored_weights(interactions['log_weight']), (user_codes, positions)),
+            shape=(len(user_ids), len(self.post_ids))
         )
         
-        return matrix
+        self._set_interaction_matrix(matrix)
+        self.category_affinity = self._category_counts(user_codes, positions, len(user_ids))
+        self.interaction_users = {int(user_id): idx for idx, user_id in enumerate(user_ids)}
     
-    def _calculate_user_similarity(self, matrix: pd.DataFrame) -> pd.DataFrame:
-        """사용자 간 유사도 계산"""
-        # 코사인 유사도
-        similarity = cosine_similarity(matrix)
-        similarity_df = pd.DataFrame(
-            similarity,
-            index=matrix.index,
-            columns=matrix.index
-        )
-        return similarity_df
+    def _set_interaction_matrix(self, matrix: sparse.csr_matrix):
+        """가중치 CSR과 파생 행렬(행 정규화본, 이진 동시 조회본) 교체"""
+        matrix.sum_duplicates()
+        self.interaction_matrix = matrix
+        self.interaction_normalized = normalize(matrix).astype(self.dtype)
+        self.covisit_matrix = matrix.copy()
+        self.covisit_matrix.data[:] = 1
     
-    def _calculate_recommendation_scores(
-        self,
-        user_id: int,
-        user_item_matrix: pd.DataFrame,
-        user_similarity: pd.DataFrame,
-        top_n: int
-    ) -> List[Dict]:
-        """추천 점수 계산"""
-        # 유사한 사용자들 찾기
-        similar_users = user_similarity[user_id].sort_values(ascending=False)[1:11]
-        
-        # 해당 사용자가 이미 본 게시물 제외
-        user_items = user_item_matrix.loc[user_id]
-        already_interacted = user_items[user_items > 0].index.tolist()
-        
-        # 추천 점수 계산
-        scores = {}
-        for similar_user_id, similarity_score in similar_users.items():
-            similar_user_items = user_item_matrix.loc[similar_user_id]
-            
-            for post_id, interaction_weight in similar_user_items.items():
-                if post_id not in already_interacted and interaction_weight > 0:
-                    if post_id not in scores:
-                        scores[post_id] = 0
-                    scores[post_id] += similarity_score * interaction_weight
+    def _cf_candidates(self, request: PipelineRequest, budget: int) -> Tuple[np.ndarray, np.ndarray]:
+        """협업 이웃 후보: 유사 사용자 10명의 상호작용 가중합 (희소 행렬 곱)"""
+        row = self.interaction_users.get(request.user_id)
+        if row is None or self.interaction_normalized is None:
+            return no_candidates()
         
-        # 상위 N개 선택
-        top_posts = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
+        scores = self._neighbour_scores(row)
+        positions = np.flatnonzero(scores > 0)
+        positions = positions[request.keep(positions)]
+        top = top_k(scores[positions], budget)
+        return positions[top], scores[positions[top]]
+    
+    def _neighbour_scores(self, row: int) -> np.ndarray:
+        """게시물 위치별 유사 사용자 10명의 상호작용 가중합 (저장 값 희소 곱 x 현재 시점 감쇠 배율)"""
+        similarity = (self.interaction_normalized @ self.interaction_normalized[row].T).toarray().ravel()
+        similarity[row] = 0
+        neighbours = top_k(similarity, 10)
+        neighbours = neighbours[similarity[neighbours] > 0]
+        if len(neighbours) == 0:
+            return np.zeros(self.interaction_matrix.shape[1])
         
-        # 결과 구성
-        recommendations = []
-        for post_id, score in top_posts:
-            post = self.posts_df[self.posts_df['post_id'] == post_id].iloc[0]
-            recommendations.append({
-                'post_id': int(post_id),
-                'title': post['title'],
-                'score': float(score),
-                'category_id': int(post['category_id']),
-                'likes_count': int(post.get('likes_count', 0)),
-                'views_count': int(post.get('views_count', 0)),
-                'created_at': post['created_at'].isoformat()
-            })
+        return np.asarray(
+            self.interaction_matrix[neighbours].T @ similarity[neighbours]
+        ).ravel() * self.decay_normalizer()
+    
+    def _content_candidates(self, request: PipelineRequest, budget: int) -> Tuple[np.ndarray, np.ndarray]:
+        """콘텐츠 이웃 후보: 가장 최근 상호작용 게시물과 유사한 게시물"""
+        if len(request.history) == 0 or self.tfidf_matrix is None:
+            return no_candidates()
         
-        return recommendations
+        seed = int(request.history[0])
+        # 제외될 후보를 감안해 예산의 2배를 조회
+        if self.ann_index is not None:
+            post_ids, scores = self.ann_index.search_by_id(int(self.post_ids[seed]), budget * 2)
+            positions = np.fromiter(
+                (self.post_index.get(int(post_id), -1) for post_id in post_ids),
+                dtype=np.int64,
+                count=len(post_ids)
+            )
+            found = positions >= 0
+            positions, scores = positions[found], scores[found]
+        else:
+            if self.post_embeddings is not None:
+                similarity = self.post_embeddings @ self.post_embeddings[seed]
+            else:
+                similarity = (self.tfidf_matrix @ self.tfidf_matrix[seed].T).toarray().ravel()
+            similarity[seed] = 0
+            positions = top_k(similarity, budget * 2)
+            scores = similarity[positions]
+        
+        keep = request.keep(positions)
+        return positions[keep], scores[keep]
+    
+    def _trending_candidates(self, request: PipelineRequest, budget: int) -> Tuple[np.ndarray, np.ndarray]:
+        """트렌딩 후보: 최근 7일 게시물 인기순 (없으면 전체)"""
+        recent = self.post_created >= np.datetime64(datetime.now() - timedelta(days=7))
+        if not recent.any():
+            recent = np.ones(len(self.post_ids), dtype=bool)
+        positions = np.flatnonzero(recent & ~request.excluded)
+        top = top_k(self.post_popularity[positions], budget)
+        return positions[top], self.post_popularity[positions[top]]
+    
+    def _category_candidates(self, request: PipelineRequest, budget: int) -> Tuple[np.ndarray, np.ndarray]:
+        """카테고리 인기 후보: 상호작용이 많은 상위 3개 카테고리의 인기 목록 병합"""
+        positions = self._category_popular(self._preferred_categories(request.user_id), request.excluded, budget)
+        return positions, self.post_popularity[positions]
+    
+    def _covisit_candidates(self, request: PipelineRequest, budget: int) -> Tuple[np.ndarray, np.ndarray]:
+        """동시 조회 후보: 최근 게시물 10개를 함께 본 사용자들이 본 게시물 (공동 사용자 수)"""
+        if len(request.history) == 0 or self.covisit_matrix is None:
+            return no_candidates()
+        
+        _, first = np.unique(request.history, return_index=True)
+        seeds = request.history[np.sort(first)][:10]
+        seed_vector = np.zeros(self.covisit_matrix.shape[1], dtype=self.dtype)
+        seed_vector[seeds] = 1
+        
+        co_users = self.covisit_matrix @ seed_vector
+        own_row = self.interaction_users.get(request.user_id)
+        if own_row is not None:
+            co_users[own_row] = 0
+        scores = self.covisit_matrix.T @ co_users
+        positions = np.flatnonzero(scores > 0)
+        positions = positions[request.keep(positions)]
+        top = top_k(scores[positions], budget)
+        return positions[top], scores[positions[top]]
+    
+    def _log_weights(self, interactions: pd.DataFrame) -> np.ndarray:
+        """
+        상호작용별 로그 가중치: log(유형 가중치) + (상호작용 시각 - 기준 시각) / TIME_DECAY_DAYS
+        
+        기준 시각이 고정이라 한 번 계산한 값은 시간이 지나도 바뀌지 않는다.
+        현재 가중치 = exp(로그 가중치 - decay_offset()) = 유형 가중치 x exp(-경과일 / TIME_DECAY_DAYS)
+        """
+        weights = interactions['interaction_type'].map(INTERACTION_TYPE_WEIGHTS).fillna(1.0)
+        days = (interactions['created_at'] - self.decay_epoch) / pd.Timedelta(days=1)
+        return (np.log(weights) + days / Config.TIME_DECAY_DAYS).to_numpy(dtype=np.float64)
+    
+    def decay_offset(self, now: Optional[datetime] = None) -> float:
+        """질의 시점의 로그 정규화 값 ((현재 시각 - 기준 시각) / TIME_DECAY_DAYS)"""
+        days = (pd.Timestamp(now or datetime.now()) - self.decay_epoch) / pd.Timedelta(days=1)
+        return days / Config.TIME_DECAY_DAYS
+    
+    def decay_normalizer(self, now: Optional[datetime] = None) -> float:
+        """매트릭스 저장 값에 곱하면 현재 시점의 감쇠 가중치가 되는 배율"""
+        return float(np.exp(self.interaction_scale - self.decay_offset(now)))
+    
+    def _stored_weights(self, log_weights: pd.Series) -> np.ndarray:
+        """매트릭스 저장 값 exp(로그 가중치 - 스냅샷 기준값) (시간이 지나도 그대로)"""
+        return np.exp(log_weights.to_numpy(dtype=np.float64) - self.interaction_scale).astype(self.dtype)
     
     def _get_popular_posts(self, top_n: int = 10) -> List[Dict]:
         """인기 게시물 반환 (fallback)"""
@@ -357,54 +907,74 @@ class RecommendationEngine:
         user_id: int, 
         top_n: int = 10
     ) -> List[Dict]:
-        """개인화된 인기 게시물 (사용자 선호 카테고리 기반)"""
-        # 사용자가 선호하는 카테고리 파악
-        user_interactions = self.interactions_df[
-            self.interactions_df['user_id'] == user_id
-        ]
-        
-        if len(user_interactions) > 0:
-            # 선호 카테고리 추출
-            preferred_categories = (
-                user_interactions
-                .merge(self.posts_df[['post_id', 'category_id']], on='post_id')
-                .groupby('category_id')
-                .size()
-                .nlargest(3)
-                .index.tolist()
-            )
-            
-            # 선호 카테고리의 인기 게시물
-            category_posts = self.posts_df[
-                self.posts_df['category_id'].isin(preferred_categories)
-            ]
-            
-            if len(category_posts) > 0:
-                category_posts = category_posts.copy()
-                category_posts['popularity_score'] = (
-                    category_posts['likes_count'] * 3 +
-                    category_posts['views_count'] * 0.5 +
-                    category_posts.get('comments_count', 0) * 2
-                )
-                
-                top_posts = category_posts.nlargest(top_n, 'popularity_score')
-                
-                recommendations = []
-                for _, post in top_posts.iterrows():
-                    recommendations.append({
-                        'post_id': int(post['post_id']),
-                        'title': post['title'],
-                        'score': float(post['popularity_score']),
-                        'category_id': int(post['category_id']),
-                        'likes_count': int(post['likes_count']),
-                        'views_count': int(post['views_count']),
-                        'created_at': post['created_at'].isoformat()
-                    })
-                
-                return recommendations
+        """개인화된 인기 게시물 (선호 카테고리 최대 3개의 미리 만든 인기 목록 병합)"""
+        positions = self._category_popular(self._preferred_categories(user_id), self.post_deleted, top_n)
+        if len(positions) > 0:
+            return self.hydrate(self.post_ids[positions], self.post_popularity[positions])
         
         return self._get_popular_posts(top_n)
+    
+    def _update_category_lists(self, start: int = 0):
+        """
+        카테고리별 인기순 게시물 위치 목록 갱신
+        
+        start 이후 위치의 게시물을 해당 카테고리 목록에 병합한다 (0이면 전체 재구성).
+        인기 점수는 스냅샷 동안 고정이라 기존 상위 목록 밖의 게시물은 다시 볼 필요가 없다.
+        """
+        if start == 0:
+            self.category_index = {}
+            self.category_top = []
+        
+        categories = self.post_categories[start:]
+        for category_id in np.unique(categories):
+            if int(category_id) not in self.category_index:
+                self.category_index[int(category_id)] = len(self.category_top)
+                self.category_top.append(np.empty(0, dtype=np.int64))
+        self.category_ids = np.fromiter(self.category_index, dtype=np.int64, count=len(self.category_index))
+        
+        order = np.argsort(self.category_ids)
+        codes = order[np.searchsorted(self.category_ids[order], categories)]
+        self.post_category_codes = np.concatenate([self.post_category_codes[:start], codes])
+        
+        # 인기순으로 정렬한 뒤 카테고리 열로 안정 정렬 -> 열별 구간이 인기순
+        positions = np.arange(start, len(self.post_ids))
+        by_popularity = positions[np.argsort(-self.post_popularity[positions], kind='stable')]
+        grouped = by_popularity[np.argsort(self.post_category_codes[by_popularity], kind='stable')]
+        bounds = np.searchsorted(self.post_category_codes[grouped], np.arange(len(self.category_top) + 1))
+        for column in np.unique(codes):
+            merged = np.concatenate([self.category_top[column], grouped[bounds[column]:bounds[column + 1]]])
+            merged = merged[np.argsort(-self.post_popularity[merged], kind='stable')]
+            self.category_top[column] = merged[:Config.CATEGORY_TOP_N]
+    
+    def _category_counts(self, rows: np.ndarray, positions: np.ndarray, num_users: int) -> sparse.csr_matrix:
+        """사용자 행 x 카테고리 열 상호작용 수 CSR"""
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, self.post_category_codes[positions])),
+            shape=(num_users, len(self.category_top))
+        )
+        counts.sum_duplicates()
+        return counts
+    
+    def _preferred_categories(self, user_id: int, count: int = 3) -> np.ndarray:
+        """상호작용이 많은 카테고리 열 (상위 count개, 같으면 카테고리 ID 순)"""
+        row = self.interaction_users.get(user_id)
+        if row is None or self.category_affinity is None:
+            return np.empty(0, dtype=np.int64)
+        
+        start, end = self.category_affinity.indptr[row:row + 2]
+        columns = self.category_affinity.indices[start:end]
+        counts = self.category_affinity.data[start:end]
+        return columns[np.lexsort((self.category_ids[columns], -counts))[:count]]
+    
+    def _category_popular(self, columns: np.ndarray, excluded: np.ndarray, limit: int) -> np.ndarray:
+        """카테고리 열들의 인기 목록을 병합한 상위 limit개 게시물 위치 (excluded: 위치별 제외 마스크)"""
+        if len(columns) == 0:
+            return np.empty(0, dtype=np.int64)
+        
+        positions = np.concatenate([self.category_top[column] for column in columns])
+        positions = positions[~excluded[positions]]
+        return positions[top_k(self.post_popularity[positions], limit)]
 
 
 # 싱글톤 인스턴스
-recommendation_engine = RecommendationEngine()
+recommendation_engine = RecommendationEngine(dtype=Config.MODEL_DTYPE)
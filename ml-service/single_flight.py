@@ -0,0 +1,110 @@
+"""
+Single-flight request coalescing
+캐시 미스 시 동일 키에 대한 동시 계산을 하나로 합침
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+import logging
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    키별 단일 실행 보장
+
+    같은 키로 동시에 들어온 요청 중 첫 요청만 계산을 수행하고 나머지는
+    그 결과를 공유한다. SINGLE_FLIGHT_REDIS_LOCK 사용 시 Redis 락으로
+    여러 워커 프로세스 간에도 계산을 하나로 합친다.
+    """
+
+    def __init__(self, cache: Optional[Any] = None):
+        self.cache = cache
+        self.distributed = Config.SINGLE_FLIGHT_REDIS_LOCK
+        self.lock_ttl = Config.SINGLE_FLIGHT_LOCK_TTL
+        self.wait_timeout = Config.SINGLE_FLIGHT_WAIT_TIMEOUT
+        self.poll_interval = 0.05
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, int] = {
+            'leaders': 0,
+            'coalesced': 0,
+            'remote_waits': 0
+        }
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        lookup: Optional[Callable[[], Any]] = None
+    ) -> Any:
+        """키별로 fn을 한 번만 실행하고 결과를 공유"""
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            self.stats['coalesced'] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # 선행 요청이 취소된 경우 새로 계산
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.stats['leaders'] += 1
+        try:
+            result = await self._run(key, fn, lookup)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 대기자가 없어도 경고가 남지 않도록
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _run(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        lookup: Optional[Callable[[], Any]]
+    ) -> Any:
+        """필요 시 프로세스 간 락을 잡고 실행"""
+        if not self.distributed or self.cache is None or lookup is None:
+            return await fn()
+
+        lock_name = f"lock:{key}"
+        token = self.cache.acquire_lock(lock_name, self.lock_ttl)
+        if token is None:
+            self.stats['remote_waits'] += 1
+            result = await self._wait_for_peer(lock_name, lookup)
+            if result is not None:
+                return result
+            logger.warning(f"Timed out waiting for peer computing {key}")
+            return await fn()
+
+        try:
+            return await fn()
+        finally:
+            self.cache.release_lock(lock_name, token)
+
+    async def _wait_for_peer(self, lock_name: str, lookup: Callable[[], Any]) -> Any:
+        """락 보유 프로세스가 캐시에 결과를 쓸 때까지 폴링"""
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            value = lookup()
+            if value is not None:
+                return value
+            if not self.cache.is_locked(lock_name):
+                return lookup()
+            await asyncio.sleep(self.poll_interval)
+        return None
@@ -0,0 +1,118 @@
+"""
+Seeded synthetic dataset generator
+벤치마크/부하 테스트용 합성 데이터 (게시물, 사용자, 거듭제곱 분포 상호작용)
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+VOCABULARY_SIZE = 5000
+NUM_CATEGORIES = 20
+TOPIC_WORDS = 150
+INTERACTION_TYPES = ['view', 'like', 'comment']
+INTERACTION_TYPE_PROBABILITIES = [0.7, 0.2, 0.1]
+
+
+def power_law_weights(size: int, exponent: float, rng: np.random.Generator) -> np.ndarray:
+    """순위^-exponent 확률 (순위는 무작위로 섞음)"""
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def generate_dataset(
+    num_posts: int,
+    num_users: Optional[int] = None,
+    interactions_per_user: int = 10,
+    words_per_post: int = 40,
+    days: int = 90,
+    seed: int = 42,
+    now: Optional[datetime] = None
+) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    RecommendationEngine.load_data 입력 형식의 (posts, users, interactions) 생성
+
+    게시물은 카테고리별 주제 어휘 + 전체 어휘(Zipf)로 본문을 만들고,
+    사용자 활동량과 게시물 인기도는 거듭제곱 분포를 따른다. 상호작용의
+    절반은 사용자의 선호 카테고리 게시물에서 뽑는다.
+    """
+    rng = np.random.default_rng(seed)
+    now = now or datetime.now()
+    num_users = num_users or num_posts
+    vocabulary = np.array([f"w{i}" for i in range(VOCABULARY_SIZE)])
+
+    # 게시물
+    categories = rng.integers(0, NUM_CATEGORIES, num_posts)
+    topic_words = rng.integers(0, VOCABULARY_SIZE, (NUM_CATEGORIES, TOPIC_WORDS))
+    global_words = power_law_weights(VOCABULARY_SIZE, 1.1, rng)
+    topical = rng.random((num_posts, words_per_post)) < 0.6
+    words = np.where(
+        topical,
+        topic_words[categories[:, None], rng.integers(0, TOPIC_WORDS, (num_posts, words_per_post))],
+        rng.choice(VOCABULARY_SIZE, (num_posts, words_per_post), p=global_words)
+    )
+    popularity = power_law_weights(num_posts, 0.9, rng)
+    post_ages = rng.uniform(0, days, num_posts)
+    views = rng.poisson(popularity * num_posts * 50)
+    likes = rng.binomial(views, 0.1)
+    comments = rng.binomial(views, 0.02)
+
+    posts = []
+    for i in range(num_posts):
+        created_at = now - timedelta(days=float(post_ages[i]))
+        posts.append({
+            'post_id': i + 1,
+            'title': ' '.join(vocabulary[words[i, :6]]),
+            'content': ' '.join(vocabulary[words[i, 6:]]),
+            'user_id': int(rng.integers(1, num_users + 1)),
+            'category_id': int(categories[i]) + 1,
+            'created_at': created_at,
+            'updated_at': created_at,
+            'likes_count': int(likes[i]),
+            'comments_count': int(comments[i]),
+            'views_count': int(views[i])
+        })
+
+    users = [
+        {
+            'user_id': user_id,
+            'username': f"user{user_id}",
+            'email': f"user{user_id}@example.com",
+            'created_at': now - timedelta(days=days)
+        }
+        for user_id in range(1, num_users + 1)
+    ]
+
+    # 상호작용 (사용자 활동량/게시물 인기도 모두 거듭제곱 분포)
+    num_interactions = num_users * interactions_per_user
+    activity = power_law_weights(num_users, 0.8, rng)
+    user_idx = rng.choice(num_users, num_interactions, p=activity)
+    post_idx = rng.choice(num_posts, num_interactions, p=popularity)
+
+    preferred = rng.integers(0, NUM_CATEGORIES, num_users)
+    by_category = np.argsort(categories, kind='stable')
+    counts = np.bincount(categories, minlength=NUM_CATEGORIES)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    in_category = rng.random(num_interactions) < 0.5
+    target = preferred[user_idx]
+    has_posts = counts[target] > 0
+    pick = in_category & has_posts
+    post_idx[pick] = by_category[
+        offsets[target[pick]] + rng.integers(0, np.maximum(counts[target[pick]], 1))
+    ]
+
+    types = rng.choice(len(INTERACTION_TYPES), num_interactions, p=INTERACTION_TYPE_PROBABILITIES)
+    ages = rng.uniform(0, days, num_interactions)
+    interactions = [
+        {
+            'user_id': int(user_idx[i]) + 1,
+            'post_id': int(post_idx[i]) + 1,
+            'interaction_type': INTERACTION_TYPES[types[i]],
+            'created_at': now - timedelta(days=float(ages[i]))
+        }
+        for i in range(num_interactions)
+    ]
+
+    return posts, users, interactions
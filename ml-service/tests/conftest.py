@@ -0,0 +1,31 @@
+"""
+공용 fixture: 시드 고정 합성 데이터로 만든 추천 엔진
+
+ml-service 디렉터리에서 실행:
+    pytest tests/ -v
+"""
+
+import os
+import sys
+from typing import Dict, List, Tuple
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommendation_engine import RecommendationEngine  # noqa: E402
+from synthetic_data import generate_dataset  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def dataset() -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """(posts, users, interactions) 합성 데이터"""
+    return generate_dataset(400, seed=7)
+
+
+@pytest.fixture
+def engine(dataset) -> RecommendationEngine:
+    """합성 데이터를 로드한 float32 엔진 (테스트마다 새로 생성)"""
+    engine = RecommendationEngine()
+    engine.load_data(*dataset)
+    return engine
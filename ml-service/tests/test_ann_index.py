@@ -0,0 +1,106 @@
+"""
+IVF index recall
+근사 검색 결과가 전수 비교 상위 k개를 충분히 찾는지 (재현율), 추가/저장 후에도 유지되는지 검증
+"""
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from ann_index import IVFIndex
+
+K = 10
+QUERIES = 100
+MIN_RECALL = 0.95
+
+
+def clustered_vectors(n: int = 4000, dim: int = 32, clusters: int = 40, seed: int = 0) -> np.ndarray:
+    """군집 구조가 있는 L2 정규화 벡터"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(clusters, size=n)] + rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def exact_top_k(vectors: np.ndarray, row: int, k: int = K) -> np.ndarray:
+    scores = vectors @ vectors[row]
+    scores[row] = -np.inf
+    return np.argsort(-scores, kind='stable')[:k]
+
+
+def mean_recall(index: IVFIndex, vectors: np.ndarray, ids: np.ndarray, nprobe=None) -> float:
+    recalls = []
+    for row in range(QUERIES):
+        found, _ = index.search_by_id(int(ids[row]), K, nprobe=nprobe)
+        recalls.append(len(set(found.tolist()) & set(ids[exact_top_k(vectors, row)].tolist())) / K)
+    return float(np.mean(recalls))
+
+
+@pytest.fixture(scope='module')
+def vectors() -> np.ndarray:
+    return clustered_vectors()
+
+
+@pytest.fixture(scope='module')
+def ids(vectors) -> np.ndarray:
+    return np.arange(len(vectors), dtype=np.int64) + 1000
+
+
+@pytest.fixture(scope='module')
+def index(vectors, ids) -> IVFIndex:
+    return IVFIndex(nprobe=8, exact_threshold=500).build(ids, vectors)
+
+
+def test_recall_at_default_nprobe(index, vectors, ids):
+    assert index.centroids is not None
+    assert mean_recall(index, vectors, ids) >= MIN_RECALL
+
+
+def test_probing_every_list_is_exact(index, vectors, ids):
+    assert mean_recall(index, vectors, ids, nprobe=len(index.centroids)) == 1.0
+
+
+def test_recall_grows_with_nprobe(index, vectors, ids):
+    assert mean_recall(index, vectors, ids, nprobe=1) < mean_recall(index, vectors, ids, nprobe=8)
+
+
+def test_search_by_id_excludes_the_query(index, ids):
+    found, scores = index.search_by_id(int(ids[0]), K)
+
+    assert int(ids[0]) not in found.tolist()
+    assert np.all(scores[:-1] >= scores[1:])
+
+
+def test_small_collections_are_searched_exactly(vectors, ids):
+    small = IVFIndex(exact_threshold=500).build(ids[:300], vectors[:300])
+
+    assert small.centroids is None
+    assert mean_recall(small, vectors[:300], ids[:300]) == 1.0
+
+
+def test_sparse_vectors_are_supported(vectors, ids):
+    rows = sparse.csr_matrix(np.where(np.abs(vectors) > 0.15, vectors, 0))
+    dense = rows.toarray()
+    dense /= np.linalg.norm(dense, axis=1, keepdims=True)
+    index = IVFIndex(nprobe=8, exact_threshold=500).build(ids, sparse.csr_matrix(dense))
+
+    assert mean_recall(index, dense, ids) >= MIN_RECALL
+
+
+def test_added_vectors_are_searchable(vectors, ids):
+    index = IVFIndex(nprobe=8, exact_threshold=500).build(ids[:3000], vectors[:3000])
+
+    assert index.add(ids[3000:], vectors[3000:]) == 1000
+    assert index.add(ids[3000:], vectors[3000:]) == 0
+    assert mean_recall(index, vectors, ids) >= MIN_RECALL
+    found, _ = index.search(vectors[3500:3501], 1)
+    assert found.tolist() == [ids[3500]]
+
+
+def test_saved_index_keeps_recall(index, vectors, ids, tmp_path):
+    path = str(tmp_path / 'ann.npz')
+    index.save(path)
+
+    loaded = IVFIndex.load(path)
+
+    assert mean_recall(loaded, vectors, ids) == mean_recall(index, vectors, ids)
@@ -0,0 +1,93 @@
+"""
+Cache generation / user epoch invalidation
+세대 번호(전체)와 사용자 epoch(사용자 단위) 네임스페이스 무효화 검증
+"""
+
+import numpy as np
+import pytest
+
+from cache import RecommendationCache
+from config import Config
+from fakes import FakeRedis
+
+
+@pytest.fixture
+def redis_client() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def make_cache(monkeypatch, redis_client):
+    """같은 Redis를 공유하는 워커별 캐시 생성 (세대 동기화 주기 0초)"""
+    monkeypatch.setattr(Config, 'CACHE_ENABLED', True)
+    monkeypatch.setattr(Config, 'CACHE_GENERATION_SYNC_INTERVAL', 0)
+
+    def make() -> RecommendationCache:
+        cache = RecommendationCache()
+        cache.client = redis_client
+        return cache
+
+    return make
+
+
+def test_bump_generation_hides_previous_entries(make_cache):
+    cache = make_cache()
+    key = cache.key('posts', 1)
+    cache.set(key, [1, 2, 3])
+    assert cache.get(key) == [1, 2, 3]
+
+    cache.bump_generation()
+
+    assert cache.key('posts', 1) != key
+    assert cache.get(cache.key('posts', 1)) is None
+
+
+def test_generation_is_shared_across_workers(make_cache):
+    first, second = make_cache(), make_cache()
+    first.set(first.key('posts', 1), [1])
+    assert second.get(second.key('posts', 1)) == [1]
+
+    first.bump_generation()
+
+    assert second.key('posts', 1) == first.key('posts', 1)
+    assert second.get(second.key('posts', 1)) is None
+
+
+def test_invalidate_user_only_moves_that_user(make_cache):
+    cache = make_cache()
+    mine, other = cache.user_key(1, 'posts'), cache.user_key(2, 'posts')
+    cache.set(mine, [1])
+    cache.set(other, [2])
+
+    cache.invalidate_user(1)
+
+    assert cache.user_key(1, 'posts') != mine
+    assert cache.get(cache.user_key(1, 'posts')) is None
+    assert cache.user_key(2, 'posts') == other
+    assert cache.get(other) == [2]
+
+
+def test_user_epoch_survives_generation_bump(make_cache):
+    cache = make_cache()
+    cache.invalidate_user(1)
+    cache.bump_generation()
+
+    assert ':e1:' in cache.user_key(1, 'posts')
+
+
+def test_ranked_lists_round_trip_through_redis(make_cache):
+    writer, reader = make_cache(), make_cache()
+    key = writer.key('feed', 1, 'abc')
+
+    assert writer.set_ranked(key, np.array([5, 3, 9]), np.array([0.9, 0.5, 0.1]))
+
+    post_ids, scores = reader.get_ranked(key)
+    assert post_ids.tolist() == [5, 3, 9]
+    assert scores.tolist() == pytest.approx([0.9, 0.5, 0.1])
+
+
+def test_set_ranked_reports_l1_only_writes(make_cache):
+    cache = make_cache()
+    cache.client = None
+
+    assert not cache.set_ranked(cache.key('feed', 1, 'abc'), np.array([1]), np.array([1.0]))
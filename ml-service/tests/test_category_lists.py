@@ -0,0 +1,75 @@
+"""
+Per-category popularity lists
+로드 시 만든 카테고리별 인기 목록과 사용자 카테고리 선호도가 전수 계산 결과와 같은지 검증
+"""
+
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from config import Config
+from recommendation_engine import RecommendationEngine
+
+TOP_N = 5
+
+
+@pytest.fixture
+def engine(monkeypatch, dataset) -> RecommendationEngine:
+    """카테고리 목록 길이를 줄여 잘림까지 확인하는 엔진"""
+    monkeypatch.setattr(Config, 'CATEGORY_TOP_N', TOP_N)
+    engine = RecommendationEngine()
+    engine.load_data(*dataset)
+    return engine
+
+
+def assert_lists_match_full_scan(engine):
+    for category_id, column in engine.category_index.items():
+        members = np.flatnonzero(engine.post_categories == category_id)
+        expected = np.sort(engine.post_popularity[members])[::-1][:TOP_N]
+        top = engine.category_top[column]
+
+        assert np.all(engine.post_categories[top] == category_id)
+        assert engine.post_popularity[top].tolist() == expected.tolist()
+
+
+def test_lists_hold_the_most_popular_posts_per_category(engine):
+    assert len(engine.category_top) == len(np.unique(engine.post_categories))
+    assert_lists_match_full_scan(engine)
+
+
+def test_added_posts_are_merged_into_their_category(engine, dataset):
+    post = dict(dataset[0][0], post_id=10 ** 6, likes_count=10 ** 6, created_at=datetime.now())
+
+    assert engine.add_posts([post]) == 1
+
+    column = engine.category_index[int(post['category_id'])]
+    assert engine.post_ids[engine.category_top[column][0]] == post['post_id']
+    assert_lists_match_full_scan(engine)
+
+
+def test_preferred_categories_follow_interaction_counts(engine, dataset):
+    user_id, _ = Counter(int(row['user_id']) for row in dataset[2]).most_common(1)[0]
+    history = engine._user_history(user_id)
+    counts = Counter(int(category_id) for category_id in engine.post_categories[history])
+
+    preferred = engine.category_ids[engine._preferred_categories(user_id)]
+
+    expected = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:3]
+    assert preferred.tolist() == [category_id for category_id, _ in expected]
+
+
+def test_merged_lists_skip_excluded_posts(engine):
+    columns = np.arange(3)
+    excluded = engine.post_deleted.copy()
+    excluded[engine.category_top[0][:2]] = True
+
+    positions = engine._category_popular(columns, excluded, TOP_N)
+
+    candidates = np.concatenate([engine.category_top[column] for column in columns])
+    candidates = candidates[~excluded[candidates]]
+    assert not excluded[positions].any()
+    assert engine.post_popularity[positions].tolist() == sorted(
+        engine.post_popularity[candidates].tolist(), reverse=True
+    )[:TOP_N]
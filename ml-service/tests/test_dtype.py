@@ -0,0 +1,106 @@
+"""
+float32 vs float64 ranking
+같은 데이터로 만든 float32 엔진의 추천 순위가 float64 엔진과 허용 오차 내에서 일치하는지 검증
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pytest
+
+from config import Config
+from recommendation_engine import RecommendationEngine
+
+TOP_N = 10
+SAMPLE = 100
+MIN_OVERLAP = 0.9
+# 양쪽 순위에 모두 있는 게시물의 허용 상대 점수 차
+SCORE_TOLERANCE = 1e-4
+
+
+def ranking_overlap(reference: Sequence[int], candidate: Sequence[int], k: int) -> float:
+    """상위 k개 집합 일치율 (기준 목록 길이로 정규화)"""
+    expected = list(reference)[:k]
+    if not expected:
+        return 1.0
+    return len(set(expected) & set(list(candidate)[:k])) / len(expected)
+
+
+def compare_rankings(
+    reference: List[List[Dict]],
+    candidate: List[List[Dict]],
+    score_key: str = 'score'
+) -> Tuple[float, float]:
+    """평균 상위 N 일치율과 공통 항목의 최대 상대 점수 차"""
+    overlaps = []
+    max_score_diff = 0.0
+    for ref_recs, cand_recs in zip(reference, candidate):
+        overlaps.append(ranking_overlap(
+            [rec['post_id'] for rec in ref_recs],
+            [rec['post_id'] for rec in cand_recs],
+            TOP_N
+        ))
+        cand_scores = {rec['post_id']: rec[score_key] for rec in cand_recs}
+        for rec in ref_recs:
+            if rec['post_id'] in cand_scores:
+                diff = abs(rec[score_key] - cand_scores[rec['post_id']]) / max(1.0, abs(rec[score_key]))
+                max_score_diff = max(max_score_diff, diff)
+    return float(np.mean(overlaps)), max_score_diff
+
+
+@pytest.fixture(scope='module')
+def engines(dataset) -> Tuple[RecommendationEngine, RecommendationEngine]:
+    """같은 데이터로 만든 (float64, float32) 엔진"""
+    built = []
+    for dtype in ('float64', 'float32'):
+        engine = RecommendationEngine(dtype=dtype)
+        engine.load_data(*dataset)
+        built.append(engine)
+    return tuple(built)
+
+
+@pytest.fixture(scope='module')
+def user_ids(dataset) -> List[int]:
+    return sorted({int(row['user_id']) for row in dataset[2]})[:SAMPLE]
+
+
+def test_engines_use_configured_dtype(engines):
+    reference, candidate = engines
+    assert reference.interaction_matrix.dtype == np.float64
+    assert candidate.interaction_matrix.dtype == np.float32
+
+
+def test_collaborative_rankings_match(engines, user_ids):
+    reference, candidate = engines
+    overlap, score_diff = compare_rankings(
+        [reference.get_collaborative_recommendations(u, TOP_N) for u in user_ids],
+        [candidate.get_collaborative_recommendations(u, TOP_N) for u in user_ids]
+    )
+
+    assert overlap >= MIN_OVERLAP
+    assert score_diff <= SCORE_TOLERANCE
+
+
+def test_content_rankings_match(engines, dataset):
+    reference, candidate = engines
+    post_ids = [int(post['post_id']) for post in dataset[0]][:SAMPLE]
+    overlap, score_diff = compare_rankings(
+        [reference.get_content_based_recommendations(p, TOP_N) for p in post_ids],
+        [candidate.get_content_based_recommendations(p, TOP_N) for p in post_ids],
+        score_key='similarity_score'
+    )
+
+    assert overlap >= MIN_OVERLAP
+    assert score_diff <= SCORE_TOLERANCE
+
+
+def test_hybrid_rankings_match(engines, user_ids):
+    reference, candidate = engines
+    weights = (Config.COLLABORATIVE_WEIGHT, Config.CONTENT_WEIGHT)
+    overlap, score_diff = compare_rankings(
+        [reference.get_hybrid_recommendations(u, TOP_N, *weights) for u in user_ids],
+        [candidate.get_hybrid_recommendations(u, TOP_N, *weights) for u in user_ids]
+    )
+
+    assert overlap >= MIN_OVERLAP
+    assert score_diff <= SCORE_TOLERANCE
@@ -0,0 +1,44 @@
+"""
+Exclusion across recommendation types
+collaborative/als/content도 하이브리드와 같이 본 게시물과 차단한 사용자의 게시물을 제외하는지 검증
+"""
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import app as service
+from fakes import FakeRedis
+
+
+def reset_cache(monkeypatch):
+    """차단 목록 캐시를 비운 인메모리 Redis"""
+    monkeypatch.setattr(service.cache, 'client', FakeRedis())
+    if service.cache.local is not None:
+        service.cache.local.clear()
+
+
+@pytest.fixture
+def user_id(monkeypatch, engine, dataset) -> int:
+    """합성 데이터 엔진에 연결한 상호작용이 가장 많은 사용자"""
+    monkeypatch.setattr(service, 'recommendation_engine', engine)
+    reset_cache(monkeypatch)
+    return Counter(int(row['user_id']) for row in dataset[2]).most_common(1)[0][0]
+
+
+@pytest.mark.parametrize('recommendation_type', ['collaborative', 'als', 'content'])
+def test_blocked_authors_and_seen_posts_are_excluded(monkeypatch, engine, user_id, recommendation_type):
+    monkeypatch.setattr(service.db, 'get_blocked_user_ids', lambda user_id: [])
+    unfiltered, _ = service.generate_post_recommendations(user_id, recommendation_type, 10)
+    assert len(unfiltered)
+
+    blocked = int(engine.post_authors[engine.post_index[int(unfiltered[0])]])
+    monkeypatch.setattr(service.db, 'get_blocked_user_ids', lambda user_id: [blocked])
+    reset_cache(monkeypatch)
+    post_ids, scores = service.generate_post_recommendations(user_id, recommendation_type, 10)
+
+    positions = [engine.post_index[int(post_id)] for post_id in post_ids]
+    assert len(post_ids) == len(scores) == 10
+    assert blocked not in engine.post_authors[positions]
+    assert not np.isin(post_ids, engine.post_ids[engine._user_history(user_id)]).any()
@@ -0,0 +1,101 @@
+"""
+Cursor-paginated feed
+커서 인코딩/디코딩, 페이지 연속성, 모델 갱신 후 만료(410), L2 저장 시에만 커서 발급 검증
+"""
+
+from collections import Counter
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as service
+from fakes import FakeRedis
+from utils import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def client(monkeypatch, engine) -> TestClient:
+    """합성 데이터 엔진과 인메모리 Redis를 연결한 API 클라이언트"""
+    monkeypatch.setattr(service, 'recommendation_engine', engine)
+    monkeypatch.setattr(service, 'data_loaded', True)
+    monkeypatch.setattr(service, 'last_load_time', datetime.now())
+    monkeypatch.setattr(service.db, 'get_blocked_user_ids', lambda user_id: [])
+    monkeypatch.setattr(service.cache, 'client', FakeRedis())
+    if service.cache.local is not None:
+        service.cache.local.clear()
+    return TestClient(service.app)
+
+
+@pytest.fixture
+def user_id(dataset) -> int:
+    """상호작용이 가장 많은 사용자"""
+    return Counter(int(row['user_id']) for row in dataset[2]).most_common(1)[0][0]
+
+
+def fetch(client: TestClient, user_id: int, cursor=None, **params):
+    return client.post('/recommend/feed', json={'user_id': user_id, 'cursor': cursor, **params})
+
+
+def test_cursor_round_trip():
+    created = datetime(2026, 1, 2, 3, 4, 5, 678000)
+    cursor = encode_cursor('abc123', 40, created)
+
+    assert decode_cursor(cursor) == ('abc123', 40, created)
+
+
+@pytest.mark.parametrize('cursor', ['!!', 'bm90LWEtY3Vyc29y', encode_cursor('abc', -1, datetime.now())])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pages_cover_the_feed_without_duplicates(client, user_id):
+    post_ids, cursor, pages = [], None, 0
+    while True:
+        response = fetch(client, user_id, cursor, limit=50)
+        assert response.status_code == 200
+        body = response.json()
+        post_ids += [item['post_id'] for item in body['items']]
+        pages += 1
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+
+    assert pages > 1
+    assert len(post_ids) == len(set(post_ids))
+
+
+def test_exclude_seen_skips_posts_seen_after_the_build(client, engine, user_id):
+    first = fetch(client, user_id, limit=10).json()
+    page = fetch(client, user_id, first['next_cursor'], limit=10).json()
+    seen = page['items'][0]['post_id']
+
+    engine.add_interactions([{
+        'user_id': user_id, 'post_id': seen, 'interaction_type': 'view', 'created_at': datetime.now()
+    }])
+    again = fetch(client, user_id, first['next_cursor'], limit=10, exclude_seen=True).json()
+
+    assert seen not in [item['post_id'] for item in again['items']]
+    assert again['items'][0]['post_id'] == page['items'][1]['post_id']
+
+
+def test_model_refresh_expires_open_feeds(client, user_id):
+    cursor = fetch(client, user_id, limit=10).json()['next_cursor']
+
+    service.cache.bump_generation()
+
+    assert fetch(client, user_id, cursor).status_code == 410
+
+
+def test_bad_cursor_returns_400(client, user_id):
+    assert fetch(client, user_id, '!!').status_code == 400
+
+
+def test_no_cursor_without_shared_cache(client, monkeypatch, user_id):
+    monkeypatch.setattr(service.cache, 'client', None)
+
+    body = fetch(client, user_id, limit=10).json()
+
+    assert len(body['items']) == 10
+    assert body['next_cursor'] is None
@@ -0,0 +1,53 @@
+"""
+Per-user history CSR index
+사용자별 이력 인덱스가 interactions_df 필터링/정렬 결과와 같은지, 증분 병합이 최신순을 유지하는지 검증
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+def scanned_history(engine, user_id: int):
+    """기준 구현: 전체 상호작용을 필터링 후 최신순 정렬 (로드된 게시물만)"""
+    rows = engine.interactions_df[engine.interactions_df['user_id'] == user_id]
+    rows = rows[rows['post_id'].isin(engine.post_index)]
+    rows = rows.sort_values('created_at', ascending=False, kind='stable')
+    return rows['post_id'].map(engine.post_index).to_numpy(dtype=np.int64), rows['created_at'].to_numpy()
+
+
+def test_slices_match_a_full_scan(engine):
+    assert len(engine.history_indptr) == len(engine.history_users) + 1
+
+    for user_id in list(engine.history_users)[:100]:
+        positions, created = engine._history_slice(user_id)
+        expected_positions, expected_created = scanned_history(engine, user_id)
+
+        assert np.array_equal(created, expected_created)
+        assert sorted(positions.tolist()) == sorted(expected_positions.tolist())
+
+
+def test_unknown_user_has_empty_history(engine):
+    positions, created = engine._history_slice(10 ** 9)
+
+    assert len(positions) == 0 and len(created) == 0
+    assert engine.recent_post_id(10 ** 9) is None
+
+
+def test_added_interactions_merge_newest_first(engine):
+    user_id, other = list(engine.history_users)[:2]
+    before = engine._user_history(user_id)
+    other_before = engine._user_history(other).copy()
+    post_id = int(engine.post_ids[0])
+
+    engine.add_interactions([{
+        'user_id': user_id, 'post_id': post_id, 'interaction_type': 'like', 'created_at': datetime.now()
+    }])
+
+    positions, created = engine._history_slice(user_id)
+    assert positions[0] == engine.post_index[post_id]
+    assert np.array_equal(positions[1:], before)
+    assert np.all(created[:-1] >= created[1:])
+    assert np.array_equal(engine._user_history(other), other_before)
+    assert engine.recent_post_id(user_id) == post_id
+    assert engine.seen_since(user_id, datetime.now() - timedelta(seconds=5)).tolist() == [post_id]
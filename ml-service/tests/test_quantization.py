@@ -0,0 +1,105 @@
+"""
+Int8 quantization error
+int8 코드 복원 오차, 근사 내적 오차 상한, 재정렬 후 정확한 상위 k개, 메모리 절감 검증
+"""
+
+import numpy as np
+import pytest
+
+from ann_index import IVFIndex
+from quantization import QuantizedVectors
+
+K = 10
+
+
+@pytest.fixture(scope='module')
+def vectors() -> np.ndarray:
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(2000, 64))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.fixture(scope='module')
+def queries(vectors) -> np.ndarray:
+    return vectors[:50]
+
+
+def test_reconstruction_error_is_within_half_a_step(vectors):
+    store = QuantizedVectors.quantize(vectors)
+
+    error = np.abs(store.reconstruct(slice(None)) - vectors)
+
+    assert np.all(error <= store.scales[:, None] / 2 + 1e-6)
+
+
+def test_score_error_is_bounded(vectors, queries):
+    store = QuantizedVectors.quantize(vectors)
+
+    error = np.abs(store.scores(queries) - queries @ vectors.T)
+
+    # 원소별 오차 <= scale/2 이므로 내적 오차 <= scale/2 * |q|_1
+    bound = np.abs(queries).sum(axis=1)[:, None] * store.scales[None, :] / 2
+    assert np.all(error <= bound + 1e-5)
+    assert error.max() < 0.02
+
+
+def test_top_k_overlaps_exact_search(vectors, queries):
+    store = QuantizedVectors.quantize(vectors)
+
+    overlaps = []
+    for query in queries:
+        positions, _ = store.top_k(query, K)
+        exact = np.argsort(-(vectors @ query))[:K]
+        overlaps.append(len(set(positions.tolist()) & set(exact.tolist())) / K)
+
+    assert np.mean(overlaps) >= 0.9
+
+
+def test_rerank_restores_exact_scores(vectors, queries):
+    store = QuantizedVectors.quantize(vectors, keep_float=True)
+
+    for query in queries:
+        positions, scores = store.top_k(query, K, rerank=4)
+        exact_scores = vectors @ query
+        exact = np.argsort(-exact_scores, kind='stable')[:K]
+
+        assert positions.tolist() == exact.tolist()
+        assert scores == pytest.approx(exact_scores[exact], abs=1e-6)
+
+
+def test_codes_are_a_quarter_of_float32(vectors):
+    store = QuantizedVectors.quantize(vectors)
+
+    assert store.codes.dtype == np.int8
+    assert store.nbytes <= vectors.nbytes * 0.3
+
+
+def test_append_matches_one_shot_quantization(vectors):
+    store = QuantizedVectors.quantize(vectors[:1500])
+    store.append(vectors[1500:])
+    expected = QuantizedVectors.quantize(vectors)
+
+    assert np.array_equal(store.codes, expected.codes)
+    assert np.array_equal(store.scales, expected.scales)
+
+
+def test_zero_vectors_are_encoded_as_zero():
+    store = QuantizedVectors.quantize(np.zeros((2, 8), dtype=np.float32))
+
+    assert not store.codes.any()
+    assert np.all(np.isfinite(store.scales))
+
+
+def test_quantized_ann_index_keeps_recall(vectors):
+    ids = np.arange(len(vectors), dtype=np.int64)
+    index = IVFIndex(exact_threshold=0, quantize=True, rerank=2).build(ids, vectors)
+    exact = IVFIndex(exact_threshold=0).build(ids, vectors)
+
+    recalls = []
+    for row in range(50):
+        found, _ = index.search_by_id(row, K, nprobe=len(index.centroids))
+        expected, _ = exact.search_by_id(row, K, nprobe=len(exact.centroids))
+        recalls.append(len(set(found.tolist()) & set(expected.tolist())) / K)
+
+    assert isinstance(index.vectors, QuantizedVectors)
+    assert np.mean(recalls) >= 0.95
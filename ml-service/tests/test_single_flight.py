@@ -0,0 +1,98 @@
+"""
+Single-flight coalescing
+같은 키의 동시 캐시 미스가 한 번만 계산되는지 검증 (프로세스 내 / Redis 락)
+"""
+
+import asyncio
+
+from cache import RecommendationCache
+from config import Config
+from fakes import FakeRedis
+from single_flight import SingleFlight
+
+
+class Counter:
+    """호출 횟수를 세는 느린 계산"""
+
+    def __init__(self, result=None, error: Exception = None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_calls_share_one_computation():
+    flight, compute = SingleFlight(), Counter(result=[1, 2, 3])
+
+    async def run():
+        return await asyncio.gather(*(flight.do('posts:1', compute) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert compute.calls == 1
+    assert results == [[1, 2, 3]] * 10
+    assert flight.stats['leaders'] == 1
+    assert flight.stats['coalesced'] == 9
+
+
+def test_different_keys_are_not_coalesced():
+    flight, compute = SingleFlight(), Counter(result='ok')
+
+    async def run():
+        return await asyncio.gather(flight.do('posts:1', compute), flight.do('posts:2', compute))
+
+    asyncio.run(run())
+
+    assert compute.calls == 2
+
+
+def test_error_reaches_every_waiter_and_is_not_cached():
+    flight, failing = SingleFlight(), Counter(error=RuntimeError('boom'))
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do('posts:1', failing) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert failing.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    retry = Counter(result='ok')
+    assert asyncio.run(flight.do('posts:1', retry)) == 'ok'
+    assert retry.calls == 1
+
+
+def test_waits_for_peer_holding_redis_lock(monkeypatch):
+    monkeypatch.setattr(Config, 'CACHE_ENABLED', True)
+    cache = RecommendationCache()
+    cache.client = FakeRedis()
+    flight = SingleFlight(cache)
+    flight.distributed = True
+    flight.poll_interval = 0.005
+    compute = Counter(result='local')
+
+    key = cache.key('posts', 1)
+    token = cache.acquire_lock(f"lock:{key}", 30)
+    assert token
+
+    async def peer_finishes():
+        await asyncio.sleep(0.02)
+        cache.set(key, 'peer')
+        cache.release_lock(f"lock:{key}", token)
+
+    async def run():
+        waiter = flight.do(key, compute, lambda: cache.get(key))
+        result, _ = await asyncio.gather(waiter, peer_finishes())
+        return result
+
+    assert asyncio.run(run()) == 'peer'
+    assert compute.calls == 0
+    assert flight.stats['remote_waits'] == 1
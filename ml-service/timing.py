@@ -0,0 +1,96 @@
+"""
+Request-scoped stage timing
+요청별 단계 소요 시간 기록 (Server-Timing 헤더 + 구조화 로그)
+
+app 미들웨어가 요청마다 RequestTimer를 contextvar에 설정하고, 캐시/DB/점수 계산/응답 구성
+코드는 stage()로 구간을 감싼다. 요청 밖(시작 시 로드, 벤치마크)에서는 아무것도 기록하지 않는다.
+"""
+
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+_current: contextvars.ContextVar[Optional['RequestTimer']] = contextvars.ContextVar(
+    'request_timer', default=None
+)
+
+
+class RequestTimer:
+    """
+    한 요청의 단계별 누적 시간
+
+    같은 단계가 여러 번 실행되면 시간과 횟수를 합산한다. 단계는 겹칠 수 있으므로
+    (예: 점수 계산 중 DB 조회) 단계 합이 total보다 클 수 있다.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float):
+        """단계 시간 누적"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    @property
+    def elapsed(self) -> float:
+        """요청 시작 후 경과 시간 (초)"""
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (예: cache;dur=0.41, db;dur=12.30, total;dur=15.02)"""
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={self.elapsed * 1000:.2f}")
+        return ', '.join(parts)
+
+    def log_fields(self) -> str:
+        """로그용 key=value 필드 (ms, 단계별 횟수 포함)"""
+        fields = [f"total_ms={self.elapsed * 1000:.2f}"]
+        for name, seconds in self.stages.items():
+            fields.append(f"{name}_ms={seconds * 1000:.2f}")
+            fields.append(f"{name}_count={self.counts[name]}")
+        return ' '.join(fields)
+
+
+@contextmanager
+def request_timer() -> Iterator[RequestTimer]:
+    """현재 컨텍스트(요청)에 새 타이머 설정"""
+    timer = RequestTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    """현재 요청의 타이머 (요청 밖이면 None)"""
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """구간 시간을 현재 요청의 단계에 누적"""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
+
+
+def timed_stage(name: str) -> Callable[[Callable], Callable]:
+    """함수 실행 시간을 현재 요청의 단계에 누적하는 데코레이터"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
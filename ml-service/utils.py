@@ -3,11 +3,14 @@ Utility functions for recommendation service
 유틸리티 함수 모음
 """
 
+import base64
 import hashlib
 import json
-from typing import Any, Optional
+from typing import Any, List, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
 
 def generate_cache_key(*args, **kwargs) -> str:
     """캐시 키 생성"""
@@ -75,6 +78,48 @@ def merge_recommendations(
     return sorted(merged.values(), key=lambda x: x['score'], reverse=True)
 
 
+def split_ranked(
+    recommendations: List[dict],
+    excluded_ids: Optional[np.ndarray] = None,
+    limit: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """추천 리스트를 (post_id 배열, score 배열)로 분리 (excluded_ids는 빼고 앞에서 limit개)"""
+    post_ids = np.fromiter(
+        (rec['post_id'] for rec in recommendations),
+        dtype=np.int64,
+        count=len(recommendations)
+    )
+    scores = np.fromiter(
+        (rec.get('score', rec.get('similarity_score', 0.0)) for rec in recommendations),
+        dtype=np.float32,
+        count=len(recommendations)
+    )
+    if excluded_ids is not None and len(excluded_ids):
+        keep = ~np.isin(post_ids, excluded_ids)
+        post_ids, scores = post_ids[keep], scores[keep]
+    return post_ids[:limit], scores[:limit]
+
+
+def encode_cursor(feed_id: str, offset: int, created: datetime) -> str:
+    """피드 커서 인코딩 (피드 ID, 다음 위치, 피드 생성 시각을 URL 안전 문자열로)"""
+    raw = f"{feed_id}:{offset}:{int(created.timestamp() * 1000)}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, datetime]:
+    """피드 커서 디코딩 (형식이 잘못되면 ValueError)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        feed_id, offset, created_ms = raw.split(':')
+        offset = int(offset)
+        created = datetime.fromtimestamp(int(created_ms) / 1000)
+    except (ValueError, UnicodeDecodeError, OverflowError, OSError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not feed_id.isalnum() or offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return feed_id, offset, created
+
+
 def validate_request_params(
     user_id: Optional[int] = None,
     post_id: Optional[int] = None,
@@ -0,0 +1,138 @@
+"""
+In-process Redis stand-in for load tests
+"""
+
+import fnmatch
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the redis.Redis commands used by CacheService
+
+    Values are stored the way Redis returns them (str with
+    decode_responses=True, bytes otherwise) and expire lazily on read.
+    eval only supports the compare-and-delete lock release script.
+    """
+
+    def __init__(self, decode_responses: bool = True):
+        self.decode_responses = decode_responses
+        self._data: Dict[str, Tuple[Optional[float], Any]] = {}
+        self._lock = threading.Lock()
+        self.commands = 0
+
+    def _encode(self, value: Any) -> Any:
+        """Convert a value to the Redis reply type (bytes or str)"""
+        if isinstance(value, bytes):
+            return value.decode() if self.decode_responses else value
+        value = str(value)
+        return value if self.decode_responses else value.encode()
+
+    def _live(self, key: str) -> Optional[Any]:
+        """Unexpired value of a key (call with the lock held)"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            self.commands += 1
+            return self._live(key)
+
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        with self._lock:
+            self.commands += 1
+            return [self._live(key) for key in keys]
+
+    def set(self, key: str, value: Any, nx: bool = False, ex: Optional[int] = None) -> Optional[bool]:
+        with self._lock:
+            self.commands += 1
+            if nx and self._live(key) is not None:
+                return None
+            self._data[key] = (time.monotonic() + ex if ex else None, self._encode(value))
+            return True
+
+    def setex(self, key: str, ttl: int, value: Any) -> bool:
+        return self.set(key, value, ex=ttl)
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            self.commands += 1
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    unlink = delete
+
+    def exists(self, *keys: str) -> int:
+        with self._lock:
+            self.commands += 1
+            return sum(self._live(key) is not None for key in keys)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self.commands += 1
+            entry = self._data.get(key)
+            expires_at = entry[0] if entry else None
+            value = int(self._live(key) or 0) + 1
+            self._data[key] = (expires_at, self._encode(value))
+            return value
+
+    def expire(self, key: str, ttl: int) -> bool:
+        with self._lock:
+            self.commands += 1
+            value = self._live(key)
+            if value is None:
+                return False
+            self._data[key] = (time.monotonic() + ttl, value)
+            return True
+
+    def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> int:
+        """Lock release script: delete KEYS[1] if it holds ARGV[1]"""
+        key, token = keys_and_args[0], keys_and_args[numkeys]
+        with self._lock:
+            self.commands += 1
+            if self._live(key) == self._encode(token):
+                del self._data[key]
+                return 1
+            return 0
+
+    def scan_iter(self, match: str = '*', count: Optional[int] = None) -> Iterator[Any]:
+        with self._lock:
+            self.commands += 1
+            keys = [key for key in self._data if fnmatch.fnmatchcase(key, match)]
+        for key in keys:
+            yield self._encode(key)
+
+    def pipeline(self, transaction: bool = True) -> 'FakePipeline':
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them in order on execute()"""
+
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self._calls: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self) -> List[Any]:
+        results = [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+        self._calls = []
+        return results
@@ -0,0 +1,258 @@
+"""
+HTTP load test against main.py with in-process fakes
+
+Points the app's recommender at a SyntheticDatabase and its cache at a
+FakeRedis, then drives /api/recommend/* through httpx's ASGI transport (no
+network) with a fixed number of concurrent clients. The cache-hit ratio is
+controlled per request: hits reuse keys warmed before the run, misses have
+their key evicted from L1 and Redis just before being sent.
+
+Usage (from the recommendation-service directory):
+    python -m benchmarks.loadtest --posts 2000 --concurrency 16 --requests 2000 --hit-ratio 0.8
+    python -m benchmarks.loadtest --mix posts=1 --hit-ratio 0 --output loadtest.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from dotenv import load_dotenv
+
+from benchmarks.fakes import FakeRedis
+from benchmarks.synthetic_data import SyntheticDatabase
+
+ENDPOINTS = ('posts', 'users', 'similar')
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parse endpoint weights
+
+    Args:
+        mix: Comma-separated name=weight pairs, e.g. 'posts=5,users=2,similar=3'
+
+    Returns:
+        Weight per endpoint
+    """
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def latency_stats(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles in milliseconds"""
+    if not samples:
+        return {'count': 0}
+    values = np.array(samples) * 1000
+    return {
+        'count': len(values),
+        'rps': round(len(values) / elapsed, 1),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+        'max_ms': round(float(values.max()), 3)
+    }
+
+
+class LoadTest:
+    """Wires main.py to fakes and generates concurrent request load"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+
+        import main as service
+        self.service = service
+        self.db = SyntheticDatabase(args.posts, args.users, seed=args.seed)
+        self.redis = FakeRedis(decode_responses=True)
+        service.recommender.db = self.db
+        service.cache_service.client = self.redis
+        service.cache_service.enabled = True
+
+        self.user_ids = sorted(self.db.user_rows)
+        self.post_ids = [post['id'] for post in self.db.posts]
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=service.app),
+            base_url='http://loadtest',
+            timeout=None
+        )
+
+    def request(self, endpoint: str, item_id: int) -> Tuple[str, Dict[str, Any]]:
+        """Path and query parameters of a request"""
+        if endpoint == 'similar':
+            return '/api/recommend/similar', {'post_id': item_id, 'limit': self.args.limit}
+        return f"/api/recommend/{endpoint}", {'user_id': item_id, 'limit': self.args.limit}
+
+    def cache_key(self, endpoint: str, item_id: int) -> str:
+        """Cache key the recommender uses for a request"""
+        cache = self.service.cache_service
+        if endpoint == 'similar':
+            return cache.get_similar_cache_key(item_id)
+        return cache.get_recommendation_cache_key(item_id, endpoint)
+
+    def evict(self, endpoint: str, item_id: int):
+        """Delete a request's key from L1 and Redis so it misses"""
+        self.service.cache_service.delete(self.cache_key(endpoint, item_id))
+
+    def plan(self) -> List[Tuple[str, int, bool]]:
+        """
+        Build the request sequence
+
+        Returns:
+            (endpoint, user or post ID, cache hit) per request
+        """
+        weights = parse_mix(self.args.mix)
+        pools = {'posts': self.user_ids, 'users': self.user_ids, 'similar': self.post_ids}
+        self.warm = {
+            name: self.rng.sample(pool, min(self.args.warm_keys, len(pool)))
+            for name, pool in pools.items() if name in weights
+        }
+        requests = []
+        for endpoint in self.rng.choices(list(weights), list(weights.values()), k=self.args.requests):
+            hit = self.rng.random() < self.args.hit_ratio
+            item_id = self.rng.choice(self.warm[endpoint] if hit else pools[endpoint])
+            requests.append((endpoint, item_id, hit))
+        return requests
+
+    async def send(self, endpoint: str, item_id: int) -> int:
+        """Send one request and return its status code"""
+        path, params = self.request(endpoint, item_id)
+        response = await self.client.get(path, params=params)
+        return response.status_code
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Build the model, warm the cache and run the timed load
+
+        Returns:
+            JSON-serializable report
+        """
+        started = time.perf_counter()
+        await self.service.recommender.initialize()
+        load_seconds = time.perf_counter() - started
+
+        requests = self.plan()
+        for endpoint, item_ids in self.warm.items():
+            for item_id in item_ids:
+                await self.send(endpoint, item_id)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for request in requests:
+            queue.put_nowait(request)
+        samples: Dict[str, List[float]] = {name: [] for name in ENDPOINTS}
+        errors: Dict[str, int] = {name: 0 for name in ENDPOINTS}
+        stats_before = dict(self.service.cache_service.stats)
+
+        async def worker():
+            while not queue.empty():
+                endpoint, item_id, hit = queue.get_nowait()
+                if not hit:
+                    self.evict(endpoint, item_id)
+                t0 = time.perf_counter()
+                try:
+                    status = await self.send(endpoint, item_id)
+                except Exception:
+                    status = 0
+                samples[endpoint].append(time.perf_counter() - t0)
+                if status != 200:
+                    errors[endpoint] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        elapsed = time.perf_counter() - started
+        await self.client.aclose()
+
+        stats = self.service.cache_service.stats
+        lookups = {name: stats[name] - stats_before[name] for name in stats}
+        hits = lookups['l1_hits'] + lookups['l2_hits']
+        return {
+            'service': 'recommendation-service',
+            'settings': {
+                key: getattr(self.args, key)
+                for key in ('posts', 'users', 'concurrency', 'requests', 'hit_ratio', 'mix', 'limit', 'seed')
+            },
+            'model_build_seconds': round(load_seconds, 3),
+            'elapsed_seconds': round(elapsed, 3),
+            'total': {
+                **latency_stats([s for values in samples.values() for s in values], elapsed),
+                'errors': sum(errors.values())
+            },
+            'endpoints': {
+                name: {**latency_stats(values, elapsed), 'errors': errors[name]}
+                for name, values in samples.items() if values
+            },
+            'cache': {
+                **lookups,
+                'observed_hit_ratio': round(hits / (hits + lookups['l2_misses']), 3)
+                if hits + lookups['l2_misses'] else None,
+                'redis_commands': self.redis.commands
+            }
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    """Print a summary table"""
+    total = report['total']
+    print(f"{total['count']} requests in {report['elapsed_seconds']}s: "
+          f"{total['rps']} req/s, {total['errors']} errors, "
+          f"cache hit ratio {report['cache']['observed_hit_ratio']}")
+    for name, stats in report['endpoints'].items():
+        print(f"  {name:8s} {stats['count']:6d} req  {stats['rps']:8.1f} req/s  "
+              f"p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms  p99 {stats['p99_ms']:8.2f}ms")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="HTTP load test of main.py against a fake DB and Redis")
+    parser.add_argument('--posts', type=int, default=2000,
+                        help="Synthetic posts")
+    parser.add_argument('--users', type=int, default=None,
+                        help="Synthetic users (default: same as posts)")
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help="Concurrent clients")
+    parser.add_argument('--requests', type=int, default=2000,
+                        help="Total requests")
+    parser.add_argument('--hit-ratio', type=float, default=0.8,
+                        help="Share of requests served from warmed cache keys (0-1)")
+    parser.add_argument('--mix', default='posts=5,users=2,similar=3',
+                        help="Endpoint weights (posts, users, similar)")
+    parser.add_argument('--limit', type=int, default=10,
+                        help="Recommendations per request")
+    parser.add_argument('--warm-keys', type=int, default=200,
+                        help="Keys warmed per endpoint before the run")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="Data and request seed")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Silence per-request INFO logs")
+    parser.add_argument('--output',
+                        help="Write the JSON report here")
+    return parser.parse_args(argv)
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Run the load test and report"""
+    if args.quiet:
+        logging.disable(logging.INFO)
+    report = await LoadTest(args).run()
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report['total']['errors'] == 0 else 1
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,331 @@
+"""
+Synthetic-data benchmark suite
+
+Builds the recommender from a SyntheticDatabase at several scales and reports
+model build time, request latency percentiles (cache disabled), peak RSS and
+model size as JSON. Each scale runs in a fresh process so peak RSS is per
+scale.
+
+Usage (from the recommendation-service directory):
+    python -m benchmarks.run --scales 1000,10000,100000 --output bench.json
+    python -m benchmarks.run --compare bench-before.json bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+OPERATIONS = ('posts', 'users', 'similar')
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds"""
+    values = np.array(samples) * 1000
+    return {
+        'count': len(values),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p90_ms': round(float(np.percentile(values, 90)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+        'max_ms': round(float(values.max()), 3)
+    }
+
+
+async def measure(
+    fn: Callable[[int], Awaitable[Any]],
+    args: List[int],
+    time_budget: float
+) -> Dict[str, float]:
+    """
+    Time one request per argument
+
+    Args:
+        fn: Coroutine function under test
+        args: Request arguments (user or post IDs)
+        time_budget: Stop early after this many seconds
+
+    Returns:
+        Latency percentiles
+    """
+    samples = []
+    started = time.perf_counter()
+    for arg in args:
+        t0 = time.perf_counter()
+        await fn(arg)
+        samples.append(time.perf_counter() - t0)
+        if time.perf_counter() - started > time_budget:
+            break
+    return latency_stats(samples)
+
+
+def batch_throughput(recommender: Any, user_ids: List[int]) -> Dict[str, Any]:
+    """
+    Post ranking throughput per user vs in micro-batches of MICRO_BATCH_MAX_SIZE
+
+    Both paths rank the same warm users with the same limit, so the ratio is
+    the gain of scoring a batch with one product per candidate source.
+    """
+    batch_size = int(os.getenv('MICRO_BATCH_MAX_SIZE', '64'))
+    limit = recommender.max_recommendations
+    contexts = [
+        (user_id, [], True) for user_id in dict.fromkeys(user_ids)
+        if not recommender._is_cold_start(user_id)
+    ]
+    if not contexts:
+        return {'users': 0}
+    recommender._rank_post_batch(contexts[:batch_size], limit)  # warm-up
+    
+    t0 = time.perf_counter()
+    for context in contexts:
+        recommender._rank_posts(context, limit)
+    unbatched = len(contexts) / (time.perf_counter() - t0)
+    
+    t0 = time.perf_counter()
+    for start in range(0, len(contexts), batch_size):
+        recommender._rank_post_batch(contexts[start:start + batch_size], limit)
+    batched = len(contexts) / (time.perf_counter() - t0)
+    return {
+        'users': len(contexts),
+        'batch_size': batch_size,
+        'unbatched_users_per_second': round(unbatched, 1),
+        'batched_users_per_second': round(batched, 1),
+        'speedup': round(batched / unbatched, 2)
+    }
+
+
+async def benchmark_scale(
+    scale: int,
+    requests: int,
+    time_budget: float,
+    max_dense_gb: float,
+    seed: int
+) -> Dict[str, Any]:
+    """Generate data, build the model and time requests for one scale"""
+    from benchmarks.synthetic_data import SyntheticDatabase
+    from models.memory_budget import MemoryBudgetExceeded
+    from models.recommender import HybridRecommender
+    from services.cache_service import CacheService
+
+    result: Dict[str, Any] = {'scale': scale}
+    started = time.perf_counter()
+    db = SyntheticDatabase(scale, seed=seed)
+    result['generate_seconds'] = round(time.perf_counter() - started, 3)
+    result['num_posts'] = len(db.posts)
+    result['num_users'] = db.num_users
+    result['num_interactions'] = db.num_interactions
+
+    # Without a memory budget the neighbourhood model keeps dense user-item,
+    # user-user, item-item and post-post matrices; skip scales that cannot fit
+    cache = CacheService()
+    recommender = HybridRecommender(db, cache)
+    users, posts = len(db.user_rows), len(db.posts)
+    dense_bytes = (users * posts + users ** 2 + 2 * posts ** 2) * recommender.dtype.itemsize
+    if not recommender.memory_budget and dense_bytes > max_dense_gb * 1024 ** 3:
+        result['skipped'] = f"dense model matrices would need {dense_bytes / 1024 ** 3:.1f} GB"
+        return result
+
+    t0 = time.perf_counter()
+    try:
+        await recommender.refresh_model(invalidate_cache=False)
+    except MemoryBudgetExceeded as e:
+        result['skipped'] = str(e)
+        return result
+    result['build_seconds'] = {'refresh_model': round(time.perf_counter() - t0, 3)}
+    result['memory_plan'] = recommender.memory_plan.to_dict()
+
+    rng = np.random.default_rng(seed)
+    user_ids = [int(u) for u in rng.choice(np.array(list(db.user_rows)), requests)]
+    post_ids = [int(post['id']) for post in rng.choice(np.array(db.posts, dtype=object), requests)]
+    operations = {
+        'posts': (recommender.recommend_posts, user_ids),
+        'users': (recommender.recommend_users, user_ids),
+        'similar': (recommender.recommend_similar_posts, post_ids)
+    }
+    result['latency'] = {}
+    for name in OPERATIONS:
+        fn, args = operations[name]
+        await fn(args[0])  # warm-up
+        result['latency'][name] = await measure(fn, args, time_budget)
+
+    result['micro_batch'] = batch_throughput(recommender, user_ids)
+    
+    result['model_bytes'] = recommender.memory_usage()
+    result['model_bytes']['total'] = sum(result['model_bytes'].values())
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run_scale(scale: int, requests: int, time_budget: float, max_dense_gb: float, seed: int) -> Dict[str, Any]:
+    """Process-pool entry point: benchmark one scale with caching disabled"""
+    load_dotenv()
+    os.environ['ENABLE_CACHE'] = 'false'
+    return asyncio.run(benchmark_scale(scale, requests, time_budget, max_dense_gb, seed))
+
+
+def git_commit() -> Optional[str]:
+    """Short hash of the checked-out commit (None outside git)"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def run(scales: List[int], requests: int, time_budget: float, max_dense_gb: float, seed: int) -> Dict[str, Any]:
+    """
+    Benchmark every scale, each in a fresh process
+
+    Args:
+        scales: Post (and user) counts
+        requests: Requests timed per operation
+        time_budget: Seconds allowed per operation
+        max_dense_gb: Skip scales whose dense matrices exceed this
+        seed: Data generation seed
+
+    Returns:
+        JSON-serializable report
+    """
+    report: Dict[str, Any] = {
+        'service': 'recommendation-service',
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'settings': {
+            'requests': requests,
+            'time_budget_seconds': time_budget,
+            'seed': seed,
+            **{
+                key: os.getenv(key)
+                for key in ('MODEL_DTYPE', 'CF_ALGORITHM', 'EMBEDDING_DIM', 'VECTOR_QUANTIZATION',
+                            'ANN_NPROBE', 'ANN_EXACT_THRESHOLD', 'USE_HYBRID')
+            }
+        },
+        'results': []
+    }
+    context = multiprocessing.get_context('spawn')
+    for scale in scales:
+        print(f"Benchmarking scale {scale}...", file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                result = executor.submit(run_scale, scale, requests, time_budget, max_dense_gb, seed).result()
+            except Exception as e:
+                result = {'scale': scale, 'error': repr(e)}
+        report['results'].append(result)
+    return report
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]) -> List[str]:
+    """
+    Summarize the change between two reports
+
+    Args:
+        before: Baseline report
+        after: New report
+
+    Returns:
+        Report lines with after/before ratios per scale
+    """
+    def ratio(new_value: float, old_value: float) -> str:
+        return f"{new_value / old_value:.2f}x" if old_value else "n/a"
+
+    lines = [f"{before.get('commit')} -> {after.get('commit')}"]
+    previous = {result['scale']: result for result in before['results']}
+    for result in after['results']:
+        old = previous.get(result['scale'])
+        if old is None or 'latency' not in old or 'latency' not in result:
+            continue
+
+        lines.append(f"scale {result['scale']}:")
+        old_build, new_build = old['build_seconds']['refresh_model'], result['build_seconds']['refresh_model']
+        lines.append(f"  refresh    {old_build:.3f}s -> {new_build:.3f}s ({ratio(new_build, old_build)})")
+        old_size, new_size = old['model_bytes']['total'], result['model_bytes']['total']
+        lines.append(f"  model size {old_size} -> {new_size} ({ratio(new_size, old_size)})")
+        if old.get('peak_rss_mb') and result.get('peak_rss_mb'):
+            lines.append(f"  peak RSS   {old['peak_rss_mb']}MB -> {result['peak_rss_mb']}MB "
+                         f"({ratio(result['peak_rss_mb'], old['peak_rss_mb'])})")
+        for name in OPERATIONS:
+            new_op, old_op = result['latency'][name], old['latency'][name]
+            lines.append(f"  {name:10s} p50 {old_op['p50_ms']}ms -> {new_op['p50_ms']}ms "
+                         f"({ratio(new_op['p50_ms'], old_op['p50_ms'])}), "
+                         f"p99 {old_op['p99_ms']}ms -> {new_op['p99_ms']}ms "
+                         f"({ratio(new_op['p99_ms'], old_op['p99_ms'])})")
+        batch = result.get('micro_batch', {})
+        if batch.get('users'):
+            lines.append(f"  micro-batch {batch['unbatched_users_per_second']} -> "
+                         f"{batch['batched_users_per_second']} users/s ({batch['speedup']}x, after only)")
+    return lines
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark the recommender on synthetic data")
+    parser.add_argument('--scales', default='1000,10000,100000',
+                        help="Comma-separated post (and user) counts")
+    parser.add_argument('--requests', type=int, default=200,
+                        help="Requests timed per operation")
+    parser.add_argument('--time-budget', type=float, default=30.0,
+                        help="Maximum seconds spent timing each operation")
+    parser.add_argument('--max-dense-gb', type=float, default=4.0,
+                        help="Skip scales whose dense model matrices exceed this")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="Data generation seed")
+    parser.add_argument('--output',
+                        help="Write the JSON report here instead of stdout")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help="Compare two JSON reports")
+    return parser.parse_args(argv)
+
+
+def main(args: argparse.Namespace) -> int:
+    """Run the benchmark or compare two reports"""
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        print('\n'.join(compare(before, after)))
+        return 0
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    report = run(scales, args.requests, args.time_budget, args.max_dense_gb, args.seed)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    sys.exit(main(parse_args()))
@@ -0,0 +1,166 @@
+"""
+Seeded synthetic dataset for benchmarks and load tests
+
+Generates posts, users and power-law interactions and serves them through the
+same async methods as DatabaseService, so the recommender can be built and
+queried without MySQL.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+VOCABULARY_SIZE = 5000
+NUM_CATEGORIES = 20
+TOPIC_WORDS = 150
+# (type, weight) as in DatabaseService.get_all_interactions
+INTERACTION_TYPES = [('view', 1.0), ('like', 2.0), ('comment', 2.5)]
+INTERACTION_TYPE_PROBABILITIES = [0.7, 0.2, 0.1]
+
+
+def power_law_weights(size: int, exponent: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Probabilities proportional to rank^-exponent over shuffled ranks
+
+    Args:
+        size: Number of entries
+        exponent: Power-law exponent
+        rng: Random generator
+
+    Returns:
+        Probability vector summing to 1
+    """
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+class SyntheticDatabase:
+    """
+    In-memory stand-in for DatabaseService backed by generated data
+
+    Post bodies mix per-category topic words with Zipf-distributed global
+    words; user activity and post popularity follow power laws, and half of
+    each user's interactions come from a preferred category.
+    """
+
+    def __init__(
+        self,
+        num_posts: int,
+        num_users: Optional[int] = None,
+        interactions_per_user: int = 10,
+        words_per_post: int = 40,
+        days: int = 90,
+        seed: int = 42
+    ):
+        rng = np.random.default_rng(seed)
+        now = datetime.now()
+        num_users = num_users or num_posts
+        vocabulary = np.array([f"w{i}" for i in range(VOCABULARY_SIZE)])
+
+        # Posts
+        categories = rng.integers(0, NUM_CATEGORIES, num_posts)
+        topic_words = rng.integers(0, VOCABULARY_SIZE, (NUM_CATEGORIES, TOPIC_WORDS))
+        global_words = power_law_weights(VOCABULARY_SIZE, 1.1, rng)
+        topical = rng.random((num_posts, words_per_post)) < 0.6
+        words = np.where(
+            topical,
+            topic_words[categories[:, None], rng.integers(0, TOPIC_WORDS, (num_posts, words_per_post))],
+            rng.choice(VOCABULARY_SIZE, (num_posts, words_per_post), p=global_words)
+        )
+        popularity = power_law_weights(num_posts, 0.9, rng)
+        authors = rng.integers(1, num_users + 1, num_posts)
+        post_times = [now - timedelta(days=float(age)) for age in rng.uniform(0, days, num_posts)]
+
+        # Interactions (user activity and post popularity both power-law)
+        num_interactions = num_users * interactions_per_user
+        user_idx = rng.choice(num_users, num_interactions, p=power_law_weights(num_users, 0.8, rng))
+        post_idx = rng.choice(num_posts, num_interactions, p=popularity)
+        preferred = rng.integers(0, NUM_CATEGORIES, num_users)
+        by_category = np.argsort(categories, kind='stable')
+        counts = np.bincount(categories, minlength=NUM_CATEGORIES)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        target = preferred[user_idx]
+        pick = (rng.random(num_interactions) < 0.5) & (counts[target] > 0)
+        post_idx[pick] = by_category[
+            offsets[target[pick]] + rng.integers(0, np.maximum(counts[target[pick]], 1))
+        ]
+        types = rng.choice(len(INTERACTION_TYPES), num_interactions, p=INTERACTION_TYPE_PROBABILITIES)
+        ages = rng.uniform(0, days, num_interactions)
+
+        # Per-user rows, authored posts first (weight 3.0 as in the SQL)
+        self.user_rows: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for i in range(num_posts):
+            self.user_rows[int(authors[i])].append({
+                'type': 'post', 'item_id': i + 1, 'timestamp': post_times[i], 'weight': 3.0
+            })
+        type_counts = np.zeros((num_posts, len(INTERACTION_TYPES)), dtype=np.int64)
+        np.add.at(type_counts, (post_idx, types), 1)
+        for i in range(num_interactions):
+            interaction_type, weight = INTERACTION_TYPES[types[i]]
+            self.user_rows[int(user_idx[i]) + 1].append({
+                'type': interaction_type,
+                'item_id': int(post_idx[i]) + 1,
+                'timestamp': now - timedelta(days=float(ages[i])),
+                'weight': weight
+            })
+        for rows in self.user_rows.values():
+            rows.sort(key=lambda row: row['timestamp'], reverse=True)
+
+        self.posts = [
+            {
+                'id': i + 1,
+                'title': ' '.join(vocabulary[words[i, :6]]),
+                'content': ' '.join(vocabulary[words[i, 6:]]),
+                'category_id': int(categories[i]) + 1,
+                'author_id': int(authors[i]),
+                'tags': None,
+                'like_count': int(type_counts[i, 1]),
+                'comment_count': int(type_counts[i, 2]),
+                'view_count': int(type_counts[i, 0]),
+                'created_at': post_times[i]
+            }
+            for i in range(num_posts)
+        ]
+        self.posts.reverse()  # ORDER BY p.id DESC
+        self.num_users = num_users
+        self.num_interactions = num_interactions
+
+    async def connect(self):
+        """No-op (nothing to connect to)"""
+
+    async def disconnect(self):
+        """No-op (nothing to disconnect from)"""
+
+    async def get_all_interactions(self) -> List[Dict[str, Any]]:
+        """Summed interaction weight per (user, post)"""
+        totals: Dict[tuple, float] = defaultdict(float)
+        for user_id, rows in self.user_rows.items():
+            for row in rows:
+                totals[(user_id, row['item_id'])] += row['weight']
+        return [
+            {'user_id': user_id, 'item_id': item_id, 'total_weight': weight}
+            for (user_id, item_id), weight in totals.items()
+        ]
+
+    async def get_all_user_activity(self) -> List[Dict[str, Any]]:
+        """(user_id, type, item_id, timestamp) rows for all users"""
+        return [
+            {'user_id': user_id, 'type': row['type'], 'item_id': row['item_id'], 'timestamp': row['timestamp']}
+            for user_id, rows in self.user_rows.items()
+            for row in rows
+        ]
+
+    async def get_all_posts_features(self) -> List[Dict[str, Any]]:
+        """Features for all posts (no LIMIT, unlike the SQL query)"""
+        return [dict(post) for post in self.posts]
+
+    async def get_blocked_user_ids(self, user_id: int) -> List[int]:
+        """Users blocked by a user (the synthetic data has no blocks)"""
+        return []
+
+    async def get_users_blocked_ids(self, user_ids: List[int]) -> Dict[int, List[int]]:
+        """Blocked users per blocking user (the synthetic data has no blocks)"""
+        return {}
@@ -0,0 +1,237 @@
+"""
+Offline bulk precompute job
+
+Pre-warms the recommendation cache for active users so that peak traffic
+after a model refresh hits warm entries instead of running the full hybrid
+pipeline per request. Chunks of users are scored across a process pool:
+post lists go through the batched candidate pipeline and exclusion mask
+(seen, deleted, blocked authors) of the online path, similar-user lists
+through one similarity slice per chunk.
+
+Usage (from the recommendation-service directory):
+    python -m jobs.precompute --workers 4 --chunk-size 256
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from scipy import sparse
+
+from models.batch_scoring import SnapshotScorer
+from models.recommender import HybridRecommender
+from services.cache_service import CacheService
+from services.database_service import DatabaseService
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Model snapshot installed in each worker process by _init_worker (in-process by _install)
+_scorer: Optional[SnapshotScorer] = None
+_recommender: Optional[HybridRecommender] = None
+
+
+def _install(scorer: SnapshotScorer, recommender: HybridRecommender):
+    """Install the model snapshot used by _score_chunk"""
+    global _scorer, _recommender
+    _scorer = scorer
+    _recommender = recommender
+
+
+def _init_worker(scorer: SnapshotScorer, recommender: HybridRecommender):
+    """Install the model snapshot in a pool worker"""
+    # A forked worker inherits the pipeline's thread pool but none of its threads
+    recommender.pipeline.run_inline()
+    _install(scorer, recommender)
+
+
+def _score_chunk(user_idx: np.ndarray, blocked: Dict[int, List[int]]) -> List[Dict[str, List[Dict]]]:
+    """
+    Rank post lists and similar users for one chunk in a pool worker
+
+    Warm users are ranked like a micro-batch of online misses (one pass of
+    the candidate pipeline per list type); cold-start users get trending
+    posts.
+
+    Args:
+        user_idx: Row positions in the user-item matrix
+        blocked: Blocked user IDs per user of the chunk
+
+    Returns:
+        One {'posts', 'posts_all', 'users'} dictionary per user
+    """
+    limit = _recommender.max_recommendations
+    user_ids = [int(user_id) for user_id in _scorer.user_ids[user_idx]]
+    cold = [_recommender._is_cold_start(user_id) for user_id in user_ids]
+    warm = [i for i, is_cold in enumerate(cold) if not is_cold]
+
+    results = [{'users': users} for users in _scorer.score_users(user_idx)]
+    for rec_type, exclude_viewed in (('posts', True), ('posts_all', False)):
+        contexts = [(user_id, blocked.get(user_id, []), exclude_viewed) for user_id in user_ids]
+        ranked = _recommender._rank_post_batch([contexts[i] for i in warm], limit)
+        for i, recommendations in zip(warm, ranked):
+            results[i][rec_type] = recommendations
+        for i, is_cold in enumerate(cold):
+            if is_cold:
+                results[i][rec_type] = _recommender._rank_posts(contexts[i], limit, True)
+    return results
+
+
+class PrecomputeJob:
+    """Computes post/user recommendations for active users and bulk-writes them"""
+
+    def __init__(
+        self,
+        recommender: HybridRecommender,
+        workers: int = 0,
+        chunk_size: int = 256,
+        max_users: Optional[int] = None
+    ):
+        self.recommender = recommender
+        self.db = recommender.db
+        self.cache = recommender.cache
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_users = max_users
+
+    def active_users(self, scorer: SnapshotScorer) -> np.ndarray:
+        """
+        Row positions of users in the model snapshot, most active first
+
+        Args:
+            scorer: Snapshot being scored
+
+        Returns:
+            Array of user-item matrix row positions
+        """
+        if sparse.issparse(scorer.user_item):
+            activity = scorer.user_item.getnnz(axis=1)
+        else:
+            activity = np.count_nonzero(scorer.user_item, axis=1)
+        order = np.argsort(-activity, kind='stable')
+        order = order[activity[order] > 0]
+        if self.max_users:
+            order = order[:self.max_users]
+        return order
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Score all active users and write their recommendations to Redis
+
+        Returns:
+            Run summary (users, elapsed seconds, users/sec, model version)
+        """
+        if self.recommender.user_item_matrix is None:
+            logger.warning("No collaborative model; nothing to precompute")
+            return {'users': 0}
+
+        scorer = SnapshotScorer.from_recommender(self.recommender)
+        user_idx = self.active_users(scorer)
+        chunks = [
+            user_idx[start:start + self.chunk_size]
+            for start in range(0, len(user_idx), self.chunk_size)
+        ]
+
+        logger.info(
+            f"Precomputing {len(user_idx)} users in {len(chunks)} chunks "
+            f"(model version {self.recommender.model_version}, {self.workers} workers)"
+        )
+
+        started = time.perf_counter()
+        written = 0
+        if self.workers > 0:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(scorer, self.recommender)
+            ) as executor:
+                pending: List[Tuple[Future, List[int]]] = []
+                for chunk in chunks:
+                    user_ids = [int(user_id) for user_id in scorer.user_ids[chunk]]
+                    blocked = await self.db.get_users_blocked_ids(user_ids)
+                    pending.append((executor.submit(_score_chunk, chunk, blocked), user_ids))
+                    # Bound in-flight chunks so results are written as they finish
+                    if len(pending) >= self.workers * 2:
+                        future, done = pending.pop(0)
+                        written += self._write(done, await asyncio.wrap_future(future))
+                for future, done in pending:
+                    written += self._write(done, await asyncio.wrap_future(future))
+        else:
+            _install(scorer, self.recommender)
+            for chunk in chunks:
+                user_ids = [int(user_id) for user_id in scorer.user_ids[chunk]]
+                blocked = await self.db.get_users_blocked_ids(user_ids)
+                written += self._write(user_ids, _score_chunk(chunk, blocked))
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            'users': len(user_idx),
+            'keys_written': written,
+            'elapsed_seconds': round(elapsed, 3),
+            'users_per_second': round(len(user_idx) / elapsed, 1) if elapsed > 0 else None,
+            'model_version': self.recommender.model_version,
+            'workers': self.workers,
+            'chunk_size': self.chunk_size
+        }
+        self.cache.set_many({
+            f"recommendations:precompute:g{self.recommender.model_version}": summary
+        })
+        logger.info(f"Precompute finished: {summary}")
+        return summary
+
+    def _write(self, user_ids: List[int], user_recs: List[Dict[str, List[Dict]]]) -> int:
+        """Pipeline one chunk's post and user lists into Redis"""
+        items: Dict[str, Any] = {}
+        for rec_type in ('posts', 'posts_all', 'users'):
+            keys = self.cache.get_recommendation_cache_keys(user_ids, rec_type)
+            items.update({key: recs[rec_type] for key, recs in zip(keys, user_recs)})
+
+        self.cache.set_many(items)
+        return len(items)
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build the model snapshot and run the precompute job"""
+    db_service = DatabaseService()
+    cache_service = CacheService()
+    recommender = HybridRecommender(db_service, cache_service)
+
+    await db_service.connect()
+    await cache_service.connect()
+    try:
+        # Write under the generation the service is already serving unless asked
+        await recommender.refresh_model(invalidate_cache=args.new_generation)
+        job = PrecomputeJob(
+            recommender,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            max_users=args.max_users
+        )
+        return await job.run()
+    finally:
+        await db_service.disconnect()
+        await cache_service.disconnect()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Pre-warm recommendation caches for active users")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Scoring processes (0 scores in the main process)")
+    parser.add_argument('--chunk-size', type=int, default=256,
+                        help="Users scored per matrix operation")
+    parser.add_argument('--max-users', type=int, default=None,
+                        help="Only warm the N most active users")
+    parser.add_argument('--new-generation', action='store_true',
+                        help="Bump the cache generation (new model version) before writing")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main(parse_args()))
@@ -3,17 +3,27 @@ Community Platform - Recommendation Service
 FastAPI-based recommendation engine using hybrid filtering
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
 import uvicorn
 import os
+import time
+from datetime import datetime
 from dotenv import load_dotenv
 
+from models.feed import FeedExpired, InvalidCursor
 from models.recommender import HybridRecommender
 from services.cache_service import CacheService
 from services.database_service import DatabaseService
+from utils.compute_pool import ComputePoolSaturated
 from utils.logger import get_logger
+from utils.metrics import (
+    HTTP_REQUEST_SECONDS,
+    MODEL_SNAPSHOT_AGE_SECONDS,
+    TimedJSONResponse,
+    render as render_metrics
+)
 
 # Load environment variables
 load_dotenv()
@@ -22,7 +32,8 @@ load_dotenv()
 app = FastAPI(
     title="Community Platform Recommendation Service",
     description="ML-based content recommendation engine",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=TimedJSONResponse
 )
 
 # CORS configuration
@@ -39,6 +50,21 @@ logger = get_logger(__name__)
 db_service = DatabaseService()
 cache_service = CacheService()
 recommender = HybridRecommender(db_service, cache_service)
+MODEL_SNAPSHOT_AGE_SECONDS.set_function(
+    lambda: (datetime.now() - recommender.last_update).total_seconds() if recommender.last_update else 0.0
+)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record request latency per route template"""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get('route')
+    HTTP_REQUEST_SECONDS.labels(
+        request.method, route.path if route else 'unmatched', response.status_code
+    ).observe(time.perf_counter() - started)
+    return response
 
 
 @app.on_event("startup")
@@ -61,6 +87,8 @@ async def shutdown_event():
     logger.info("Shutting down Recommendation Service...")
     await db_service.disconnect()
     await cache_service.disconnect()
+    recommender.compute.shutdown()
+    recommender.pipeline.shutdown()
     logger.info("Recommendation Service stopped")
 
 
@@ -74,6 +102,13 @@ async def root():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (stage latency histograms, cache counters, model gauges)"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/api/recommend/posts")
 async def recommend_posts(
     user_id: int,
@@ -106,11 +141,61 @@ async def recommend_posts(
             "count": len(recommendations)
         }
         
+    except ComputePoolSaturated as e:
+        # Shed load instead of queueing behind busy scoring workers
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error recommending posts: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/recommend/feed")
+async def recommend_feed(
+    user_id: int,
+    limit: int = Query(default=20, ge=1, le=50),
+    cursor: Optional[str] = Query(default=None),
+    exclude_seen: bool = Query(default=False)
+):
+    """
+    Get one page of a user's infinite-scroll feed
+    
+    Args:
+        user_id: User ID
+        limit: Page size (1-50)
+        cursor: next_cursor from the previous page (omit for the first page)
+        exclude_seen: Skip posts the user interacted with since the feed was built
+    
+    Returns:
+        Page of recommended post IDs with scores and the cursor of the next page
+        (null at the end); 410 when the feed expired or the model was refreshed
+    """
+    try:
+        recommendations, next_cursor = await recommender.recommend_feed(
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            exclude_seen=exclude_seen
+        )
+        
+        return {
+            "user_id": user_id,
+            "recommendations": recommendations,
+            "count": len(recommendations),
+            "next_cursor": next_cursor
+        }
+        
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FeedExpired as e:
+        # Client restarts the feed from the first page
+        raise HTTPException(status_code=410, detail=str(e))
+    except ComputePoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting feed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/recommend/users")
 async def recommend_users(
     user_id: int,
@@ -140,6 +225,9 @@ async def recommend_users(
             "count": len(recommendations)
         }
         
+    except ComputePoolSaturated as e:
+        # Shed load instead of queueing behind busy scoring workers
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error recommending users: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -174,11 +262,60 @@ async def recommend_similar_posts(
             "count": len(recommendations)
         }
         
+    except ComputePoolSaturated as e:
+        # Shed load instead of queueing behind busy scoring workers
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error finding similar posts: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.delete("/api/recommend/posts/{post_id}")
+async def remove_post(post_id: int):
+    """
+    Stop recommending a deleted post until the next model refresh
+    Requires admin authentication in production
+    
+    Args:
+        post_id: Deleted post ID
+    
+    Returns:
+        Whether the post was newly removed
+    """
+    try:
+        removed = recommender.remove_posts([post_id])
+        return {"post_id": post_id, "removed": bool(removed)}
+    except Exception as e:
+        logger.error(f"Error removing post {post_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/recommend/interactions")
+async def record_interaction(
+    user_id: int,
+    post_id: int,
+    type: str = Query(default='view', pattern='^(post|like|view|comment)$')
+):
+    """
+    Add a new interaction to the user's history (seen posts, profile) until the next refresh
+    Called by the backend when a post is created, liked, viewed or commented on
+    
+    Args:
+        user_id: User ID
+        post_id: Post ID
+        type: Interaction type (post, like, view, comment)
+    
+    Returns:
+        Whether the post is in the current model snapshot
+    """
+    try:
+        recorded = recommender.record_interaction(user_id, post_id, type)
+        return {"user_id": user_id, "post_id": post_id, "recorded": recorded}
+    except Exception as e:
+        logger.error(f"Error recording interaction for user {user_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/recommend/refresh")
 async def refresh_model():
     """
@@ -187,7 +324,13 @@ async def refresh_model():
     """
     try:
         logger.info("Manual model refresh triggered")
-        await recommender.refresh_model()
+        if not await recommender.refresh_model():
+            # Over MODEL_MEMORY_BUDGET_MB: the previous snapshot keeps serving
+            return TimedJSONResponse(status_code=507, content={
+                "status": "refused",
+                "message": recommender.refused_refresh['reason'],
+                "estimated_bytes": recommender.refused_refresh['estimated_bytes']
+            })
         return {"status": "success", "message": "Model refreshed successfully"}
     except Exception as e:
         logger.error(f"Error refreshing model: {str(e)}")
@@ -0,0 +1,144 @@
+"""
+Per-user interaction history keyed by dense post index
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Interaction types that form the content profile (and the exclusion set without exclude_viewed)
+LIKED_TYPES = ('like', 'post')
+
+
+class UserActivityIndex:
+    """
+    Every user's interactions as CSR slices over a dense post index
+
+    Posts get dense positions 0..n-1 in post ID order (`catalog`). Rows are
+    sorted once by (user, newest first), so a user's history is the slice
+    indptr[row]:indptr[row + 1] of `positions` / `liked` and seen-post
+    exclusion is a boolean mask over the dense index. Interactions recorded
+    after the build are merged per user and kept until the next snapshot.
+    """
+
+    def __init__(
+        self,
+        catalog: np.ndarray,
+        users: np.ndarray,
+        indptr: np.ndarray,
+        positions: np.ndarray,
+        liked: np.ndarray
+    ):
+        self.catalog = catalog
+        self.user_rows: Dict[int, int] = {int(user_id): row for row, user_id in enumerate(users)}
+        self.indptr = indptr
+        self.positions = positions
+        self.liked = liked
+        self.updates: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        rows: List[Dict[str, Any]],
+        post_ids: Sequence[np.ndarray] = ()
+    ) -> 'UserActivityIndex':
+        """
+        Sort activity rows by (user, newest first) and index them
+
+        Args:
+            rows: Rows from get_all_user_activity (user_id, type, item_id, timestamp)
+            post_ids: Further post IDs that need dense positions (snapshot posts, matrix columns)
+
+        Returns:
+            UserActivityIndex
+        """
+        if not rows:
+            catalog = np.unique(np.concatenate([np.empty(0, dtype=np.int64), *post_ids]).astype(np.int64))
+            return cls(
+                catalog,
+                np.empty(0, dtype=np.int64),
+                np.zeros(1, dtype=np.int64),
+                np.empty(0, dtype=np.int32),
+                np.empty(0, dtype=bool)
+            )
+
+        df = pd.DataFrame(rows)
+        user_ids = df['user_id'].to_numpy(dtype=np.int64)
+        item_ids = df['item_id'].to_numpy(dtype=np.int64)
+        timestamps = pd.to_datetime(df['timestamp']).fillna(pd.Timestamp(0))
+        newest = -timestamps.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        order = np.lexsort((newest, user_ids))
+
+        catalog = np.unique(np.concatenate([item_ids, *post_ids]).astype(np.int64))
+        users, starts = np.unique(user_ids[order], return_index=True)
+        return cls(
+            catalog,
+            users,
+            np.append(starts, len(order)).astype(np.int64),
+            np.searchsorted(catalog, item_ids[order]).astype(np.int32),
+            df['type'].isin(LIKED_TYPES).to_numpy()[order]
+        )
+
+    def lookup(self, post_ids: Sequence[int]) -> np.ndarray:
+        """Dense positions of post IDs (-1 for posts outside the snapshot)"""
+        post_ids = np.asarray(post_ids, dtype=np.int64)
+        if len(self.catalog) == 0:
+            return np.full(len(post_ids), -1, dtype=np.int64)
+        slots = np.searchsorted(self.catalog, post_ids)
+        slots[slots == len(self.catalog)] = 0
+        return np.where(self.catalog[slots] == post_ids, slots, -1)
+
+    def history(self, user_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        A user's interactions, newest first
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            (dense post positions, liked/authored flags)
+        """
+        updated = self.updates.get(user_id)
+        if updated is not None:
+            return updated
+        row = self.user_rows.get(user_id)
+        if row is None:
+            return self.positions[:0], self.liked[:0]
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.positions[start:end], self.liked[start:end]
+
+    def record(self, user_id: int, post_id: int, interaction_type: str) -> bool:
+        """
+        Add an interaction that happened after the snapshot as the user's newest
+
+        Args:
+            user_id: User ID
+            post_id: Post ID
+            interaction_type: post, like, view or comment
+
+        Returns:
+            False if the post is outside the snapshot (picked up by the next refresh)
+        """
+        position = self.lookup([post_id])[0]
+        if position < 0:
+            return False
+        positions, liked = self.history(user_id)
+        # Swapped in one assignment; running requests keep the previous arrays
+        self.updates[user_id] = (
+            np.concatenate([np.array([position], dtype=np.int32), positions]),
+            np.concatenate([np.array([interaction_type in LIKED_TYPES]), liked])
+        )
+        return True
+
+    def mask(self, *positions: np.ndarray) -> np.ndarray:
+        """Boolean array over the dense post index with the given positions set (-1 ignored)"""
+        mask = np.zeros(len(self.catalog), dtype=bool)
+        for group in positions:
+            mask[group[group >= 0]] = True
+        return mask
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the index arrays"""
+        return self.catalog.nbytes + self.indptr.nbytes + self.positions.nbytes + self.liked.nbytes
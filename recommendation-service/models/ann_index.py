@@ -0,0 +1,341 @@
+"""
+Approximate nearest-neighbour index (IVF) for post vectors
+"""
+
+import os
+import time
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+from scipy import sparse
+
+from models.quantization import QuantizedVectors
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Vectors = Union[np.ndarray, sparse.csr_matrix, QuantizedVectors]
+
+
+class IVFIndex:
+    """
+    Inverted-file index for cosine similarity over L2-normalized vectors
+
+    Spherical k-means splits the vectors into nlist lists; a query is only
+    compared exactly against the vectors in its nprobe closest lists. Raise
+    nprobe for recall, lower it for latency. At or below exact_threshold
+    vectors the index skips clustering and searches exhaustively. Works on
+    sparse (TF-IDF) and dense vectors alike. With quantize, dense vectors are
+    stored as int8; rerank > 0 also keeps the float vectors and re-scores the
+    top k * rerank candidates exactly.
+    """
+
+    def __init__(
+        self,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        exact_threshold: int = 5000,
+        train_size: int = 50000,
+        iterations: int = 10,
+        random_state: int = 42,
+        quantize: bool = False,
+        rerank: int = 0
+    ):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.exact_threshold = exact_threshold
+        self.train_size = train_size
+        self.iterations = iterations
+        self.random_state = random_state
+        self.quantize = quantize
+        self.rerank = rerank
+        self.signature = ''
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors: Optional[Vectors] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.empty(0, dtype=np.int32)
+        self._positions: Dict[int, int] = {}
+        self._order: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, item_id: int) -> bool:
+        return int(item_id) in self._positions
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by vectors, centroids, IDs and assignments in bytes"""
+        total = self.ids.nbytes + self.assignments.nbytes
+        if self.centroids is not None:
+            total += self.centroids.nbytes
+        if isinstance(self.vectors, QuantizedVectors):
+            total += self.vectors.nbytes
+        elif sparse.issparse(self.vectors):
+            total += self.vectors.data.nbytes + self.vectors.indices.nbytes + self.vectors.indptr.nbytes
+        elif self.vectors is not None:
+            total += self.vectors.nbytes
+        return total
+
+    def build(self, ids: np.ndarray, vectors: Vectors, signature: str = '') -> 'IVFIndex':
+        """
+        Build the index from scratch (train lists and assign vectors)
+
+        Args:
+            ids: Item ID per row
+            vectors: One L2-normalized vector per row
+            signature: Identifier of the model that produced the vectors
+
+        Returns:
+            self
+        """
+        started = time.perf_counter()
+        self.signature = signature
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.vectors = self._as_rows(vectors)
+        self._positions = {int(item_id): row for row, item_id in enumerate(self.ids)}
+
+        if len(self.ids) > self.exact_threshold:
+            self.centroids = self._train(self.vectors)
+            self.assignments = self._assign(self.vectors)
+        else:
+            self.centroids = None
+            self.assignments = np.zeros(len(self.ids), dtype=np.int32)
+        if self.quantize and not sparse.issparse(self.vectors):
+            self.vectors = QuantizedVectors.quantize(self.vectors, keep_float=self.rerank > 0)
+        self._order = None
+
+        logger.info(
+            f"ANN index built: {len(self.ids)} vectors, "
+            f"{len(self.centroids) if self.centroids is not None else 0} lists "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return self
+
+    def add(self, ids: np.ndarray, vectors: Vectors) -> int:
+        """
+        Insert new vectors into the existing lists without retraining
+
+        Args:
+            ids: Item IDs (already indexed IDs are skipped)
+            vectors: One vector per ID
+
+        Returns:
+            Number of vectors added
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = self._as_rows(vectors)
+        new_rows = np.array([int(item_id) not in self._positions for item_id in ids], dtype=bool)
+        if not new_rows.any():
+            return 0
+
+        ids = ids[new_rows]
+        vectors = vectors[np.flatnonzero(new_rows)]
+        if self.vectors is None:
+            return len(self.build(ids, vectors, self.signature))
+
+        offset = len(self.ids)
+        if isinstance(self.vectors, QuantizedVectors):
+            self.vectors.append(vectors)
+        elif sparse.issparse(self.vectors):
+            self.vectors = sparse.vstack([self.vectors, vectors], format='csr')
+        else:
+            self.vectors = np.vstack([self.vectors, vectors])
+        self.ids = np.concatenate([self.ids, ids])
+        if self.centroids is not None:
+            assignments = self._assign(vectors)
+        else:
+            assignments = np.zeros(len(ids), dtype=np.int32)
+        self.assignments = np.concatenate([self.assignments, assignments])
+        for row, item_id in enumerate(ids, start=offset):
+            self._positions[int(item_id)] = row
+        self._order = None
+        return len(ids)
+
+    def search(
+        self,
+        query: Vectors,
+        k: int = 10,
+        nprobe: Optional[int] = None,
+        exclude_id: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k most similar indexed items to a query vector
+
+        Args:
+            query: 1 x d query vector
+            k: Number of results
+            nprobe: Lists to scan (defaults to self.nprobe)
+            exclude_id: Item ID to leave out of the results
+
+        Returns:
+            (item IDs, cosine scores), best first
+        """
+        if self.vectors is None or len(self.ids) == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query = self._as_rows(query)
+        if self.centroids is None:
+            rows = None
+        else:
+            centroid_scores = self._dense(query @ self.centroids.T).ravel()
+            nprobe = min(nprobe or self.nprobe, len(self.centroids))
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+            rows = self._list_rows(probe)
+
+        excluded = self._positions.get(int(exclude_id)) if exclude_id is not None else None
+        if isinstance(self.vectors, QuantizedVectors):
+            positions, scores = self.vectors.top_k(
+                query[0], k, rows=rows,
+                exclude=np.array([excluded]) if excluded is not None else None,
+                rerank=self.rerank
+            )
+            return self.ids[positions], scores
+
+        candidates = self.vectors if rows is None else self.vectors[rows]
+        scores = self._dense(candidates @ query.T).ravel().astype(np.float32)
+        if excluded is not None:
+            if rows is None:
+                scores[excluded] = -np.inf
+            else:
+                scores[rows == excluded] = -np.inf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        top = top[np.isfinite(scores[top])]
+        positions = top if rows is None else rows[top]
+        return self.ids[positions], scores[top]
+
+    def search_by_id(
+        self,
+        item_id: int,
+        k: int = 10,
+        nprobe: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """k most similar items to an indexed item (excluding itself)"""
+        row = self._positions.get(int(item_id))
+        if row is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if isinstance(self.vectors, QuantizedVectors):
+            query = self.vectors.reconstruct(slice(row, row + 1))
+        else:
+            query = self.vectors[row:row + 1]
+        return self.search(query, k, nprobe=nprobe, exclude_id=item_id)
+
+    def save(self, path: str):
+        """Write the index to an .npz file (atomically via a temporary file)"""
+        arrays = {
+            'ids': self.ids,
+            'assignments': self.assignments,
+            'centroids': self.centroids if self.centroids is not None else np.empty((0, 0), dtype=np.float32),
+            'params': np.array([self.nlist or 0, self.nprobe, self.exact_threshold,
+                                self.train_size, self.iterations, self.random_state,
+                                int(self.quantize), self.rerank]),
+            'signature': np.array(self.signature)
+        }
+        if isinstance(self.vectors, QuantizedVectors):
+            arrays.update(codes=self.vectors.codes, scales=self.vectors.scales)
+            if self.vectors.float_vectors is not None:
+                arrays['vectors'] = self.vectors.float_vectors
+        elif sparse.issparse(self.vectors):
+            arrays.update(
+                data=self.vectors.data,
+                indices=self.vectors.indices,
+                indptr=self.vectors.indptr,
+                shape=np.array(self.vectors.shape)
+            )
+        else:
+            arrays['vectors'] = self.vectors
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'IVFIndex':
+        """Load an index written by save()"""
+        with np.load(path, allow_pickle=False) as saved:
+            nlist, nprobe, exact_threshold, train_size, iterations, random_state, quantize, rerank = (
+                int(value) for value in saved['params']
+            )
+            index = cls(nlist or None, nprobe, exact_threshold, train_size, iterations,
+                        random_state, bool(quantize), rerank)
+            index.signature = str(saved['signature'])
+            index.ids = saved['ids']
+            index.assignments = saved['assignments']
+            index.centroids = saved['centroids'] if saved['centroids'].size else None
+            if 'codes' in saved:
+                index.vectors = QuantizedVectors(
+                    saved['codes'], saved['scales'],
+                    saved['vectors'] if 'vectors' in saved else None
+                )
+            elif 'vectors' in saved:
+                index.vectors = saved['vectors']
+            else:
+                index.vectors = sparse.csr_matrix(
+                    (saved['data'], saved['indices'], saved['indptr']),
+                    shape=tuple(saved['shape'])
+                )
+        index._positions = {int(item_id): row for row, item_id in enumerate(index.ids)}
+        return index
+
+    def _train(self, vectors: Vectors) -> np.ndarray:
+        """Train list centroids with spherical k-means on a sample"""
+        rng = np.random.default_rng(self.random_state)
+        nlist = self.nlist or max(1, int(np.sqrt(vectors.shape[0])))
+        sample = vectors[np.sort(rng.choice(vectors.shape[0], min(vectors.shape[0], self.train_size), replace=False))]
+        nlist = min(nlist, sample.shape[0])
+        centroids = self._dense(sample[rng.choice(sample.shape[0], nlist, replace=False)])
+
+        for _ in range(self.iterations):
+            labels = np.argmax(self._dense(sample @ centroids.T), axis=1)
+            members = sparse.csr_matrix(
+                (np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+                shape=(nlist, sample.shape[0])
+            )
+            sums = self._dense(members @ sample)
+            norms = np.linalg.norm(sums, axis=1)
+            # Empty lists keep their previous centroid
+            filled = norms > 0
+            centroids[filled] = sums[filled] / norms[filled, None]
+
+        return centroids
+
+    def _assign(self, vectors: Vectors, chunk_size: int = 8192) -> np.ndarray:
+        """Assign every vector to its closest centroid"""
+        assignments = np.empty(vectors.shape[0], dtype=np.int32)
+        for start in range(0, vectors.shape[0], chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            assignments[start:start + chunk_size] = np.argmax(
+                self._dense(chunk @ self.centroids.T), axis=1
+            )
+        return assignments
+
+    def _list_rows(self, probe: np.ndarray) -> np.ndarray:
+        """Row positions belonging to the probed lists"""
+        if self._order is None:
+            self._order = np.argsort(self.assignments, kind='stable')
+            counts = np.bincount(self.assignments, minlength=len(self.centroids))
+            self._offsets = np.concatenate([[0], np.cumsum(counts)])
+        return np.concatenate([
+            self._order[self._offsets[c]:self._offsets[c + 1]] for c in probe
+        ])
+
+    @staticmethod
+    def _as_rows(vectors: Vectors) -> Vectors:
+        """Convert to float32 CSR or a C-contiguous array"""
+        if sparse.issparse(vectors):
+            return sparse.csr_matrix(vectors, dtype=np.float32)
+        return np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+
+    @staticmethod
+    def _dense(matrix) -> np.ndarray:
+        """Densify a (possibly sparse) product as float32"""
+        if sparse.issparse(matrix):
+            matrix = matrix.toarray()
+        return np.asarray(matrix, dtype=np.float32)
@@ -0,0 +1,99 @@
+"""
+Vectorized batch scoring against a recommendation model snapshot
+"""
+
+import numpy as np
+from scipy import sparse
+from typing import Any, Dict, List, Optional, Union
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SnapshotScorer:
+    """
+    Scores chunks of users with matrix operations
+
+    Mirrors HybridRecommender's user-similarity path for many users at once
+    (post lists go through the candidate pipeline instead). Holds only plain
+    NumPy/SciPy arrays so it can be shipped to worker processes.
+    """
+
+    def __init__(
+        self,
+        user_item: Union[np.ndarray, sparse.csr_matrix],
+        user_ids: np.ndarray,
+        user_similarity: Optional[np.ndarray],
+        similarity_threshold: float,
+        max_recommendations: int
+    ):
+        self.user_item = user_item
+        self.user_ids = user_ids
+        self.user_similarity = user_similarity
+        self.similarity_threshold = similarity_threshold
+        self.max_recommendations = max_recommendations
+
+    @classmethod
+    def from_recommender(cls, recommender: Any) -> 'SnapshotScorer':
+        """
+        Build a scorer from a refreshed HybridRecommender
+
+        Args:
+            recommender: HybridRecommender with built models
+
+        Returns:
+            SnapshotScorer
+        """
+        matrix = recommender.user_item_matrix
+        return cls(
+            # CSR whenever the model keeps a sparse user-item matrix (memory budget)
+            user_item=(
+                matrix.to_numpy(dtype=recommender.dtype)
+                if recommender.memory_plan is None
+                or recommender.memory_plan.representations['user_item_matrix'] == 'dense'
+                else recommender.user_item_csr
+            ),
+            user_ids=matrix.index.to_numpy(),
+            user_similarity=recommender.user_similarity_matrix,
+            similarity_threshold=recommender.similarity_threshold,
+            max_recommendations=recommender.max_recommendations
+        )
+
+    def score_users(self, user_idx: np.ndarray) -> List[List[Dict[str, float]]]:
+        """
+        Similar users for a chunk of users
+
+        Args:
+            user_idx: Row positions in the user-item matrix
+
+        Returns:
+            One list of {user_id, score} per user
+        """
+        if self.user_similarity is None:
+            return [[] for _ in user_idx]
+
+        sims = self.user_similarity[user_idx].copy()
+        sims[np.arange(len(user_idx)), user_idx] = -np.inf
+        top = self._top_k(sims, self.max_recommendations)
+
+        results = []
+        for row, cols in enumerate(top):
+            scores = sims[row, cols]
+            keep = scores > self.similarity_threshold
+            results.append([
+                {'user_id': int(self.user_ids[col]), 'score': float(score)}
+                for col, score in zip(cols[keep], scores[keep])
+            ])
+        return results
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Column indices of the k largest values per row, sorted descending"""
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return np.empty((scores.shape[0], 0), dtype=np.int64)
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        return np.take_along_axis(top, order, axis=1)
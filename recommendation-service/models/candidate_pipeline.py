@@ -0,0 +1,307 @@
+"""
+Multi-source candidate generation and ranking for post recommendations
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import get_logger
+from utils.metrics import CANDIDATE_COUNT, PIPELINE_STAGE_SECONDS
+
+logger = get_logger(__name__)
+
+Candidates = Tuple[np.ndarray, np.ndarray]
+
+
+def no_candidates() -> Candidates:
+    """Empty (post IDs, scores) pair"""
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, sorted descending"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k largest scores in every row, sorted descending"""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1)
+
+
+class PipelineRequest:
+    """
+    Per-request inputs shared by every candidate source
+
+    Args:
+        user_id: User ID
+        user_row: Row of the user in the user-item matrix (None for unknown users)
+        history: Interacted post IDs, newest first, without repeats
+        liked: Liked/authored post IDs (repeats weigh more in the content profile)
+        excluded: Mask over the dense post index of posts that must not be recommended
+            (seen, deleted, blocked authors)
+        catalog: Post ID at each dense position (sorted)
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        user_row: Optional[int],
+        history: np.ndarray,
+        liked: np.ndarray,
+        excluded: np.ndarray,
+        catalog: np.ndarray
+    ):
+        self.user_id = user_id
+        self.user_row = user_row
+        self.history = history
+        self.liked = liked
+        self.excluded = excluded
+        self.catalog = catalog
+
+    def keep(self, post_ids: np.ndarray) -> np.ndarray:
+        """Boolean mask of candidates (post IDs) that are not excluded"""
+        if len(self.catalog) == 0:
+            return np.ones(len(post_ids), dtype=bool)
+        slots = np.searchsorted(self.catalog, post_ids)
+        slots[slots == len(self.catalog)] = 0
+        return (self.catalog[slots] != post_ids) | ~self.excluded[slots]
+
+    def keep_at(self, positions: np.ndarray) -> np.ndarray:
+        """Boolean mask of candidates (dense post positions) that are not excluded"""
+        return ~self.excluded[positions]
+
+
+CandidateSource = Callable[[List[PipelineRequest], int], List[Candidates]]
+
+
+class CandidatePipeline:
+    """
+    Run candidate sources within their budgets and rank the union once
+
+    Sources take a batch of requests and return up to `budget` (post IDs,
+    scores) pairs per request, so a micro-batch of users costs one matrix
+    product per source; a single request is a batch of one. Sources run
+    concurrently on a small thread pool (their NumPy/SciPy kernels release
+    the GIL). The ranker normalizes every source by its best score, sums the
+    weighted scores over the union with one bincount and drops excluded
+    posts with a single mask. Stage timings feed
+    recommendation_pipeline_stage_seconds and get_stats().
+    """
+
+    def __init__(self, workers: int = 0):
+        self.sources: Dict[str, Tuple[CandidateSource, int, float]] = {}
+        self.workers = workers
+        # Sources run on the calling thread when workers <= 1
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix='candidates')
+            if workers > 1 else None
+        )
+        self._lock = threading.Lock()
+        self._seconds: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._candidates: Dict[str, int] = {}
+        self._requests: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self.runs = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Picklable copy for worker processes (sources run on the calling thread)"""
+        state = self.__dict__.copy()
+        del state['_executor'], state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.run_inline()
+
+    def run_inline(self):
+        """Run sources on the calling thread from now on (worker processes, where the pool threads do not exist)"""
+        self.workers = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, source: CandidateSource, budget: int, weight: float):
+        """
+        Add a candidate source
+
+        Args:
+            name: Source name (metric label and weight override key)
+            source: Callable returning (post IDs, scores) per request for a batch and budget
+            budget: Maximum candidates per request (0 disables the source)
+            weight: Weight of the normalized scores in the ranker (0 disables the source)
+        """
+        if budget > 0 and weight > 0:
+            self.sources[name] = (source, budget, weight)
+
+    def run(
+        self,
+        request: PipelineRequest,
+        limit: int,
+        weights: Optional[Dict[str, float]] = None,
+        min_budget: int = 0
+    ) -> Candidates:
+        """
+        Generate candidates, rank the union and keep the best
+
+        Args:
+            request: Per-request inputs
+            limit: Number of posts to return
+            weights: Per-source weight overrides
+            min_budget: Lower bound for every source budget (deep feed lists)
+
+        Returns:
+            (post IDs, scores), best first
+        """
+        return self.run_batch([request], limit, weights, min_budget)[0]
+
+    def run_batch(
+        self,
+        requests: List[PipelineRequest],
+        limit: int,
+        weights: Optional[Dict[str, float]] = None,
+        min_budget: int = 0
+    ) -> List[Candidates]:
+        """
+        Generate candidates for a batch of requests and rank each request's union
+
+        Args:
+            requests: Per-request inputs
+            limit: Number of posts to return per request
+            weights: Per-source weight overrides
+            min_budget: Lower bound for every source budget (deep feed lists)
+
+        Returns:
+            (post IDs, scores) per request, best first
+        """
+        with self.timed('candidates'):
+            candidates = self._generate(requests, min_budget)
+        with self.timed('rank'):
+            ranked = [
+                self._rank(request, {name: batch[i] for name, batch in candidates.items()}, limit, weights or {})
+                for i, request in enumerate(requests)
+            ]
+        with self._lock:
+            self.runs += len(requests)
+        return ranked
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        """Record the duration of a pipeline stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            PIPELINE_STAGE_SECONDS.labels(name).observe(elapsed)
+            with self._lock:
+                self._seconds[name] = self._seconds.get(name, 0.0) + elapsed
+                self._counts[name] = self._counts.get(name, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Source settings, average stage time (ms), average candidates and errors per source"""
+        with self._lock:
+            return {
+                'runs': self.runs,
+                'workers': self.workers,
+                'sources': {
+                    name: {'budget': budget, 'weight': weight}
+                    for name, (_, budget, weight) in self.sources.items()
+                },
+                'stage_avg_ms': {
+                    name: round(seconds * 1000 / self._counts[name], 3)
+                    for name, seconds in self._seconds.items()
+                },
+                'candidates_avg': {
+                    name: round(total / max(1, self._requests.get(name, 0)), 1)
+                    for name, total in self._candidates.items()
+                },
+                'errors': dict(self._errors)
+            }
+
+    def shutdown(self):
+        """Stop the source worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _generate(self, requests: List[PipelineRequest], min_budget: int = 0) -> Dict[str, List[Candidates]]:
+        """Run every source over the batch (in parallel when there are workers)"""
+        if self._executor is None or len(self.sources) < 2:
+            return {
+                name: self._call(name, source, max(budget, min_budget), requests)
+                for name, (source, budget, _) in self.sources.items()
+            }
+
+        futures = {
+            name: self._executor.submit(self._call, name, source, max(budget, min_budget), requests)
+            for name, (source, budget, _) in self.sources.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+    def _call(
+        self,
+        name: str,
+        source: CandidateSource,
+        budget: int,
+        requests: List[PipelineRequest]
+    ) -> List[Candidates]:
+        """Run one source; a failing source contributes no candidates"""
+        try:
+            with self.timed(f'candidates_{name}'):
+                batch = source(requests, budget)
+        except Exception as e:
+            logger.error(f"Candidate source {name} failed: {e}")
+            with self._lock:
+                self._errors[name] = self._errors.get(name, 0) + 1
+            return [no_candidates() for _ in requests]
+
+        batch = [(post_ids[:budget], scores[:budget]) for post_ids, scores in batch]
+        counts = [len(post_ids) for post_ids, _ in batch]
+        for count in counts:
+            CANDIDATE_COUNT.labels(name).observe(count)
+        with self._lock:
+            self._candidates[name] = self._candidates.get(name, 0) + sum(counts)
+            self._requests[name] = self._requests.get(name, 0) + len(requests)
+        return batch
+
+    def _rank(
+        self,
+        request: PipelineRequest,
+        candidates: Dict[str, Candidates],
+        limit: int,
+        weights: Dict[str, float]
+    ) -> Candidates:
+        """Weighted sum of normalized scores over the union, excluded posts masked out"""
+        post_ids, scores = [], []
+        for name, (source_ids, source_scores) in candidates.items():
+            if len(source_ids) == 0:
+                continue
+            peak = float(np.max(source_scores))
+            if peak <= 0:
+                continue
+            weight = weights.get(name, self.sources[name][2])
+            post_ids.append(np.asarray(source_ids, dtype=np.int64))
+            scores.append(source_scores.astype(np.float64) * (weight / peak))
+        if not post_ids:
+            return no_candidates()
+
+        union, inverse = np.unique(np.concatenate(post_ids), return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=np.concatenate(scores), minlength=len(union))
+        keep = request.keep(union) & (totals > 0)
+        union, totals = union[keep], totals[keep]
+
+        top = top_k(totals, limit)
+        return union[top], totals[top].astype(np.float32)
@@ -0,0 +1,61 @@
+"""
+Cursor-paginated recommendation feeds
+
+A feed is a deep ranked list computed once for the first page and cached
+under a random feed ID in the current cache generation (the model version).
+The cursor handed to the client is an opaque URL-safe token carrying the
+feed ID, the offset of the next page and the length of the user's history
+when the feed was built, so later pages are slices of the cached list and
+posts seen since can be skipped without re-ranking.
+"""
+
+import base64
+from typing import Tuple
+
+
+class InvalidCursor(Exception):
+    """The cursor is not one this service issued"""
+
+
+class FeedExpired(Exception):
+    """The feed behind a cursor expired or was built by an older model"""
+
+
+def encode_cursor(feed_id: str, offset: int, history_length: int) -> str:
+    """
+    Opaque cursor for the next page of a feed
+
+    Args:
+        feed_id: Feed ID (hex)
+        offset: Position of the next page in the cached list
+        history_length: User history length when the feed was built
+
+    Returns:
+        URL-safe token
+    """
+    raw = f"{feed_id}:{offset}:{history_length}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, int]:
+    """
+    Parse a cursor from encode_cursor
+
+    Args:
+        cursor: URL-safe token
+
+    Returns:
+        (feed ID, offset, history length)
+
+    Raises:
+        InvalidCursor: Malformed token
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        feed_id, offset, history_length = raw.split(':')
+        offset, history_length = int(offset), int(history_length)
+    except ValueError as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+    if not feed_id.isalnum() or offset < 0 or history_length < 0:
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    return feed_id, offset, history_length
@@ -0,0 +1,145 @@
+"""
+Model memory planning
+
+Estimates the resident size of every model artifact from row/column counts
+before anything is allocated, then picks dense or compact representations so
+a refreshed model fits MODEL_MEMORY_BUDGET_MB.
+"""
+
+from typing import Any, Dict
+
+MB = 2 ** 20
+
+
+class MemoryBudgetExceeded(Exception):
+    """The model does not fit the memory budget even with compact representations"""
+
+    def __init__(self, plan: 'MemoryPlan'):
+        self.plan = plan
+        super().__init__(
+            f"Estimated model size {plan.total / MB:.1f} MB exceeds the "
+            f"{plan.budget / MB:.1f} MB memory budget with compact representations"
+        )
+
+
+class MemoryPlan:
+    """
+    Representation and estimated bytes per model artifact
+
+    Each artifact lists its representations in order of preference (the
+    first one is what an unconstrained build uses); ``fit`` switches to the
+    last (most compact) one where that saves the most memory first.
+    """
+
+    def __init__(self, options: Dict[str, Dict[str, int]], budget: int = 0):
+        self.options = options
+        self.budget = budget
+        self.representations = {name: next(iter(choices)) for name, choices in options.items()}
+
+    @property
+    def estimates(self) -> Dict[str, int]:
+        """Estimated bytes per artifact under the chosen representations"""
+        return {name: self.options[name][rep] for name, rep in self.representations.items()}
+
+    @property
+    def total(self) -> int:
+        return sum(self.estimates.values())
+
+    def fits(self) -> bool:
+        return self.budget <= 0 or self.total <= self.budget
+
+    def fit(self) -> 'MemoryPlan':
+        """
+        Switch artifacts to compact representations until the plan fits
+
+        Returns:
+            self
+
+        Raises:
+            MemoryBudgetExceeded: Even the most compact plan is over budget
+        """
+        def saving(name: str) -> int:
+            choices = list(self.options[name].values())
+            return choices[0] - choices[-1]
+
+        for name in sorted(self.options, key=saving, reverse=True):
+            if self.fits() or saving(name) <= 0:
+                break
+            self.representations[name] = list(self.options[name])[-1]
+
+        if not self.fits():
+            raise MemoryBudgetExceeded(self)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'budget_bytes': self.budget,
+            'estimated_total_bytes': self.total,
+            'representations': dict(self.representations),
+            'estimated_bytes': self.estimates
+        }
+
+
+def estimate_model_memory(
+    num_users: int,
+    num_items: int,
+    num_interactions: int,
+    num_posts: int,
+    text_terms: int,
+    post_feature_bytes: int,
+    itemsize: int,
+    top_k: int,
+    embedding_dim: int = 0,
+    als_factors: int = 0
+) -> Dict[str, Dict[str, int]]:
+    """
+    Estimated bytes of each artifact per representation
+
+    Args:
+        num_users: Rows of the user-item matrix
+        num_items: Columns of the user-item matrix
+        num_interactions: Non-zero user-item pairs (upper bound)
+        num_posts: Posts in the content model
+        text_terms: Upper bound on non-zero TF-IDF entries
+        post_feature_bytes: Approximate size of the post features frame
+        itemsize: Bytes per model float (MODEL_DTYPE)
+        top_k: Neighbours kept per row in top-K similarity
+        embedding_dim: Truncated-SVD dimensions (0 = raw TF-IDF vectors)
+        als_factors: Latent factors when CF_ALGORITHM=als (0 = neighbourhood)
+
+    Returns:
+        Artifact -> {representation: bytes}, preferred representation first
+    """
+    entry = itemsize + 4  # value + int32 column index
+
+    def csr(rows: int, nnz: int) -> int:
+        return nnz * entry + (rows + 1) * 4
+
+    def similarity(n: int) -> Dict[str, int]:
+        if n < 2:
+            return {'dense': 0}
+        return {'dense': n * n * itemsize, 'topk': csr(n, n * min(top_k, n))}
+
+    content_vectors = num_posts * embedding_dim * itemsize if embedding_dim else csr(num_posts, text_terms)
+    options = {
+        'user_item_matrix': {
+            'dense': num_users * num_items * itemsize,
+            'sparse': num_interactions * entry
+        },
+        'user_item_csr': {'sparse': csr(num_users, num_interactions)},
+        'user_similarity_matrix': similarity(num_users),
+        'item_similarity_matrix': similarity(num_items),
+        'content_similarity_matrix': {
+            'dense': num_posts * num_posts * itemsize,
+            # Embeddings are shared with post_embeddings; TF-IDF rows are kept alongside
+            'factored': 0 if embedding_dim else csr(num_posts, text_terms)
+        },
+        'post_features': {'dense': post_feature_bytes},
+        'post_embeddings': {'dense': num_posts * embedding_dim * itemsize},
+        'content_index': {'dense': content_vectors + num_posts * 16},
+        'als': {
+            'dense': (num_users + num_items) * als_factors * 4 + csr(num_users, num_interactions)
+            if als_factors else 0
+        }
+    }
+    return options
@@ -0,0 +1,144 @@
+"""
+Int8-quantized vector store
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class QuantizedVectors:
+    """
+    Dense vectors stored as int8 codes with a per-vector scale
+
+    Roughly 4x smaller than float32 (8x smaller than float64). Each vector is
+    divided by scale = max|v| / 127 and rounded to int8; scores are computed
+    chunk by chunk as (codes @ query) * scale. With keep_float the original
+    float32 vectors are kept so the top candidates can be re-ranked exactly.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        scales: np.ndarray,
+        float_vectors: Optional[np.ndarray] = None
+    ):
+        self.codes = np.ascontiguousarray(codes, dtype=np.int8)
+        self.scales = np.ascontiguousarray(scales, dtype=np.float32)
+        self.float_vectors = float_vectors
+
+    @classmethod
+    def quantize(cls, vectors: np.ndarray, keep_float: bool = False) -> 'QuantizedVectors':
+        """Quantize an n x d float matrix"""
+        vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+        codes, scales = cls._encode(vectors)
+        return cls(codes, scales, vectors if keep_float else None)
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        """Resident size in bytes"""
+        float_bytes = self.float_vectors.nbytes if self.float_vectors is not None else 0
+        return self.codes.nbytes + self.scales.nbytes + float_bytes
+
+    def append(self, vectors: np.ndarray):
+        """Append vectors"""
+        vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+        codes, scales = self._encode(vectors)
+        self.codes = np.vstack([self.codes, codes])
+        self.scales = np.concatenate([self.scales, scales])
+        if self.float_vectors is not None:
+            self.float_vectors = np.vstack([self.float_vectors, vectors])
+
+    def reconstruct(self, rows) -> np.ndarray:
+        """Approximate float vectors (the originals when kept)"""
+        if self.float_vectors is not None:
+            return self.float_vectors[rows]
+        return self.codes[rows].astype(np.float32) * self.scales[rows, None]
+
+    def scores(
+        self,
+        queries: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+        chunk_size: int = 16384
+    ) -> np.ndarray:
+        """
+        Approximate dot-product scores
+
+        Args:
+            queries: q x d queries (or a single d-vector)
+            rows: Row positions to score (default: all)
+            chunk_size: Rows dequantized at a time
+
+        Returns:
+            q x n scores (n scores for a single query)
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = np.atleast_2d(queries)
+
+        codes = self.codes if rows is None else self.codes[rows]
+        scales = self.scales if rows is None else self.scales[rows]
+        result = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        # Dequantize one chunk at a time to bound temporary memory
+        for start in range(0, codes.shape[0], chunk_size):
+            stop = start + chunk_size
+            block = codes[start:stop].astype(np.float32)
+            result[:, start:stop] = (queries @ block.T) * scales[start:stop]
+
+        return result[0] if single else result
+
+    def top_k(
+        self,
+        query: np.ndarray,
+        k: int,
+        rows: Optional[np.ndarray] = None,
+        exclude: Optional[np.ndarray] = None,
+        rerank: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k rows with the highest dot product against a query
+
+        Args:
+            query: d-dimensional query vector
+            k: Number of results
+            rows: Candidate row positions (default: all)
+            exclude: Row positions to leave out
+            rerank: Re-score the top k * rerank approximate candidates with
+                the float vectors (requires keep_float)
+
+        Returns:
+            (row positions, scores), best first
+        """
+        scores = self.scores(query, rows)
+        positions = np.arange(len(self)) if rows is None else np.asarray(rows)
+        if exclude is not None and len(exclude):
+            scores[np.isin(positions, exclude)] = -np.inf
+
+        exact = rerank > 0 and self.float_vectors is not None
+        shortlist = min(k * rerank if exact else k, len(scores))
+        if shortlist <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+        top = top[np.isfinite(scores[top])]
+        if exact:
+            scores = scores.copy()
+            scores[top] = self.float_vectors[positions[top]] @ np.asarray(query, dtype=np.float32)
+
+        top = top[np.argsort(-scores[top], kind='stable')][:k]
+        return positions[top], scores[top]
+
+    @staticmethod
+    def _encode(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-vector scales and int8 codes"""
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).clip(-127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
@@ -7,13 +7,31 @@ import numpy as np
 import pandas as pd
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
-from typing import List, Dict, Tuple, Optional
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+from scipy import sparse
+from typing import List, Dict, Tuple, Optional, Any
 import os
+import hashlib
+import uuid
 from datetime import datetime, timedelta
 
+from models.activity_index import UserActivityIndex
+from models.ann_index import IVFIndex
+from models.candidate_pipeline import (
+    CandidatePipeline, Candidates, PipelineRequest, no_candidates, top_k, top_k_rows
+)
+from models.factorization import ImplicitALS
+from models.feed import FeedExpired, decode_cursor, encode_cursor
+from models.memory_budget import MemoryBudgetExceeded, MemoryPlan, estimate_model_memory
+from models.similarity import FactoredSimilarity, top_k_cosine
 from services.database_service import DatabaseService
 from services.cache_service import CacheService
 from utils.logger import get_logger
+from utils.compute_pool import ComputePool, ComputePoolSaturated
+from utils.metrics import MODEL_BUILD_SECONDS, MODEL_SIZE_BYTES, SCORING_SECONDS
+from utils.micro_batch import MicroBatcher
+from utils.single_flight import SingleFlight
 
 logger = get_logger(__name__)
 
@@ -21,67 +39,269 @@ logger = get_logger(__name__)
 class HybridRecommender:
     """
     Hybrid recommendation system combining:
-    1. Collaborative Filtering (User-based and Item-based)
+    1. Collaborative Filtering (User-based neighbourhood or implicit ALS)
     2. Content-Based Filtering (TF-IDF on post content)
+    3. Trending, category-popular and co-visitation candidates
     """
     
     def __init__(self, db_service: DatabaseService, cache_service: CacheService):
         self.db = db_service
         self.cache = cache_service
+        self.single_flight = SingleFlight(cache_service)
+        # Scoring and model builds run here instead of on the event loop
+        self.compute = ComputePool()
+        # Concurrent post misses scored as one batch, one product per candidate source (opt-in)
+        self.post_batcher: Optional[MicroBatcher] = None
+        if os.getenv('MICRO_BATCH_ENABLED', 'false').lower() == 'true':
+            self.post_batcher = MicroBatcher(
+                self._score_post_batch,
+                window=float(os.getenv('MICRO_BATCH_WINDOW_MS', '2')) / 1000,
+                max_size=int(os.getenv('MICRO_BATCH_MAX_SIZE', '64')),
+                name='posts',
+                pool=self.compute
+            )
         
         # Configuration
         self.min_interactions = int(os.getenv('MIN_INTERACTIONS', '5'))
         self.top_n = int(os.getenv('TOP_N_ITEMS', '10'))
+        self.max_recommendations = int(os.getenv('MAX_RECOMMENDATIONS', '50'))
+        # Feeds rank this many posts once and page through the cached list
+        self.feed_depth = int(os.getenv('FEED_DEPTH', '500'))
+        self.feed_ttl = int(os.getenv('FEED_TTL', '1800'))
         self.similarity_threshold = float(os.getenv('SIMILARITY_THRESHOLD', '0.1'))
         self.use_hybrid = os.getenv('USE_HYBRID', 'true').lower() == 'true'
+        # Model arrays stay in this dtype; scores become Python floats only in responses
+        self.dtype = np.dtype(os.getenv('MODEL_DTYPE', 'float32'))
+        self.cf_algorithm = os.getenv('CF_ALGORITHM', 'neighbourhood').lower()
+        # Refreshes switch to sparse/top-K artifacts (or are refused) above this size; 0 = unlimited
+        self.memory_budget = int(float(os.getenv('MODEL_MEMORY_BUDGET_MB', '0')) * 2 ** 20)
+        self.similarity_top_k = max(
+            int(os.getenv('SIMILARITY_TOP_K', '100')),
+            self.max_recommendations + 1
+        )
+        
+        # Post candidate sources ranked together (CF only without USE_HYBRID)
+        self.pipeline = CandidatePipeline(
+            workers=int(os.getenv('CANDIDATE_SOURCE_WORKERS', str(min(4, os.cpu_count() or 1))))
+        )
+        self.pipeline.register(
+            'cf', self._cf_candidates,
+            int(os.getenv('CF_CANDIDATES', '100')), float(os.getenv('COLLABORATIVE_WEIGHT', '0.6'))
+        )
+        if self.use_hybrid:
+            self.pipeline.register(
+                'content', self._content_candidates,
+                int(os.getenv('CONTENT_CANDIDATES', '100')), float(os.getenv('CONTENT_WEIGHT', '0.4'))
+            )
+            self.pipeline.register(
+                'trending', self._trending_candidates,
+                int(os.getenv('TRENDING_CANDIDATES', '50')), float(os.getenv('TRENDING_WEIGHT', '0.1'))
+            )
+            self.pipeline.register(
+                'category', self._category_candidates,
+                int(os.getenv('CATEGORY_CANDIDATES', '50')), float(os.getenv('CATEGORY_WEIGHT', '0.1'))
+            )
+            self.pipeline.register(
+                'covisit', self._covisit_candidates,
+                int(os.getenv('COVISIT_CANDIDATES', '100')), float(os.getenv('COVISIT_WEIGHT', '0.2'))
+            )
         
         # Model data
         self.user_item_matrix = None
+        self.user_item_csr: Optional[sparse.csr_matrix] = None
+        self.covisit_matrix: Optional[sparse.csr_matrix] = None
         self.item_similarity_matrix = None
         self.user_similarity_matrix = None
         self.content_similarity_matrix = None
         self.post_features = None
+        # Columns of post_features as arrays (candidate sources and filters)
+        self.post_ids: Optional[np.ndarray] = None
+        self.post_index: Optional[pd.Index] = None
+        self.post_authors: Optional[np.ndarray] = None
+        self.post_categories: Optional[np.ndarray] = None
+        self.post_popularity: Optional[np.ndarray] = None
+        self.post_created: Optional[np.ndarray] = None
+        # Posts removed through the API, excluded until a refresh no longer returns them
+        self.deleted_posts = np.empty(0, dtype=np.int64)
+        # Per-user history over a dense post index, with its position for each post/matrix column
+        self.activity = UserActivityIndex.build([])
+        self.post_catalog: Optional[np.ndarray] = None
+        self.item_catalog: Optional[np.ndarray] = None
         self.tfidf_vectorizer = None
+        self.embedding_dim = int(os.getenv('EMBEDDING_DIM', '0'))
+        self.quantize_vectors = os.getenv('VECTOR_QUANTIZATION', 'false').lower() == 'true'
+        self.vector_rerank = int(os.getenv('VECTOR_RERANK', '0'))
+        self.svd: Optional[TruncatedSVD] = None
+        self.post_embeddings: Optional[np.ndarray] = None
+        self.content_index: Optional[IVFIndex] = None
+        self.als_model: Optional[ImplicitALS] = None
         
         # Statistics
+        self.model_version = 0
         self.last_update = None
+        self.memory_plan: Optional[MemoryPlan] = None
+        self.refused_refresh: Optional[Dict[str, Any]] = None
         self.update_interval = int(os.getenv('MODEL_UPDATE_INTERVAL', '3600'))
     
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Model snapshot for worker processes (precompute job)
+        
+        Connections, pools, single-flight and the micro-batcher stay in this
+        process; a copy can rank posts and users but not serve requests.
+        """
+        state = self.__dict__.copy()
+        for name in ('db', 'cache', 'single_flight', 'compute', 'post_batcher'):
+            state[name] = None
+        return state
+    
     async def initialize(self):
         """Initialize recommendation models"""
         logger.info("Initializing recommendation models...")
         await self.refresh_model()
         logger.info("Recommendation models initialized")
     
-    async def refresh_model(self):
-        """Refresh recommendation models with latest data"""
+    async def refresh_model(self, invalidate_cache: bool = True) -> bool:
+        """
+        Refresh recommendation models with latest data
+        
+        The footprint of every artifact is estimated before anything is
+        allocated. Over MODEL_MEMORY_BUDGET_MB, dense matrices are replaced by
+        sparse/top-K forms; if even those do not fit, the refresh is refused
+        and the previous snapshot keeps serving.
+        
+        Args:
+            invalidate_cache: Move caches to a new generation (model version)
+        
+        Returns:
+            False if the refresh was refused by the memory budget
+        """
         try:
             logger.info("Refreshing recommendation models...")
             
-            # Build collaborative filtering models
-            await self._build_collaborative_model()
+            interactions = await self.db.get_all_interactions()
+            posts = await self.db.get_all_posts_features()
+            activity = await self.db.get_all_user_activity()
+            try:
+                plan = self._plan_memory(interactions, posts)
+            except MemoryBudgetExceeded as e:
+                self._refuse_refresh(e)
+                return False
             
-            # Build content-based model
-            await self._build_content_model()
+            # Build both models with scoring paused
+            await self.compute.run_exclusive(self._build_models, interactions, posts, activity, plan)
             
             # Update timestamp
             self.last_update = datetime.now()
+            self.refused_refresh = None
+            for component, size in self.memory_usage().items():
+                MODEL_SIZE_BYTES.labels(component).set(size)
             
-            # Invalidate all caches
-            self.cache.invalidate_all_recommendations()
+            # Invalidate all caches; the new generation is the model version
+            if invalidate_cache:
+                self.model_version = self.cache.invalidate_all_recommendations()
+            else:
+                self.model_version = self.cache.generation
             
             logger.info("Models refreshed successfully")
+            return True
             
         except Exception as e:
             logger.error(f"Error refreshing models: {e}")
             raise
     
-    async def _build_collaborative_model(self):
-        """Build collaborative filtering model"""
-        logger.info("Building collaborative filtering model...")
+    def _plan_memory(self, interactions: List[Dict], posts: List[Dict]) -> MemoryPlan:
+        """
+        Estimate artifact sizes and choose representations within the memory budget
+        
+        Args:
+            interactions: Rows from get_all_interactions
+            posts: Rows from get_all_posts_features
+        
+        Returns:
+            MemoryPlan
+        
+        Raises:
+            MemoryBudgetExceeded: The model does not fit even in compact form
+        """
+        users = {row['user_id'] for row in interactions}
+        items = {row['item_id'] for row in interactions}
+        text_fields = ('title', 'content', 'tags')
+        text_bytes = sum(len(post.get(field) or '') for post in posts for field in text_fields)
+        # Unigrams + bigrams per word, capped by the vocabulary size
+        text_terms = sum(
+            min(1000, 2 * sum(len((post.get(field) or '').split()) for field in text_fields))
+            for post in posts
+        )
+        options = estimate_model_memory(
+            num_users=len(users),
+            num_items=len(items),
+            num_interactions=len(interactions),
+            num_posts=len(posts),
+            text_terms=text_terms,
+            post_feature_bytes=2 * text_bytes + 64 * len(posts) * (len(posts[0]) + 1 if posts else 0),
+            itemsize=self.dtype.itemsize,
+            top_k=self.similarity_top_k,
+            embedding_dim=self.embedding_dim,
+            als_factors=int(os.getenv('ALS_FACTORS', '64')) if self.cf_algorithm == 'als' else 0
+        )
+        plan = MemoryPlan(options, self.memory_budget).fit()
+        logger.info(
+            f"Model memory plan: ~{plan.total / 2 ** 20:.1f} MB, "
+            + ', '.join(f"{name}={rep}" for name, rep in plan.representations.items() if len(options[name]) > 1)
+        )
+        return plan
+    
+    def _refuse_refresh(self, error: MemoryBudgetExceeded):
+        """Keep serving the previous snapshot when a refresh would not fit the budget"""
+        self.refused_refresh = {
+            'time': datetime.now().isoformat(),
+            'reason': str(error),
+            **error.plan.to_dict()
+        }
+        if self.user_item_matrix is None and self.post_features is None:
+            logger.error(f"Refusing model build with no previous snapshot: {error}")
+            raise error
+        logger.error(f"Refusing model refresh, keeping the previous snapshot: {error}")
+    
+    def _build_models(
+        self,
+        interactions: List[Dict],
+        posts: List[Dict],
+        activity: List[Dict],
+        plan: MemoryPlan
+    ):
+        """Replace the collaborative, content and activity models (exclusive compute pool call)"""
+        # Build collaborative filtering models
+        self._build_collaborative_model(interactions, plan)
+        
+        # Build content-based model
+        self._build_content_model(posts, plan)
+        
+        # Per-user history and seen posts (no database query per request)
+        with MODEL_BUILD_SECONDS.labels('activity_index').time():
+            self._build_activity_index(activity)
         
-        # Get all user-item interactions
-        interactions = await self.db.get_all_interactions()
+        self.memory_plan = plan
+        
+        # Forget removed posts the new snapshot no longer contains
+        if len(self.deleted_posts):
+            known = [self.post_ids] if self.post_ids is not None else []
+            if self.user_item_matrix is not None:
+                known.append(self.user_item_matrix.columns.to_numpy(dtype=np.int64))
+            self.deleted_posts = self.deleted_posts[
+                np.isin(self.deleted_posts, np.concatenate(known))
+            ] if known else self.deleted_posts[:0]
+    
+    def _build_collaborative_model(self, interactions: List[Dict], plan: MemoryPlan):
+        """
+        Build collaborative filtering model
+        
+        Args:
+            interactions: Rows from get_all_interactions
+            plan: Representations chosen by _plan_memory
+        """
+        logger.info("Building collaborative filtering model...")
         
         if not interactions:
             logger.warning("No interactions found for collaborative filtering")
@@ -91,35 +311,130 @@ class HybridRecommender:
         df = pd.DataFrame(interactions)
         
         # Create user-item matrix (pivot table)
-        self.user_item_matrix = df.pivot_table(
-            index='user_id',
-            columns='item_id',
-            values='total_weight',
-            fill_value=0
+        with MODEL_BUILD_SECONDS.labels('pivot').time():
+            if plan.representations['user_item_matrix'] == 'dense':
+                self.user_item_matrix = df.pivot_table(
+                    index='user_id',
+                    columns='item_id',
+                    values='total_weight',
+                    fill_value=0
+                ).astype(self.dtype)
+                self.user_item_csr = sparse.csr_matrix(self.user_item_matrix.to_numpy())
+            else:
+                self.user_item_matrix, self.user_item_csr = self._sparse_pivot(df)
+        
+        logger.info(
+            f"User-item matrix shape: {self.user_item_matrix.shape} "
+            f"({plan.representations['user_item_matrix']})"
         )
         
-        logger.info(f"User-item matrix shape: {self.user_item_matrix.shape}")
+        # Binary copy for co-visitation counts (users who interacted with both posts)
+        self.covisit_matrix = self.user_item_csr.copy()
+        self.covisit_matrix.data[:] = 1
+        
+        if self.cf_algorithm == 'als':
+            with MODEL_BUILD_SECONDS.labels('als').time():
+                self._build_als_model()
+        
+        # Dense similarity from a sparse user-item matrix reads the CSR copy
+        user_item = (
+            self.user_item_matrix
+            if plan.representations['user_item_matrix'] == 'dense' else self.user_item_csr
+        )
         
         # Calculate item similarity (item-based CF)
         if self.user_item_matrix.shape[1] > 1:
-            self.item_similarity_matrix = cosine_similarity(
-                self.user_item_matrix.T
-            )
+            with MODEL_BUILD_SECONDS.labels('item_similarity').time():
+                if plan.representations['item_similarity_matrix'] == 'topk':
+                    self.item_similarity_matrix = top_k_cosine(
+                        self.user_item_csr.T, self.similarity_top_k, self.dtype
+                    )
+                else:
+                    self.item_similarity_matrix = cosine_similarity(
+                        user_item.T
+                    )
             logger.info("Item similarity matrix computed")
         
         # Calculate user similarity (user-based CF)
         if self.user_item_matrix.shape[0] > 1:
-            self.user_similarity_matrix = cosine_similarity(
-                self.user_item_matrix
-            )
+            with MODEL_BUILD_SECONDS.labels('user_similarity').time():
+                if plan.representations['user_similarity_matrix'] == 'topk':
+                    self.user_similarity_matrix = top_k_cosine(
+                        self.user_item_csr, self.similarity_top_k, self.dtype
+                    )
+                else:
+                    self.user_similarity_matrix = cosine_similarity(
+                        user_item
+                    )
             logger.info("User similarity matrix computed")
     
-    async def _build_content_model(self):
-        """Build content-based filtering model"""
-        logger.info("Building content-based model...")
+    def _build_activity_index(self, activity: List[Dict]):
+        """
+        Index every user's interactions over one dense post index
         
-        # Get all posts with features
-        posts = await self.db.get_all_posts_features()
+        Args:
+            activity: Rows from get_all_user_activity
+        """
+        item_ids = (
+            self.user_item_matrix.columns.to_numpy(dtype=np.int64)
+            if self.user_item_matrix is not None else np.empty(0, dtype=np.int64)
+        )
+        post_ids = self.post_ids if self.post_ids is not None else np.empty(0, dtype=np.int64)
+        self.activity = UserActivityIndex.build(activity, (item_ids, post_ids))
+        self.item_catalog = self.activity.lookup(item_ids)
+        self.post_catalog = self.activity.lookup(post_ids)
+    
+    def _sparse_pivot(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, sparse.csr_matrix]:
+        """
+        User-item matrix without allocating users x items floats
+        
+        Args:
+            df: Interaction rows (user_id, item_id, total_weight)
+        
+        Returns:
+            (sparse-column DataFrame with the pivot table's labels, CSR of the same weights)
+        """
+        # Same aggregation as pivot_table (mean of duplicate pairs)
+        weights = df.groupby(['user_id', 'item_id'])['total_weight'].mean()
+        weights = weights[weights != 0]
+        user_ids = pd.Index(np.unique(df['user_id']), name='user_id')
+        item_ids = pd.Index(np.unique(df['item_id']), name='item_id')
+        matrix = sparse.csr_matrix(
+            (
+                weights.to_numpy(dtype=self.dtype),
+                (
+                    user_ids.get_indexer(weights.index.get_level_values('user_id')),
+                    item_ids.get_indexer(weights.index.get_level_values('item_id'))
+                )
+            ),
+            shape=(len(user_ids), len(item_ids)),
+            dtype=self.dtype
+        )
+        frame = pd.DataFrame.sparse.from_spmatrix(matrix, index=user_ids, columns=item_ids)
+        return frame, matrix
+    
+    def _build_als_model(self):
+        """Train implicit ALS factors on the user-item matrix"""
+        self.als_model = ImplicitALS(
+            factors=int(os.getenv('ALS_FACTORS', '64')),
+            regularization=float(os.getenv('ALS_REGULARIZATION', '0.01')),
+            alpha=float(os.getenv('ALS_ALPHA', '10.0')),
+            iterations=int(os.getenv('ALS_ITERATIONS', '15')),
+            cg_steps=int(os.getenv('ALS_CG_STEPS', '3')),
+            num_threads=int(os.getenv('ALS_NUM_THREADS')) if os.getenv('ALS_NUM_THREADS') else None,
+            quantize=self.quantize_vectors,
+            rerank=self.vector_rerank
+        ).fit(self.user_item_csr.astype(np.float32))
+    
+    def _build_content_model(self, posts: List[Dict], plan: MemoryPlan):
+        """
+        Build content-based filtering model
+        
+        Args:
+            posts: Rows from get_all_posts_features
+            plan: Representations chosen by _plan_memory
+        """
+        logger.info("Building content-based model...")
         
         if not posts:
             logger.warning("No posts found for content-based filtering")
@@ -127,6 +442,7 @@ class HybridRecommender:
         
         # Create DataFrame
         self.post_features = pd.DataFrame(posts)
+        self._index_posts()
         
         # Combine text features (title + content + tags)
         self.post_features['text'] = (
@@ -139,17 +455,125 @@ class HybridRecommender:
         self.tfidf_vectorizer = TfidfVectorizer(
             max_features=1000,
             stop_words='english',
-            ngram_range=(1, 2)
+            ngram_range=(1, 2),
+            dtype=self.dtype
         )
         
-        tfidf_matrix = self.tfidf_vectorizer.fit_transform(
-            self.post_features['text']
-        )
+        with MODEL_BUILD_SECONDS.labels('tfidf').time():
+            tfidf_matrix = self.tfidf_vectorizer.fit_transform(
+                self.post_features['text']
+            )
+        
+        # Optional dense embeddings (truncated SVD)
+        with MODEL_BUILD_SECONDS.labels('embed').time():
+            self._embed_posts(tfidf_matrix)
         
         # Calculate content similarity
-        self.content_similarity_matrix = cosine_similarity(tfidf_matrix)
+        with MODEL_BUILD_SECONDS.labels('content_similarity').time():
+            if plan.representations['content_similarity_matrix'] == 'factored':
+                # Rows computed per request from the (L2-normalized) vectors
+                self.content_similarity_matrix = FactoredSimilarity(
+                    self.post_embeddings if self.post_embeddings is not None else tfidf_matrix
+                )
+            elif self.post_embeddings is not None:
+                self.content_similarity_matrix = self.post_embeddings @ self.post_embeddings.T
+            else:
+                self.content_similarity_matrix = cosine_similarity(tfidf_matrix)
         
         logger.info(f"Content similarity matrix shape: {self.content_similarity_matrix.shape}")
+        
+        # ANN index for similar-post lookup
+        with MODEL_BUILD_SECONDS.labels('ann_index').time():
+            self.content_index = self._build_content_index(
+                self.post_embeddings if self.post_embeddings is not None else tfidf_matrix
+            )
+    
+    def _index_posts(self):
+        """Copy the post columns used by candidate sources and filters into arrays"""
+        features = self.post_features
+        self.post_ids = features['id'].to_numpy(dtype=np.int64)
+        self.post_index = pd.Index(self.post_ids)
+        self.post_authors = features['author_id'].fillna(-1).to_numpy(dtype=np.int64)
+        self.post_categories = features['category_id'].fillna(-1).to_numpy(dtype=np.int64)
+        # Engagement (likes x3 + comments x2 + views) ranks trending and category candidates
+        self.post_popularity = (
+            features['like_count'] * 3 + features['comment_count'] * 2 + features['view_count']
+        ).to_numpy(dtype=np.float64)
+        if 'created_at' in features:
+            self.post_created = pd.to_datetime(features['created_at']).to_numpy(dtype='datetime64[ns]')
+        else:
+            self.post_created = np.full(len(features), np.datetime64('NaT'), dtype='datetime64[ns]')
+    
+    def _embed_posts(self, tfidf_matrix):
+        """
+        Project TF-IDF rows to EMBEDDING_DIM dense dimensions with truncated SVD
+        
+        Embeddings are L2-normalized and stored as a C-contiguous matrix of
+        the model dtype, so cosine similarity is a plain dot product.
+        
+        Args:
+            tfidf_matrix: Sparse TF-IDF rows aligned with post_features
+        """
+        self.svd = None
+        self.post_embeddings = None
+        dim = min(self.embedding_dim, min(tfidf_matrix.shape) - 1)
+        if dim < 1:
+            return
+        
+        self.svd = TruncatedSVD(n_components=dim, random_state=42)
+        self.post_embeddings = np.ascontiguousarray(
+            normalize(self.svd.fit_transform(tfidf_matrix)),
+            dtype=self.dtype
+        )
+        logger.info(
+            f"Post embeddings: {dim} dims, "
+            f"explained variance {self.svd.explained_variance_ratio_.sum():.2f}"
+        )
+    
+    def _build_content_index(self, content_vectors) -> IVFIndex:
+        """
+        Build (or reuse the persisted) ANN index over post content vectors
+        
+        Args:
+            content_vectors: L2-normalized TF-IDF rows or embeddings aligned with post_features
+        
+        Returns:
+            IVFIndex
+        """
+        post_ids = self.post_features['id'].to_numpy()
+        digest = hashlib.sha1()
+        for term, column in sorted(self.tfidf_vectorizer.vocabulary_.items()):
+            digest.update(f"{term}:{column};".encode())
+        digest.update(self.tfidf_vectorizer.idf_.tobytes())
+        digest.update(post_ids.astype(np.int64).tobytes())
+        if self.svd is not None:
+            digest.update(self.svd.components_.tobytes())
+        signature = digest.hexdigest()
+        
+        nprobe = int(os.getenv('ANN_NPROBE', '8'))
+        path = os.getenv('ANN_INDEX_PATH', '')
+        if path and os.path.exists(path):
+            try:
+                index = IVFIndex.load(path)
+                if index.signature == signature and (index.quantize, index.rerank) == (
+                    self.quantize_vectors, self.vector_rerank
+                ):
+                    index.nprobe = nprobe
+                    logger.info(f"Reusing ANN index from {path}")
+                    return index
+            except Exception as e:
+                logger.warning(f"Failed to load ANN index from {path}: {e}")
+        
+        index = IVFIndex(
+            nlist=int(os.getenv('ANN_NLIST')) if os.getenv('ANN_NLIST') else None,
+            nprobe=nprobe,
+            exact_threshold=int(os.getenv('ANN_EXACT_THRESHOLD', '5000')),
+            quantize=self.quantize_vectors,
+            rerank=self.vector_rerank
+        ).build(post_ids, content_vectors, signature)
+        if path:
+            index.save(path)
+        return index
     
     async def recommend_posts(
         self,
@@ -168,226 +592,407 @@ class HybridRecommender:
         Returns:
             List of {post_id, score} dictionaries
         """
-        # Check cache
-        cache_key = self.cache.get_recommendation_cache_key(user_id, 'posts')
+        # Check cache (one max-length list per user, sliced for any limit)
+        rec_type = 'posts' if exclude_viewed else 'posts_all'
+        cache_key = self.cache.get_recommendation_cache_key(user_id, rec_type)
         cached = self.cache.get(cache_key)
         if cached:
             logger.info(f"Cache hit for user {user_id} post recommendations")
-            return cached[:limit]
+            return self._without_deleted(cached)[:limit]
+        
+        # Concurrent misses for the same user share one computation
+        recommendations = await self.single_flight.do(
+            cache_key,
+            lambda: self._compute_post_recommendations(user_id, exclude_viewed),
+            lookup=lambda: self.cache.get(cache_key)
+        )
+        return self._without_deleted(recommendations)[:limit]
+    
+    async def _compute_post_recommendations(
+        self,
+        user_id: int,
+        exclude_viewed: bool
+    ) -> List[Dict[str, float]]:
+        """Compute the max-length post recommendation list and cache it"""
+        limit = self.max_recommendations
         
         # Check if model refresh needed
         if self._needs_refresh():
-            await self.refresh_model()
+            await self.single_flight.do('refresh_model', self.refresh_model)
+        rec_type = 'posts' if exclude_viewed else 'posts_all'
+        cache_key = self.cache.get_recommendation_cache_key(user_id, rec_type)
         
-        # Get user interactions
-        user_interactions = await self.db.get_user_interactions(user_id)
+        # History comes from the snapshot activity index; blocks are always read live
+        blocked_user_ids = await self.db.get_blocked_user_ids(user_id)
+        context = (user_id, blocked_user_ids, exclude_viewed)
         
-        if len(user_interactions) < self.min_interactions:
-            # Not enough data, return popular posts
-            recommendations = await self._get_popular_posts(limit)
+        if self._is_cold_start(user_id):
+            # Not enough data, return trending posts
+            with SCORING_SECONDS.labels('popular').time():
+                recommendations = await self.compute.run(self._rank_posts, context, limit, True)
+        elif self._batch_position(user_id) is not None:
+            with SCORING_SECONDS.labels('batched').time():
+                recommendations = await self.post_batcher.submit(context)
         else:
-            # Use hybrid approach
-            if self.use_hybrid:
-                collab_recs = await self._collaborative_recommend(user_id, limit * 2)
-                content_recs = await self._content_based_recommend(user_id, limit * 2)
-                
-                # Combine recommendations (weighted average)
-                recommendations = self._combine_recommendations(
-                    collab_recs,
-                    content_recs,
-                    weights=(0.6, 0.4)  # 60% collaborative, 40% content
-                )
-            else:
-                recommendations = await self._collaborative_recommend(user_id, limit * 2)
-        
-        # Exclude viewed posts
-        if exclude_viewed:
-            viewed_posts = await self.db.get_user_viewed_posts(user_id)
-            recommendations = [
-                rec for rec in recommendations
-                if rec['post_id'] not in viewed_posts
-            ]
-        
-        # Limit results
-        recommendations = recommendations[:limit]
+            collab_type = 'als' if self.als_model is not None else 'collaborative'
+            with SCORING_SECONDS.labels('hybrid' if self.use_hybrid else collab_type).time():
+                recommendations = await self.compute.run(self._rank_posts, context, limit)
         
         # Cache results
         self.cache.set(cache_key, recommendations)
         
         return recommendations
     
-    async def _collaborative_recommend(
+    async def recommend_feed(
         self,
         user_id: int,
-        limit: int
-    ) -> List[Dict[str, float]]:
-        """Collaborative filtering recommendations"""
-        if self.user_item_matrix is None:
-            return []
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        exclude_seen: bool = False
+    ) -> Tuple[List[Dict[str, float]], Optional[str]]:
+        """
+        Get one page of a cursor-paginated feed (infinite scroll)
         
-        try:
-            # Get user index
-            user_idx = self.user_item_matrix.index.get_loc(user_id)
-            
-            # Get similar users (user-based CF)
-            if self.user_similarity_matrix is not None:
-                user_similarities = self.user_similarity_matrix[user_idx]
-                similar_users_idx = np.argsort(user_similarities)[::-1][1:11]  # Top 10
-                
-                # Weighted sum of similar users' interactions
-                recommendations = {}
-                for similar_idx in similar_users_idx:
-                    similarity = user_similarities[similar_idx]
-                    if similarity > self.similarity_threshold:
-                        similar_user_items = self.user_item_matrix.iloc[similar_idx]
-                        for item_id, weight in similar_user_items.items():
-                            if weight > 0:
-                                recommendations[item_id] = recommendations.get(item_id, 0) + (
-                                    weight * similarity
-                                )
-                
-                # Remove items user already interacted with
-                user_items = set(
-                    self.user_item_matrix.iloc[user_idx][
-                        self.user_item_matrix.iloc[user_idx] > 0
-                    ].index
-                )
-                recommendations = {
-                    k: v for k, v in recommendations.items()
-                    if k not in user_items
-                }
-                
-                # Sort by score
-                sorted_recs = sorted(
-                    recommendations.items(),
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:limit]
-                
-                return [
-                    {'post_id': int(post_id), 'score': float(score)}
-                    for post_id, score in sorted_recs
-                ]
+        The first page (no cursor) ranks feed_depth unseen posts once and
+        caches them under a new feed ID in the current generation. Later
+        pages slice the cached list from the cursor offset, so they cost
+        O(limit) and never re-rank.
         
-        except Exception as e:
-            logger.error(f"Error in collaborative filtering: {e}")
+        Args:
+            user_id: User ID
+            limit: Page size
+            cursor: next_cursor of the previous page (None for the first page)
+            exclude_seen: Skip posts the user interacted with after the feed was built
+        
+        Returns:
+            (list of {post_id, score} dictionaries, next cursor or None at the end)
+        
+        Raises:
+            InvalidCursor: Malformed cursor
+            FeedExpired: The feed expired or the model was refreshed; start again without a cursor
+        """
+        if cursor is None:
+            feed_id, offset = uuid.uuid4().hex, 0
+            feed, history_length = await self._compute_feed(user_id)
+            shared = self.cache.set(self.cache.get_feed_cache_key(user_id, feed_id), feed, self.feed_ttl)
+        else:
+            feed_id, offset, history_length = decode_cursor(cursor)
+            feed = self.cache.get(self.cache.get_feed_cache_key(user_id, feed_id))
+            if feed is None:
+                raise FeedExpired(f"Feed {feed_id} for user {user_id} expired or was built by an older model")
+            shared = True
+        
+        skip = set(self.deleted_posts.tolist())
+        if exclude_seen:
+            # Interactions recorded since the build are the newest history entries
+            positions = self.activity.history(user_id)[0]
+            seen = positions[:max(0, len(positions) - history_length)]
+            skip.update(self.activity.catalog[seen].tolist())
+        
+        post_ids, scores = feed['post_ids'], feed['scores']
+        page = []
+        while offset < len(post_ids) and len(page) < limit:
+            if post_ids[offset] not in skip:
+                page.append({'post_id': post_ids[offset], 'score': scores[offset]})
+            offset += 1
         
-        return []
+        # The next page may land on another worker, so only a list stored in Redis can be continued
+        has_more = offset < len(post_ids) and shared
+        return page, encode_cursor(feed_id, offset, history_length) if has_more else None
     
-    async def _content_based_recommend(
+    async def _compute_feed(self, user_id: int) -> Tuple[Dict[str, List], int]:
+        """Rank the deep feed list (column-wise, for a compact cache value) and note the history length"""
+        if self._needs_refresh():
+            await self.single_flight.do('refresh_model', self.refresh_model)
+        
+        history_length = len(self.activity.history(user_id)[0])
+        blocked_user_ids = await self.db.get_blocked_user_ids(user_id)
+        context = (user_id, blocked_user_ids, True)
+        cold_start = self._is_cold_start(user_id)
+        with SCORING_SECONDS.labels('feed').time():
+            recommendations = await self.compute.run(
+                self._rank_posts, context, self.feed_depth, cold_start, self.feed_depth
+            )
+        feed = {
+            'post_ids': [rec['post_id'] for rec in recommendations],
+            'scores': [rec['score'] for rec in recommendations]
+        }
+        return feed, history_length
+    
+    def _pipeline_request(
         self,
         user_id: int,
-        limit: int
-    ) -> List[Dict[str, float]]:
-        """Content-based filtering recommendations"""
-        if self.content_similarity_matrix is None or self.post_features is None:
-            return []
+        blocked_user_ids: List[int],
+        exclude_viewed: bool
+    ) -> PipelineRequest:
+        """
+        Candidate source inputs for one user (reads the model; call from the compute pool)
         
-        try:
-            # Get user's liked posts
-            user_interactions = await self.db.get_user_interactions(user_id)
-            liked_posts = [
-                int(interaction['item_id'])
-                for interaction in user_interactions
-                if interaction['type'] in ['like', 'post']
-            ]
-            
-            if not liked_posts:
-                return []
-            
-            # Find posts in our feature set
-            liked_posts_idx = []
-            for post_id in liked_posts:
-                try:
-                    idx = self.post_features[self.post_features['id'] == post_id].index[0]
-                    liked_posts_idx.append(idx)
-                except IndexError:
-                    continue
-            
-            if not liked_posts_idx:
-                return []
-            
-            # Calculate average similarity to liked posts
-            similarity_scores = np.mean(
-                self.content_similarity_matrix[liked_posts_idx],
-                axis=0
-            )
-            
-            # Get top similar posts
-            similar_idx = np.argsort(similarity_scores)[::-1]
-            
-            recommendations = []
-            for idx in similar_idx:
-                post_id = int(self.post_features.iloc[idx]['id'])
-                score = float(similarity_scores[idx])
-                
-                # Skip already liked posts
-                if post_id not in liked_posts and score > self.similarity_threshold:
-                    recommendations.append({'post_id': post_id, 'score': score})
-                
-                if len(recommendations) >= limit:
-                    break
-            
-            return recommendations
+        Args:
+            user_id: User ID
+            blocked_user_ids: Users whose posts are never recommended
+            exclude_viewed: Exclude every interacted post (otherwise only liked/authored ones)
         
-        except Exception as e:
-            logger.error(f"Error in content-based filtering: {e}")
+        Returns:
+            PipelineRequest
+        """
+        activity = self.activity
+        with self.pipeline.timed('context'):
+            positions, liked = activity.history(user_id)
+            history = activity.catalog[pd.unique(positions)]
+            liked_positions = positions[liked]
+        
+        with self.pipeline.timed('filter'):
+            excluded = activity.mask(
+                positions if exclude_viewed else liked_positions,
+                activity.lookup(self.deleted_posts)
+            )
+            if blocked_user_ids and self.post_ids is not None:
+                blocked = np.isin(self.post_authors, np.asarray(blocked_user_ids, dtype=np.int64))
+                excluded[self.post_catalog[blocked]] = True
         
-        return []
+        return PipelineRequest(
+            user_id,
+            self._user_position(user_id),
+            history,
+            activity.catalog[liked_positions],
+            excluded,
+            activity.catalog
+        )
     
-    def _combine_recommendations(
+    def _rank_posts(
         self,
-        recs1: List[Dict[str, float]],
-        recs2: List[Dict[str, float]],
-        weights: Tuple[float, float] = (0.5, 0.5)
+        context: Tuple,
+        limit: int,
+        cold_start: bool = False,
+        min_budget: int = 0
     ) -> List[Dict[str, float]]:
-        """Combine two recommendation lists with weights"""
-        combined = {}
-        
-        # Add first recommendations
-        for rec in recs1:
-            post_id = rec['post_id']
-            combined[post_id] = rec['score'] * weights[0]
-        
-        # Add second recommendations
-        for rec in recs2:
-            post_id = rec['post_id']
-            if post_id in combined:
-                combined[post_id] += rec['score'] * weights[1]
-            else:
-                combined[post_id] = rec['score'] * weights[1]
+        """
+        Post recommendations from the candidate pipeline (compute pool call)
         
-        # Sort by combined score
-        sorted_combined = sorted(
-            combined.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        Args:
+            context: (user_id, blocked user IDs, exclude_viewed)
+            limit: Number of recommendations
+            cold_start: Too few interactions; rank trending posts only
+            min_budget: Lower bound for every candidate source budget (feeds)
         
-        return [
-            {'post_id': post_id, 'score': score}
-            for post_id, score in sorted_combined
-        ]
+        Returns:
+            List of {post_id, score} dictionaries
+        """
+        if cold_start:
+            request = self._pipeline_request(*context)
+            return self._as_recommendations(*self._trending_candidates([request], limit)[0])
+        return self._rank_post_batch([context], limit, min_budget)[0]
     
-    async def _get_popular_posts(self, limit: int) -> List[Dict[str, float]]:
-        """Get popular posts for cold start"""
-        posts = await self.db.get_all_posts_features()
+    def _rank_post_batch(
+        self,
+        contexts: List[Tuple],
+        limit: int,
+        min_budget: int = 0
+    ) -> List[List[Dict[str, float]]]:
+        """
+        Post recommendations for many users from one candidate pipeline pass
         
-        # Sort by engagement (likes + comments + views)
-        for post in posts:
-            post['engagement'] = (
-                post['like_count'] * 3 +
-                post['comment_count'] * 2 +
-                post['view_count']
-            )
+        Every source scores the whole batch at once (one matrix product per
+        source), then each user's union is ranked and masked on its own. A
+        single user is a batch of one, so batched and unbatched lists match.
         
-        posts.sort(key=lambda x: x['engagement'], reverse=True)
+        Args:
+            contexts: (user_id, blocked user IDs, exclude_viewed) per user
+            limit: Number of recommendations per user
+            min_budget: Lower bound for every candidate source budget (feeds)
         
+        Returns:
+            One list of {post_id, score} dictionaries per user
+        """
+        requests = [self._pipeline_request(*context) for context in contexts]
         return [
-            {'post_id': post['id'], 'score': float(post['engagement'])}
-            for post in posts[:limit]
+            self._as_recommendations(post_ids, scores)
+            for post_ids, scores in self.pipeline.run_batch(requests, limit, min_budget=min_budget)
         ]
     
+    @staticmethod
+    def _as_recommendations(post_ids: np.ndarray, scores: np.ndarray) -> List[Dict[str, float]]:
+        """Response rows for ranked (post IDs, scores)"""
+        return [
+            {'post_id': int(post_id), 'score': float(score)}
+            for post_id, score in zip(post_ids, scores)
+        ]
+    
+    def _is_cold_start(self, user_id: int) -> bool:
+        """Too few interactions in the activity index for personalized ranking"""
+        return len(self.activity.history(user_id)[0]) < self.min_interactions
+    
+    def _user_position(self, user_id: int) -> Optional[int]:
+        """Row of a user in the user-item matrix (None for users without interactions)"""
+        if self.user_item_matrix is None:
+            return None
+        try:
+            return self.user_item_matrix.index.get_loc(user_id)
+        except KeyError:
+            return None
+    
+    def _batch_position(self, user_id: int) -> Optional[int]:
+        """User-item row of a user when post scoring is micro-batched"""
+        if self.post_batcher is None:
+            return None
+        return self._user_position(user_id)
+    
+    def _score_post_batch(self, contexts: List[Tuple]) -> List[List[Dict[str, float]]]:
+        """Rank a micro-batch of users with one candidate pipeline pass (compute pool call)"""
+        return self._rank_post_batch(contexts, self.max_recommendations)
+    
+    def _cf_candidates(self, requests: List[PipelineRequest], budget: int) -> List[Candidates]:
+        """Collaborative candidates: ALS top items or the weighted interactions of the 10 nearest users"""
+        results = [no_candidates() for _ in requests]
+        batch = [i for i, request in enumerate(requests) if request.user_row is not None]
+        if not batch or self.user_item_matrix is None:
+            return results
+        item_ids = self.user_item_matrix.columns.to_numpy(dtype=np.int64)
+        rows = np.array([requests[i].user_row for i in batch], dtype=np.int64)
+        
+        if self.als_model is not None:
+            # One U[rows] @ V.T product; over-fetch so excluded posts do not starve the budget
+            for i, (positions, scores) in zip(batch, self.als_model.recommend_batch(rows, budget * 2)):
+                keep = requests[i].keep_at(self.item_catalog[positions])
+                results[i] = item_ids[positions[keep]], scores[keep]
+            return results
+        
+        if self.user_similarity_matrix is None:
+            return results
+        similarities = np.array(self.user_similarity_matrix[rows], dtype=np.float64)
+        similarities[np.arange(len(rows)), rows] = 0
+        neighbours = top_k_rows(similarities, 10)
+        weights = np.take_along_axis(similarities, neighbours, axis=1)
+        close = weights > self.similarity_threshold
+        
+        # Stack every user's neighbour rows once and sum the weighted entries per (user, item)
+        n_items = self.user_item_csr.shape[1]
+        stacked = self.user_item_csr[neighbours[close]]
+        lengths = np.diff(stacked.indptr)
+        owners = np.repeat(np.nonzero(close)[0], lengths)
+        keys, inverse = np.unique(owners * n_items + stacked.indices, return_inverse=True)
+        sums = np.bincount(
+            inverse.ravel(), weights=stacked.data * np.repeat(weights[close], lengths), minlength=len(keys)
+        )
+        
+        # Drop the items each user already has
+        indptr, indices = self.user_item_csr.indptr, self.user_item_csr.indices
+        own_keys = np.concatenate([
+            indices[indptr[user_row]:indptr[user_row + 1]].astype(np.int64) + row * n_items
+            for row, user_row in enumerate(rows)
+        ])
+        keep = (sums > 0) & ~np.isin(keys, own_keys)
+        keys, sums = keys[keep], sums[keep]
+        
+        bounds = np.searchsorted(keys, np.arange(len(rows) + 1) * n_items)
+        for row, i in enumerate(batch):
+            positions = keys[bounds[row]:bounds[row + 1]] - row * n_items
+            values = sums[bounds[row]:bounds[row + 1]]
+            keep = requests[i].keep_at(self.item_catalog[positions])
+            positions, values = positions[keep], values[keep]
+            top = top_k(values, budget)
+            results[i] = item_ids[positions[top]], values[top]
+        return results
+    
+    def _content_candidates(self, requests: List[PipelineRequest], budget: int) -> List[Candidates]:
+        """Content candidates: mean content similarity to the liked/authored posts"""
+        results = [no_candidates() for _ in requests]
+        if self.content_similarity_matrix is None or self.post_index is None:
+            return results
+        liked = [self.post_index.get_indexer(request.liked) for request in requests]
+        liked = [positions[positions >= 0] for positions in liked]
+        batch = [i for i, positions in enumerate(liked) if len(positions)]
+        if not batch:
+            return results
+        
+        # Row-mean weights as a sparse batch x posts matrix; one product gives every profile
+        lengths = [len(liked[i]) for i in batch]
+        profiles = sparse.csr_matrix(
+            (
+                np.repeat(1 / np.array(lengths), lengths),
+                np.concatenate([liked[i] for i in batch]),
+                np.concatenate([[0], np.cumsum(lengths)])
+            ),
+            shape=(len(batch), self.content_similarity_matrix.shape[0]),
+            dtype=self.content_similarity_matrix.dtype
+        )
+        scores = np.asarray(profiles @ self.content_similarity_matrix)
+        for i, row_scores in zip(batch, scores):
+            positions = np.flatnonzero(row_scores > self.similarity_threshold)
+            positions = positions[requests[i].keep_at(self.post_catalog[positions])]
+            top = positions[top_k(row_scores[positions], budget)]
+            results[i] = self.post_ids[top], row_scores[top]
+        return results
+    
+    def _trending_candidates(self, requests: List[PipelineRequest], budget: int) -> List[Candidates]:
+        """Trending candidates: most engaged posts of the last 7 days (all posts if none are that recent)"""
+        if self.post_ids is None:
+            return [no_candidates() for _ in requests]
+        recent = self.post_created >= np.datetime64(datetime.now() - timedelta(days=7))
+        if not recent.any():
+            recent = np.ones(len(self.post_ids), dtype=bool)
+        
+        results = []
+        for request in requests:
+            positions = np.flatnonzero(recent)
+            positions = positions[request.keep_at(self.post_catalog[positions])]
+            top = positions[top_k(self.post_popularity[positions], budget)]
+            results.append((self.post_ids[top], self.post_popularity[top]))
+        return results
+    
+    def _category_candidates(self, requests: List[PipelineRequest], budget: int) -> List[Candidates]:
+        """Category candidates: most engaged posts of the user's 3 most interacted categories"""
+        results = [no_candidates() for _ in requests]
+        if self.post_index is None:
+            return results
+        for i, request in enumerate(requests):
+            seen = self.post_index.get_indexer(request.history)
+            seen = seen[seen >= 0]
+            if len(seen) == 0:
+                continue
+            
+            categories, counts = np.unique(self.post_categories[seen], return_counts=True)
+            preferred = categories[top_k(counts.astype(np.float64), 3)]
+            positions = np.flatnonzero(np.isin(self.post_categories, preferred))
+            positions = positions[request.keep_at(self.post_catalog[positions])]
+            top = positions[top_k(self.post_popularity[positions], budget)]
+            results[i] = self.post_ids[top], self.post_popularity[top]
+        return results
+    
+    def _covisit_candidates(self, requests: List[PipelineRequest], budget: int) -> List[Candidates]:
+        """Co-visitation candidates: posts shared by users who also had the 10 newest history posts"""
+        results = [no_candidates() for _ in requests]
+        if self.covisit_matrix is None:
+            return results
+        item_ids = self.user_item_matrix.columns
+        seeds = [item_ids.get_indexer(request.history[:10]) for request in requests]
+        seeds = [positions[positions >= 0] for positions in seeds]
+        batch = [i for i, positions in enumerate(seeds) if len(positions)]
+        if not batch:
+            return results
+        
+        # Seed posts as one column per user: two products count the co-visiting
+        # users (minus the user) and then the posts those users shared
+        seed_matrix = np.zeros((self.covisit_matrix.shape[1], len(batch)), dtype=np.float32)
+        for column, i in enumerate(batch):
+            seed_matrix[seeds[i], column] = 1
+        co_users = self.covisit_matrix @ seed_matrix
+        for column, i in enumerate(batch):
+            if requests[i].user_row is not None:
+                co_users[requests[i].user_row, column] = 0
+        scores = np.ascontiguousarray((self.covisit_matrix.T @ co_users).T)
+        
+        item_ids = item_ids.to_numpy(dtype=np.int64)
+        for column, i in enumerate(batch):
+            row_scores = scores[column]
+            row_scores[seeds[i]] = 0
+            positions = np.flatnonzero(row_scores > 0)
+            positions = positions[requests[i].keep_at(self.item_catalog[positions])]
+            top = positions[top_k(row_scores[positions], budget)]
+            results[i] = item_ids[top], row_scores[top]
+        return results
+    
     async def recommend_users(
         self,
         user_id: int,
@@ -404,32 +1009,39 @@ class HybridRecommender:
             return []
         
         try:
-            user_idx = self.user_item_matrix.index.get_loc(user_id)
-            user_similarities = self.user_similarity_matrix[user_idx]
-            
-            # Get top similar users
-            similar_users_idx = np.argsort(user_similarities)[::-1][1:limit+1]
-            
-            recommendations = []
-            for idx in similar_users_idx:
-                similar_user_id = int(self.user_item_matrix.index[idx])
-                similarity = float(user_similarities[idx])
-                
-                if similarity > self.similarity_threshold:
-                    recommendations.append({
-                        'user_id': similar_user_id,
-                        'score': similarity
-                    })
+            # Get top similar users (cache the max-length list)
+            with SCORING_SECONDS.labels('users').time():
+                recommendations = await self.compute.run(self._similar_users, user_id)
             
             # Cache results
             self.cache.set(cache_key, recommendations)
             
-            return recommendations
+            return recommendations[:limit]
         
+        except ComputePoolSaturated:
+            raise
         except Exception as e:
             logger.error(f"Error recommending users: {e}")
             return []
     
+    def _similar_users(self, user_id: int) -> List[Dict[str, float]]:
+        """Most similar users above the similarity threshold (max-length list)"""
+        user_idx = self.user_item_matrix.index.get_loc(user_id)
+        user_similarities = self.user_similarity_matrix[user_idx]
+        similar_users_idx = np.argsort(user_similarities)[::-1][1:self.max_recommendations+1]
+        
+        recommendations = []
+        for idx in similar_users_idx:
+            similar_user_id = int(self.user_item_matrix.index[idx])
+            similarity = float(user_similarities[idx])
+            
+            if similarity > self.similarity_threshold:
+                recommendations.append({
+                    'user_id': similar_user_id,
+                    'score': similarity
+                })
+        return recommendations
+    
     async def recommend_similar_posts(
         self,
         post_id: int,
@@ -440,58 +1052,157 @@ class HybridRecommender:
         cache_key = self.cache.get_similar_cache_key(post_id)
         cached = self.cache.get(cache_key)
         if cached:
-            return cached[:limit]
+            return self._without_deleted(cached)[:limit]
         
-        if self.content_similarity_matrix is None or self.post_features is None:
+        if self.content_index is None:
             return []
         
         try:
-            # Find post index
-            post_idx = self.post_features[self.post_features['id'] == post_id].index[0]
-            
-            # Get similarity scores
-            similarity_scores = self.content_similarity_matrix[post_idx]
-            
-            # Get top similar posts
-            similar_idx = np.argsort(similarity_scores)[::-1][1:limit+1]
+            # Approximate top similar posts (cache the max-length list)
+            with SCORING_SECONDS.labels('similar').time():
+                similar_ids, similarities = await self.compute.run(
+                    self.content_index.search_by_id,
+                    post_id,
+                    self.max_recommendations
+                )
             
             recommendations = []
-            for idx in similar_idx:
-                similar_post_id = int(self.post_features.iloc[idx]['id'])
-                similarity = float(similarity_scores[idx])
-                
+            for similar_post_id, similarity in zip(similar_ids, similarities):
                 if similarity > self.similarity_threshold:
                     recommendations.append({
-                        'post_id': similar_post_id,
-                        'score': similarity
+                        'post_id': int(similar_post_id),
+                        'score': float(similarity)
                     })
             
             # Cache results
             self.cache.set(cache_key, recommendations)
             
-            return recommendations
+            return self._without_deleted(recommendations)[:limit]
         
+        except ComputePoolSaturated:
+            raise
         except Exception as e:
             logger.error(f"Error finding similar posts: {e}")
             return []
     
+    def remove_posts(self, post_ids: List[int]) -> int:
+        """
+        Stop recommending deleted posts (including cached lists) until a refresh drops them
+        
+        Args:
+            post_ids: Deleted post IDs
+        
+        Returns:
+            Number of posts that were not removed already
+        """
+        removed = np.setdiff1d(np.asarray(post_ids, dtype=np.int64), self.deleted_posts)
+        # Swapped in one assignment; running requests keep the previous array
+        self.deleted_posts = np.union1d(self.deleted_posts, removed)
+        return len(removed)
+    
+    def record_interaction(self, user_id: int, post_id: int, interaction_type: str) -> bool:
+        """
+        Add a new interaction to the user's history and drop their cached lists
+        
+        Args:
+            user_id: User ID
+            post_id: Post ID
+            interaction_type: post, like, view or comment
+        
+        Returns:
+            False if the post is not in the current snapshot
+        """
+        recorded = self.activity.record(user_id, post_id, interaction_type)
+        if recorded:
+            self.cache.invalidate_user_cache(user_id)
+        return recorded
+    
+    def _without_deleted(self, recommendations: List[Dict[str, float]]) -> List[Dict[str, float]]:
+        """Drop removed posts from a (possibly cached) post list"""
+        deleted = self.deleted_posts
+        if len(deleted) == 0:
+            return recommendations
+        keep = ~np.isin([rec['post_id'] for rec in recommendations], deleted)
+        return [rec for rec, kept in zip(recommendations, keep) if kept]
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Memory held by each model component
+        
+        Returns:
+            Bytes per component
+        """
+        def frame_bytes(df: Optional[pd.DataFrame]) -> int:
+            return int(df.memory_usage(deep=True).sum()) if df is not None else 0
+        
+        def array_bytes(array: Optional[np.ndarray]) -> int:
+            return array.nbytes if array is not None else 0
+        
+        def csr_bytes(matrix: Optional[sparse.csr_matrix]) -> int:
+            if matrix is None:
+                return 0
+            return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        
+        return {
+            'user_item_matrix': frame_bytes(self.user_item_matrix),
+            'user_item_csr': csr_bytes(self.user_item_csr),
+            'covisit_matrix': csr_bytes(self.covisit_matrix),
+            'item_similarity_matrix': array_bytes(self.item_similarity_matrix),
+            'user_similarity_matrix': array_bytes(self.user_similarity_matrix),
+            'content_similarity_matrix': array_bytes(self.content_similarity_matrix),
+            'post_features': frame_bytes(self.post_features),
+            'post_arrays': sum(
+                array_bytes(array)
+                for array in (self.post_ids, self.post_authors, self.post_categories,
+                              self.post_popularity, self.post_created)
+            ),
+            'post_embeddings': array_bytes(self.post_embeddings),
+            'activity_index': self.activity.nbytes,
+            'als': self.als_model.nbytes if self.als_model is not None else 0,
+            'content_index': self.content_index.nbytes if self.content_index is not None else 0
+        }
+    
     def _needs_refresh(self) -> bool:
         """Check if model needs refresh"""
         if self.last_update is None:
             return True
         
-        elapsed = (datetime.now() - self.last_update).total_seconds()
+        # A refused refresh waits a full interval before retrying
+        last_attempt = self.last_update
+        if self.refused_refresh is not None:
+            last_attempt = max(last_attempt, datetime.fromisoformat(self.refused_refresh['time']))
+        elapsed = (datetime.now() - last_attempt).total_seconds()
         return elapsed >= self.update_interval
     
     async def get_statistics(self) -> Dict[str, Any]:
         """Get recommendation engine statistics"""
         return {
+            'model_version': self.model_version,
             'last_update': self.last_update.isoformat() if self.last_update else None,
             'update_interval': self.update_interval,
             'min_interactions': self.min_interactions,
             'similarity_threshold': self.similarity_threshold,
             'use_hybrid': self.use_hybrid,
+            'dtype': self.dtype.name,
+            'cf_algorithm': self.cf_algorithm,
             'user_item_matrix_shape': list(self.user_item_matrix.shape) if self.user_item_matrix is not None else None,
+            'memory': {
+                **(self.memory_plan.to_dict() if self.memory_plan is not None else {}),
+                'actual_bytes': self.memory_usage(),
+                'refused_refresh': self.refused_refresh
+            },
             'num_posts': len(self.post_features) if self.post_features is not None else 0,
-            'cache_enabled': self.cache.enabled
+            'embedding_dim': self.post_embeddings.shape[1] if self.post_embeddings is not None else None,
+            'ann_index_size': len(self.content_index) if self.content_index is not None else 0,
+            'cache_enabled': self.cache.enabled,
+            'cache': self.cache.get_stats(),
+            'single_flight': self.single_flight.stats,
+            'compute_pool': self.compute.get_stats(),
+            'micro_batch': self.post_batcher.stats if self.post_batcher is not None else None,
+            'pipeline': {
+                **self.pipeline.get_stats(),
+                'deleted_posts': len(self.deleted_posts),
+                'activity_users': len(self.activity.user_rows),
+                'activity_updated_users': len(self.activity.updates)
+            }
         }
@@ -0,0 +1,138 @@
+"""
+Compact similarity matrix representations
+
+Stand-ins for dense N x N similarity arrays when those would not fit the model
+memory budget. Both produce dense rows on demand, so callers keep indexing
+rows (``matrix[i]``, ``matrix[positions]``) and multiplying
+(``profiles @ matrix``) as they would with an ndarray.
+"""
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from typing import Tuple, Union
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Vectors = Union[np.ndarray, sparse.spmatrix]
+
+
+class TopKSimilarity:
+    """
+    Cosine similarity keeping only each row's K most similar rows
+
+    Entries outside a row's top K read as 0. Rows include themselves, like
+    the dense matrix, so callers that skip the first neighbour still skip self.
+    """
+
+    # Let ndarray @ TopKSimilarity fall through to __rmatmul__
+    __array_ufunc__ = None
+
+    def __init__(self, matrix: sparse.csr_matrix):
+        self.matrix = matrix
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.matrix.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.matrix.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the CSR arrays in bytes"""
+        return self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+
+    def __getitem__(self, rows) -> np.ndarray:
+        dense = self.matrix[rows].toarray()
+        return dense[0] if np.isscalar(rows) else dense
+
+    def __rmatmul__(self, other: np.ndarray) -> np.ndarray:
+        return np.asarray(other @ self.matrix)
+
+
+class FactoredSimilarity:
+    """
+    Cosine similarity V @ V.T of L2-normalized row vectors
+
+    Holds only the vectors (TF-IDF rows or embeddings); requested rows are
+    exact and cost one sparse/dense product each.
+    """
+
+    __array_ufunc__ = None
+
+    def __init__(self, vectors: Vectors):
+        self.vectors = vectors
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.vectors.shape[0], self.vectors.shape[0]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.vectors.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the vectors in bytes"""
+        if sparse.issparse(self.vectors):
+            return self.vectors.data.nbytes + self.vectors.indices.nbytes + self.vectors.indptr.nbytes
+        return self.vectors.nbytes
+
+    def __getitem__(self, rows) -> np.ndarray:
+        scores = self.vectors[rows] @ self.vectors.T
+        dense = scores.toarray() if sparse.issparse(scores) else np.atleast_2d(scores)
+        return dense[0] if np.isscalar(rows) else dense
+
+    def __rmatmul__(self, other: np.ndarray) -> np.ndarray:
+        scores = (other @ self.vectors) @ self.vectors.T
+        return scores.toarray() if sparse.issparse(scores) else np.asarray(scores)
+
+
+def top_k_cosine(
+    vectors: Vectors,
+    k: int,
+    dtype: np.dtype = np.float32,
+    block_bytes: int = 64 * 2 ** 20
+) -> TopKSimilarity:
+    """
+    Row-wise top-K cosine similarity without materializing the N x N matrix
+
+    Rows are scored in blocks so at most ``block_bytes`` of dense scores
+    exist at once.
+
+    Args:
+        vectors: One row per entity (dense or sparse)
+        k: Neighbours kept per row (including the row itself)
+        dtype: Score dtype
+        block_bytes: Dense score buffer per block
+
+    Returns:
+        TopKSimilarity
+    """
+    rows_matrix = normalize(sparse.csr_matrix(vectors, dtype=dtype))
+    n = rows_matrix.shape[0]
+    k = min(k, n)
+    block = max(1, block_bytes // max(1, n * np.dtype(dtype).itemsize))
+    transposed = rows_matrix.T.tocsc()
+
+    rows, cols, values = [], [], []
+    for start in range(0, n, block):
+        scores = (rows_matrix[start:start + block] @ transposed).toarray()
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        keep = top_scores != 0
+        rows.append(np.nonzero(keep)[0] + start)
+        cols.append(top[keep])
+        values.append(top_scores[keep])
+
+    matrix = sparse.csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n, n),
+        dtype=dtype
+    )
+    logger.info(f"Top-{k} similarity: {n} rows, {matrix.nnz} entries")
+    return TopKSimilarity(matrix)
@@ -1,23 +1,131 @@
 """
-Redis cache service for recommendation caching
+Two-tier (in-process LRU + Redis) cache service for recommendation caching
 """
 
 import redis
 import json
 import os
-from typing import List, Dict, Optional, Any
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import List, Dict, Optional, Any, Tuple
 from utils.logger import get_logger
+from utils.metrics import CACHE_LOOKUPS, SERIALIZATION_SECONDS
 
 logger = get_logger(__name__)
 
 
+class LocalCache:
+    """In-process LRU cache with a size bound and per-entry TTL"""
+    
+    def __init__(self, max_size: int = 10000, ttl: int = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get value, evicting it if expired
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Cached value or None
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """
+        Set value, evicting least recently used entries over the size bound
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (capped at self.ttl)
+        """
+        ttl = min(ttl or self.ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+    
+    def delete(self, key: str):
+        """Delete key"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def delete_pattern(self, pattern: str):
+        """Delete all keys matching a glob pattern"""
+        with self._lock:
+            for key in [k for k in self._data if fnmatchcase(k, pattern)]:
+                del self._data[key]
+    
+    def clear(self):
+        """Delete all keys"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 class CacheService:
-    """Redis cache service"""
+    """
+    Two-tier cache service
+    
+    L1 is a bounded in-process LRU so hot keys skip the network round trip,
+    L2 is Redis shared between workers. L1 is cleared whenever the model
+    version changes.
+    
+    Keys are namespaced by a model generation counter and, for per-user
+    entries, a per-user epoch counter. Invalidation is a single INCR and
+    stale entries simply expire via TTL.
+    """
+    
+    GENERATION_KEY = 'recommendations:generation'
+    USER_EPOCH_KEY = 'recommendations:epoch:{user_id}'
+    RELEASE_LOCK_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
     
     def __init__(self):
         self.client = None
         self.ttl = int(os.getenv('CACHE_TTL', '3600'))
         self.enabled = os.getenv('ENABLE_CACHE', 'true').lower() == 'true'
+        self.model_version = None
+        self.generation = 0
+        self._generation_synced_at = 0.0
+        self.generation_sync_interval = int(os.getenv('CACHE_GENERATION_SYNC_INTERVAL', '5'))
+        self.local = None
+        local_size = int(os.getenv('L1_CACHE_SIZE', '10000'))
+        if self.enabled and local_size > 0:
+            self.local = LocalCache(
+                max_size=local_size,
+                ttl=int(os.getenv('L1_CACHE_TTL', '60'))
+            )
+        self.stats = {
+            'l1_hits': 0,
+            'l1_misses': 0,
+            'l2_hits': 0,
+            'l2_misses': 0
+        }
         self.config = {
             'host': os.getenv('REDIS_HOST', 'localhost'),
             'port': int(os.getenv('REDIS_PORT', '6379')),
@@ -37,8 +145,11 @@ class CacheService:
             self.client.ping()
             logger.info("Connected to Redis cache")
         except Exception as e:
-            logger.warning(f"Failed to connect to Redis: {e}. Running without cache.")
+            logger.warning(f"Failed to connect to Redis: {e}. Using local cache only.")
             self.enabled = False
+            return
+        
+        self._sync_generation(force=True)
     
     async def disconnect(self):
         """Close Redis connection"""
@@ -56,19 +167,62 @@ class CacheService:
         Returns:
             Cached value or None
         """
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                self._record('l1', key, True)
+                return value
+            self._record('l1', key, False)
+        
         if not self.enabled or not self.client:
             return None
         
         try:
             value = self.client.get(key)
-            if value:
-                return json.loads(value)
+            if value is None:
+                self._record('l2', key, False)
+                return None
+            
+            self._record('l2', key, True)
+            with SERIALIZATION_SECONDS.labels('cache_decode').time():
+                value = json.loads(value)
+            if self.local is not None:
+                self.local.set(key, value)
+            return value
         except Exception as e:
             logger.error(f"Error getting cache key {key}: {e}")
         
         return None
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+    def _record(self, tier: str, key: str, hit: bool):
+        """
+        Count a lookup in get_stats() and Prometheus
+        
+        Args:
+            tier: 'l1' or 'l2'
+            key: Cache key looked up
+            hit: Whether the lookup hit
+        """
+        self.stats[f"{tier}_{'hits' if hit else 'misses'}"] += 1
+        CACHE_LOOKUPS.labels(tier, self.key_family(key), 'hit' if hit else 'miss').inc()
+    
+    @staticmethod
+    def key_family(key: str) -> str:
+        """
+        Key family used as a metrics label
+        
+        Args:
+            key: Cache key (e.g. recommendations:g3:posts:42:e0, similar:g3:posts:7)
+        
+        Returns:
+            Recommendation type for recommendation keys, otherwise the key prefix
+        """
+        parts = key.split(':')
+        if parts[0] == 'recommendations' and len(parts) > 2:
+            return parts[2]
+        return parts[0]
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """
         Set value in cache
         
@@ -76,15 +230,46 @@ class CacheService:
             key: Cache key
             value: Value to cache
             ttl: Time to live in seconds (default: self.ttl)
+        
+        Returns:
+            True if the value was written to Redis, i.e. every worker can read it back
         """
+        if self.local is not None:
+            self.local.set(key, value, ttl or self.ttl)
+        
         if not self.enabled or not self.client:
-            return
+            return False
         
         try:
-            serialized = json.dumps(value)
+            with SERIALIZATION_SECONDS.labels('cache_encode').time():
+                serialized = json.dumps(value)
             self.client.setex(key, ttl or self.ttl, serialized)
+            return True
         except Exception as e:
             logger.error(f"Error setting cache key {key}: {e}")
+            return False
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """
+        Set many values in Redis with one pipelined round trip
+        
+        Bulk writers (e.g. the precompute job) bypass L1, which only
+        benefits the process serving requests.
+        
+        Args:
+            items: Mapping of cache key to value
+            ttl: Time to live in seconds (default: self.ttl)
+        """
+        if not items or not self.enabled or not self.client:
+            return
+        
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, ttl or self.ttl, json.dumps(value))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error setting {len(items)} cache keys: {e}")
     
     def delete(self, key: str):
         """
@@ -93,6 +278,9 @@ class CacheService:
         Args:
             key: Cache key
         """
+        if self.local is not None:
+            self.local.delete(key)
+        
         if not self.enabled or not self.client:
             return
         
@@ -101,24 +289,194 @@ class CacheService:
         except Exception as e:
             logger.error(f"Error deleting cache key {key}: {e}")
     
-    def delete_pattern(self, pattern: str):
+    def delete_pattern(self, pattern: str, batch_size: int = 500):
         """
         Delete all keys matching pattern
         
+        Walks the keyspace incrementally with SCAN so Redis is never blocked;
+        not used for routine invalidation (see invalidate_all_recommendations).
+        
         Args:
             pattern: Key pattern (e.g., "user:*:recommendations")
+            batch_size: Keys per SCAN/UNLINK batch
         """
+        if self.local is not None:
+            self.local.delete_pattern(pattern)
+        
         if not self.enabled or not self.client:
             return
         
         try:
-            keys = self.client.keys(pattern)
-            if keys:
-                self.client.delete(*keys)
-                logger.info(f"Deleted {len(keys)} keys matching pattern: {pattern}")
+            deleted = 0
+            batch = []
+            for key in self.client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += self.client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += self.client.unlink(*batch)
+            if deleted:
+                logger.info(f"Deleted {deleted} keys matching pattern: {pattern}")
         except Exception as e:
             logger.error(f"Error deleting pattern {pattern}: {e}")
     
+    def acquire_lock(self, name: str, ttl: int) -> Optional[str]:
+        """
+        Try to acquire a cross-process lock
+        
+        Args:
+            name: Lock key
+            ttl: Lock expiry in seconds (guards against crashed holders)
+        
+        Returns:
+            Lock token, or None if held elsewhere (always acquired without Redis)
+        """
+        if not self.enabled or not self.client:
+            return ''
+        
+        token = uuid.uuid4().hex
+        try:
+            if self.client.set(name, token, nx=True, ex=ttl):
+                return token
+            return None
+        except Exception as e:
+            logger.error(f"Error acquiring lock {name}: {e}")
+            return ''
+    
+    def release_lock(self, name: str, token: str):
+        """
+        Release a lock if still owned by token
+        
+        Args:
+            name: Lock key
+            token: Token returned by acquire_lock
+        """
+        if not token or not self.enabled or not self.client:
+            return
+        
+        try:
+            self.client.eval(self.RELEASE_LOCK_SCRIPT, 1, name, token)
+        except Exception as e:
+            logger.error(f"Error releasing lock {name}: {e}")
+    
+    def is_locked(self, name: str) -> bool:
+        """
+        Check whether a lock is currently held
+        
+        Args:
+            name: Lock key
+        
+        Returns:
+            True if held
+        """
+        if not self.enabled or not self.client:
+            return False
+        
+        try:
+            return bool(self.client.exists(name))
+        except Exception as e:
+            logger.error(f"Error checking lock {name}: {e}")
+            return False
+    
+    def bump_generation(self) -> int:
+        """
+        Move all cache keys to a new generation namespace
+        
+        Returns:
+            New generation number
+        """
+        generation = self.generation + 1
+        if self.enabled and self.client:
+            try:
+                generation = int(self.client.incr(self.GENERATION_KEY))
+            except Exception as e:
+                logger.error(f"Error bumping cache generation: {e}")
+        
+        self.generation = generation
+        self._generation_synced_at = time.monotonic()
+        self.set_model_version(generation)
+        return generation
+    
+    def _sync_generation(self, force: bool = False):
+        """
+        Adopt a newer generation bumped by another worker
+        
+        Args:
+            force: Skip the sync interval check
+        """
+        if not self.enabled or not self.client:
+            return
+        
+        now = time.monotonic()
+        if not force and now - self._generation_synced_at < self.generation_sync_interval:
+            return
+        
+        self._generation_synced_at = now
+        try:
+            generation = int(self.client.get(self.GENERATION_KEY) or 0)
+        except Exception as e:
+            logger.error(f"Error syncing cache generation: {e}")
+            return
+        
+        if generation > self.generation:
+            self.generation = generation
+            self.set_model_version(generation)
+    
+    def _get_user_epoch(self, user_id: int) -> int:
+        """
+        Get the invalidation epoch of a user (briefly cached in L1)
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Epoch number (0 if never invalidated)
+        """
+        epoch_key = self.USER_EPOCH_KEY.format(user_id=user_id)
+        if self.local is not None:
+            epoch = self.local.get(epoch_key)
+            if epoch is not None:
+                return epoch
+        
+        epoch = 0
+        if self.enabled and self.client:
+            try:
+                epoch = int(self.client.get(epoch_key) or 0)
+            except Exception as e:
+                logger.error(f"Error getting epoch for user {user_id}: {e}")
+        
+        if self.local is not None:
+            self.local.set(epoch_key, epoch)
+        return epoch
+    
+    def set_model_version(self, version: Any):
+        """
+        Record the model version backing cached values
+        
+        Args:
+            version: Model version; a change clears the L1 cache
+        """
+        if version != self.model_version and self.local is not None:
+            self.local.clear()
+        self.model_version = version
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters per cache tier
+        
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            **self.stats,
+            'l1_size': len(self.local) if self.local is not None else 0,
+            'l1_enabled': self.local is not None,
+            'l2_enabled': bool(self.enabled and self.client),
+            'model_version': self.model_version,
+            'generation': self.generation
+        }
+    
     def get_recommendation_cache_key(self, user_id: int, rec_type: str) -> str:
         """
         Generate cache key for recommendations
@@ -130,7 +488,50 @@ class CacheService:
         Returns:
             Cache key string
         """
-        return f"recommendations:{rec_type}:{user_id}"
+        self._sync_generation()
+        epoch = self._get_user_epoch(user_id)
+        return f"recommendations:g{self.generation}:{rec_type}:{user_id}:e{epoch}"
+    
+    def get_recommendation_cache_keys(self, user_ids: List[int], rec_type: str) -> List[str]:
+        """
+        Generate cache keys for many users, fetching their epochs with one MGET
+        
+        Args:
+            user_ids: User IDs
+            rec_type: Recommendation type ('posts', 'users', etc.)
+        
+        Returns:
+            Cache key strings in user_ids order
+        """
+        self._sync_generation()
+        epochs = [0] * len(user_ids)
+        if user_ids and self.enabled and self.client:
+            try:
+                values = self.client.mget(
+                    [self.USER_EPOCH_KEY.format(user_id=user_id) for user_id in user_ids]
+                )
+                epochs = [int(value or 0) for value in values]
+            except Exception as e:
+                logger.error(f"Error getting epochs for {len(user_ids)} users: {e}")
+        
+        return [
+            f"recommendations:g{self.generation}:{rec_type}:{user_id}:e{epoch}"
+            for user_id, epoch in zip(user_ids, epochs)
+        ]
+    
+    def get_feed_cache_key(self, user_id: int, feed_id: str) -> str:
+        """
+        Generate cache key for a paginated feed
+        
+        Args:
+            user_id: User ID
+            feed_id: Feed ID from the cursor
+        
+        Returns:
+            Cache key string (stale once the generation moves on)
+        """
+        self._sync_generation()
+        return f"feed:g{self.generation}:{user_id}:{feed_id}"
     
     def get_similar_cache_key(self, post_id: int) -> str:
         """
@@ -142,20 +543,45 @@ class CacheService:
         Returns:
             Cache key string
         """
-        return f"similar:posts:{post_id}"
+        self._sync_generation()
+        return f"similar:g{self.generation}:posts:{post_id}"
     
-    def invalidate_user_cache(self, user_id: int):
+    def invalidate_user_cache(self, user_id: int) -> int:
         """
-        Invalidate all cache for a user
+        Invalidate all cache for a user by bumping their epoch
         
         Args:
             user_id: User ID
+        
+        Returns:
+            New epoch number
         """
-        self.delete_pattern(f"recommendations:*:{user_id}")
+        epoch_key = self.USER_EPOCH_KEY.format(user_id=user_id)
+        epoch = self._get_user_epoch(user_id) + 1
+        
+        if self.enabled and self.client:
+            try:
+                pipe = self.client.pipeline()
+                pipe.incr(epoch_key)
+                # Outlive every entry written under the previous epoch
+                pipe.expire(epoch_key, self.ttl * 2)
+                epoch = int(pipe.execute()[0])
+            except Exception as e:
+                logger.error(f"Error bumping epoch for user {user_id}: {e}")
+        
+        if self.local is not None:
+            self.local.set(epoch_key, epoch)
+        
         logger.info(f"Invalidated cache for user {user_id}")
+        return epoch
     
-    def invalidate_all_recommendations(self):
-        """Invalidate all recommendation caches"""
-        self.delete_pattern("recommendations:*")
-        self.delete_pattern("similar:*")
-        logger.info("Invalidated all recommendation caches")
+    def invalidate_all_recommendations(self) -> int:
+        """
+        Invalidate all recommendation caches by bumping the generation
+        
+        Returns:
+            New generation number
+        """
+        generation = self.bump_generation()
+        logger.info(f"Invalidated all recommendation caches (generation {generation})")
+        return generation
@@ -7,6 +7,7 @@ from mysql.connector import Error
 from typing import List, Dict, Optional, Any
 import os
 from utils.logger import get_logger
+from utils.metrics import observe_query
 
 logger = get_logger(__name__)
 
@@ -63,56 +64,7 @@ class DatabaseService:
             logger.error(f"Error executing query: {e}")
             raise
     
-    async def get_user_interactions(self, user_id: int) -> List[Dict[str, Any]]:
-        """
-        Get all user interactions (posts, likes, views, comments)
-        
-        Returns:
-            List of interaction data
-        """
-        query = """
-        SELECT 
-            'post' as type, 
-            id as item_id, 
-            created_at as timestamp,
-            3.0 as weight
-        FROM posts 
-        WHERE author_id = %s
-        
-        UNION ALL
-        
-        SELECT 
-            'like' as type,
-            post_id as item_id,
-            created_at as timestamp,
-            2.0 as weight
-        FROM likes 
-        WHERE user_id = %s
-        
-        UNION ALL
-        
-        SELECT 
-            'view' as type,
-            post_id as item_id,
-            viewed_at as timestamp,
-            1.0 as weight
-        FROM post_views 
-        WHERE user_id = %s
-        
-        UNION ALL
-        
-        SELECT 
-            'comment' as type,
-            post_id as item_id,
-            created_at as timestamp,
-            2.5 as weight
-        FROM comments 
-        WHERE user_id = %s
-        
-        ORDER BY timestamp DESC
-        """
-        return self.execute_query(query, (user_id, user_id, user_id, user_id))
-    
+    @observe_query
     async def get_all_interactions(self) -> List[Dict[str, Any]]:
         """
         Get all user-item interactions for collaborative filtering
@@ -145,6 +97,36 @@ class DatabaseService:
         """
         return self.execute_query(query)
     
+    @observe_query
+    async def get_all_user_activity(self) -> List[Dict[str, Any]]:
+        """
+        Get every interaction row with its type and time (per-user history index)
+        
+        Returns:
+            List of (user_id, type, item_id, timestamp) rows
+        """
+        query = """
+        SELECT author_id as user_id, 'post' as type, id as item_id, created_at as timestamp
+        FROM posts
+        
+        UNION ALL
+        
+        SELECT user_id, 'like' as type, post_id as item_id, created_at as timestamp
+        FROM likes
+        
+        UNION ALL
+        
+        SELECT user_id, 'view' as type, post_id as item_id, viewed_at as timestamp
+        FROM post_views
+        
+        UNION ALL
+        
+        SELECT user_id, 'comment' as type, post_id as item_id, created_at as timestamp
+        FROM comments
+        """
+        return self.execute_query(query)
+    
+    @observe_query
     async def get_post_features(self, post_id: int) -> Optional[Dict[str, Any]]:
         """
         Get post features for content-based filtering
@@ -173,6 +155,7 @@ class DatabaseService:
         results = self.execute_query(query, (post_id,))
         return results[0] if results else None
     
+    @observe_query
     async def get_all_posts_features(self) -> List[Dict[str, Any]]:
         """
         Get features for all posts
@@ -190,7 +173,8 @@ class DatabaseService:
             p.tags,
             COUNT(DISTINCT l.id) as like_count,
             COUNT(DISTINCT c.id) as comment_count,
-            COUNT(DISTINCT pv.id) as view_count
+            COUNT(DISTINCT pv.id) as view_count,
+            p.created_at
         FROM posts p
         LEFT JOIN likes l ON p.id = l.post_id
         LEFT JOIN comments c ON p.id = c.post_id
@@ -201,17 +185,40 @@ class DatabaseService:
         """
         return self.execute_query(query)
     
-    async def get_user_viewed_posts(self, user_id: int) -> List[int]:
+    @observe_query
+    async def get_blocked_user_ids(self, user_id: int) -> List[int]:
         """
-        Get list of posts user has viewed
+        Get users blocked by a user
         
         Returns:
-            List of post IDs
+            List of user IDs
         """
-        query = "SELECT DISTINCT post_id FROM post_views WHERE user_id = %s"
+        query = "SELECT blocked_id FROM blocked_users WHERE blocker_id = %s"
         results = self.execute_query(query, (user_id,))
-        return [row['post_id'] for row in results]
+        return [row['blocked_id'] for row in results]
+    
+    @observe_query
+    async def get_users_blocked_ids(self, user_ids: List[int]) -> Dict[int, List[int]]:
+        """
+        Get the users blocked by many users in one query
+        
+        Args:
+            user_ids: Blocking user IDs
+        
+        Returns:
+            Blocked user IDs per blocking user (users without blocks are omitted)
+        """
+        if not user_ids:
+            return {}
+        
+        placeholders = ','.join(['%s'] * len(user_ids))
+        query = f"SELECT blocker_id, blocked_id FROM blocked_users WHERE blocker_id IN ({placeholders})"
+        blocked: Dict[int, List[int]] = {}
+        for row in self.execute_query(query, tuple(user_ids)):
+            blocked.setdefault(row['blocker_id'], []).append(row['blocked_id'])
+        return blocked
     
+    @observe_query
     async def get_user_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
         """
         Get user profile for user-based recommendations
@@ -0,0 +1,66 @@
+"""
+Shared fixtures: recommenders built on the seeded synthetic dataset and
+cache services backed by an in-memory Redis
+
+Run from the recommendation-service directory:
+    python -m pytest -q
+"""
+
+import asyncio
+import os
+import sys
+from typing import Callable, List
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import FakeRedis  # noqa: E402
+from benchmarks.synthetic_data import SyntheticDatabase  # noqa: E402
+from models.recommender import HybridRecommender  # noqa: E402
+from services.cache_service import CacheService  # noqa: E402
+
+
+@pytest.fixture
+def build_recommender(monkeypatch) -> Callable[..., HybridRecommender]:
+    """
+    Factory for refreshed recommenders without MySQL or Redis
+
+    Keyword arguments are set as environment variables before construction
+    (e.g. MODEL_DTYPE='float64'); compute pools are shut down afterwards.
+    """
+    built: List[HybridRecommender] = []
+
+    def build(num_posts: int = 600, seed: int = 7, **env) -> HybridRecommender:
+        monkeypatch.setenv('ENABLE_CACHE', 'false')
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        recommender = HybridRecommender(SyntheticDatabase(num_posts, seed=seed), CacheService())
+        asyncio.run(recommender.refresh_model())
+        built.append(recommender)
+        return recommender
+
+    yield build
+    for recommender in built:
+        recommender.compute.shutdown()
+        recommender.pipeline.shutdown()
+
+
+@pytest.fixture
+def make_cache(monkeypatch) -> Callable[[], CacheService]:
+    """
+    Factory for per-worker cache services sharing one in-memory Redis
+
+    The generation is re-read from Redis on every key, so a bump by one
+    worker is visible to the others immediately.
+    """
+    monkeypatch.setenv('ENABLE_CACHE', 'true')
+    monkeypatch.setenv('CACHE_GENERATION_SYNC_INTERVAL', '0')
+    client = FakeRedis(decode_responses=True)
+
+    def make() -> CacheService:
+        cache = CacheService()
+        cache.client = client
+        return cache
+
+    return make
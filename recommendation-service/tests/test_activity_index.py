@@ -0,0 +1,116 @@
+"""
+UserActivityIndex and the seen-post exclusion mask
+
+Checks the CSR history slices against the raw activity rows and that ranked
+post lists never contain excluded posts (seen, deleted, blocked authors).
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from models.activity_index import UserActivityIndex
+
+NOW = datetime(2026, 1, 1)
+
+
+def activity_row(user_id: int, item_id: int, interaction_type: str, minutes_ago: int):
+    return {
+        'user_id': user_id,
+        'type': interaction_type,
+        'item_id': item_id,
+        'timestamp': NOW - timedelta(minutes=minutes_ago)
+    }
+
+
+ROWS = [
+    activity_row(1, 30, 'view', 5),
+    activity_row(1, 10, 'like', 1),
+    activity_row(1, 20, 'post', 30),
+    activity_row(2, 20, 'comment', 2),
+    activity_row(2, 40, 'view', 9)
+]
+
+
+def test_history_is_newest_first_over_dense_positions():
+    index = UserActivityIndex.build(ROWS, [np.array([50])])
+
+    assert index.catalog.tolist() == [10, 20, 30, 40, 50]
+    positions, liked = index.history(1)
+    assert index.catalog[positions].tolist() == [10, 30, 20]
+    assert liked.tolist() == [True, False, True]
+    assert index.catalog[index.history(2)[0]].tolist() == [20, 40]
+
+
+def test_unknown_users_and_posts():
+    index = UserActivityIndex.build(ROWS)
+
+    assert len(index.history(99)[0]) == 0
+    assert index.lookup([10, 15, 99]).tolist() == [0, -1, -1]
+    assert len(UserActivityIndex.build([]).history(1)[0]) == 0
+
+
+def test_recorded_interactions_become_the_newest_entry():
+    index = UserActivityIndex.build(ROWS)
+
+    assert index.record(2, 10, 'like')
+    assert not index.record(2, 999, 'view')
+
+    positions, liked = index.history(2)
+    assert index.catalog[positions].tolist() == [10, 20, 40]
+    assert liked.tolist() == [True, False, False]
+    assert index.catalog[index.history(1)[0]].tolist() == [10, 30, 20]
+
+
+def test_mask_sets_positions_and_ignores_missing_posts():
+    index = UserActivityIndex.build(ROWS)
+
+    mask = index.mask(np.array([0, 2]), index.lookup([40, 999]))
+
+    assert mask.tolist() == [True, False, True, True]
+
+
+def test_ranked_posts_skip_every_excluded_post(build_recommender):
+    recommender = build_recommender()
+    interacted = defaultdict(set)
+    liked = defaultdict(set)
+    for user_id, rows in recommender.db.user_rows.items():
+        for row in rows:
+            interacted[user_id].add(row['item_id'])
+            if row['type'] in ('like', 'post'):
+                liked[user_id].add(row['item_id'])
+
+    user_ids = [
+        int(user_id) for user_id in recommender.user_item_matrix.index
+        if not recommender._is_cold_start(int(user_id))
+    ][:30]
+    authors = dict(zip(recommender.post_ids.tolist(), recommender.post_authors.tolist()))
+    deleted = [
+        rec['post_id'] for rec in recommender._rank_posts((user_ids[0], [], True), 3)
+    ]
+    recommender.remove_posts(deleted)
+
+    for user_id in user_ids:
+        blocked = [authors[rec['post_id']] for rec in recommender._rank_posts((user_id, [], True), 2)]
+        ranked = [rec['post_id'] for rec in recommender._rank_posts((user_id, blocked, True), 50)]
+        assert ranked
+        assert not set(ranked) & interacted[user_id]
+        assert not set(ranked) & set(deleted)
+        assert not {authors[post_id] for post_id in ranked} & set(blocked)
+
+        without_views = [rec['post_id'] for rec in recommender._rank_posts((user_id, [], False), 50)]
+        assert not set(without_views) & liked[user_id]
+
+
+def test_recorded_interaction_is_excluded_next_time(build_recommender):
+    recommender = build_recommender()
+    user_id = next(
+        int(user_id) for user_id in recommender.user_item_matrix.index
+        if not recommender._is_cold_start(int(user_id))
+    )
+    top = recommender._rank_posts((user_id, [], True), 10)[0]['post_id']
+
+    assert recommender.record_interaction(user_id, top, 'view')
+
+    assert top not in [rec['post_id'] for rec in recommender._rank_posts((user_id, [], True), 10)]
@@ -0,0 +1,80 @@
+"""
+Cache generation and per-user epoch invalidation
+
+A model refresh bumps the generation and a user change bumps that user's
+epoch; either moves keys to a new namespace instead of deleting entries.
+"""
+
+
+def test_bump_generation_hides_previous_entries(make_cache):
+    cache = make_cache()
+    key = cache.get_recommendation_cache_key(1, 'posts')
+    cache.set(key, [{'post_id': 1, 'score': 1.0}])
+    assert cache.get(key) == [{'post_id': 1, 'score': 1.0}]
+
+    cache.invalidate_all_recommendations()
+
+    assert cache.get_recommendation_cache_key(1, 'posts') != key
+    assert cache.get(cache.get_recommendation_cache_key(1, 'posts')) is None
+
+
+def test_generation_is_shared_across_workers(make_cache):
+    first, second = make_cache(), make_cache()
+    first.set(first.get_similar_cache_key(5), [1])
+    assert second.get(second.get_similar_cache_key(5)) == [1]
+
+    first.bump_generation()
+
+    assert second.get_similar_cache_key(5) == first.get_similar_cache_key(5)
+    assert second.get(second.get_similar_cache_key(5)) is None
+
+
+def test_generation_bump_clears_l1(make_cache):
+    cache = make_cache()
+    cache.local.set('stale', 1)
+
+    cache.bump_generation()
+
+    assert cache.local.get('stale') is None
+
+
+def test_invalidate_user_only_moves_that_user(make_cache):
+    cache = make_cache()
+    mine = cache.get_recommendation_cache_key(1, 'posts')
+    other = cache.get_recommendation_cache_key(2, 'posts')
+    cache.set(mine, [1])
+    cache.set(other, [2])
+
+    assert cache.invalidate_user_cache(1) == 1
+
+    assert cache.get_recommendation_cache_key(1, 'posts').endswith(':e1')
+    assert cache.get(cache.get_recommendation_cache_key(1, 'posts')) is None
+    assert cache.get_recommendation_cache_key(2, 'posts') == other
+    assert cache.get(other) == [2]
+
+
+def test_bulk_keys_match_single_keys(make_cache):
+    cache = make_cache()
+    cache.invalidate_user_cache(2)
+
+    keys = cache.get_recommendation_cache_keys([1, 2, 3], 'posts')
+
+    assert keys == [cache.get_recommendation_cache_key(user_id, 'posts') for user_id in (1, 2, 3)]
+
+
+def test_feed_keys_follow_the_generation(make_cache):
+    cache = make_cache()
+    key = cache.get_feed_cache_key(1, 'abc')
+
+    cache.bump_generation()
+
+    assert cache.get_feed_cache_key(1, 'abc') != key
+
+
+def test_set_reports_whether_redis_was_written(make_cache):
+    cache = make_cache()
+    assert cache.set('key', 1)
+
+    cache.client = None
+    assert not cache.set('key', 1)
+    assert cache.get('key') == 1
@@ -0,0 +1,105 @@
+"""
+float32 vs float64 model rankings
+
+Builds the model twice from the same data (MODEL_DTYPE float64 and float32)
+and checks that post, user and similar-post rankings agree within tolerance.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pytest
+
+TOP_N = 10
+SAMPLE = 100
+MIN_OVERLAP = 0.9
+# Relative score difference allowed on posts ranked by both models
+SCORE_TOLERANCE = 1e-4
+
+
+def ranking_overlap(reference: Sequence[int], candidate: Sequence[int], k: int) -> float:
+    """Share of the reference top-k found in the candidate top-k (1.0 when the reference is empty)"""
+    expected = list(reference)[:k]
+    if not expected:
+        return 1.0
+    return len(set(expected) & set(list(candidate)[:k])) / len(expected)
+
+
+def compare_rankings(
+    reference: List[List[Dict]],
+    candidate: List[List[Dict]],
+    key: str
+) -> Tuple[float, float]:
+    """Mean top-N overlap and the largest relative score difference on shared entries"""
+    overlaps = []
+    max_score_diff = 0.0
+    for ref_recs, cand_recs in zip(reference, candidate):
+        overlaps.append(ranking_overlap(
+            [rec[key] for rec in ref_recs],
+            [rec[key] for rec in cand_recs],
+            TOP_N
+        ))
+        cand_scores = {rec[key]: rec['score'] for rec in cand_recs}
+        for rec in ref_recs:
+            if rec[key] in cand_scores:
+                diff = abs(rec['score'] - cand_scores[rec[key]]) / max(1.0, abs(rec['score']))
+                max_score_diff = max(max_score_diff, diff)
+    return float(np.mean(overlaps)), max_score_diff
+
+
+@pytest.fixture
+def models(build_recommender):
+    """(float64, float32) recommenders built from the same synthetic data"""
+    return build_recommender(MODEL_DTYPE='float64'), build_recommender(MODEL_DTYPE='float32')
+
+
+def test_models_use_configured_dtype(models):
+    reference, candidate = models
+    assert reference.user_similarity_matrix.dtype == np.float64
+    assert candidate.user_similarity_matrix.dtype == np.float32
+
+
+def test_post_rankings_match(models):
+    reference, candidate = models
+    user_ids = [int(user_id) for user_id in reference.user_item_matrix.index[:SAMPLE]]
+
+    overlap, score_diff = compare_rankings(
+        [reference._rank_posts((user_id, [], True), TOP_N) for user_id in user_ids],
+        [candidate._rank_posts((user_id, [], True), TOP_N) for user_id in user_ids],
+        'post_id'
+    )
+
+    assert overlap >= MIN_OVERLAP
+    assert score_diff <= SCORE_TOLERANCE
+
+
+def test_similar_user_rankings_match(models):
+    reference, candidate = models
+    user_ids = [int(user_id) for user_id in reference.user_item_matrix.index[:SAMPLE]]
+
+    overlap, score_diff = compare_rankings(
+        [reference._similar_users(user_id) for user_id in user_ids],
+        [candidate._similar_users(user_id) for user_id in user_ids],
+        'user_id'
+    )
+
+    assert overlap >= MIN_OVERLAP
+    assert score_diff <= SCORE_TOLERANCE
+
+
+def test_similar_post_rankings_match(models):
+    reference, candidate = models
+
+    def similar(recommender, post_id: int) -> List[Dict]:
+        post_ids, scores = recommender.content_index.search_by_id(post_id, TOP_N)
+        return [{'post_id': int(p), 'score': float(s)} for p, s in zip(post_ids, scores)]
+
+    post_ids = [int(post_id) for post_id in reference.post_ids[:SAMPLE]]
+    overlap, score_diff = compare_rankings(
+        [similar(reference, post_id) for post_id in post_ids],
+        [similar(candidate, post_id) for post_id in post_ids],
+        'post_id'
+    )
+
+    assert overlap >= MIN_OVERLAP
+    assert score_diff <= SCORE_TOLERANCE
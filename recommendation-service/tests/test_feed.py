@@ -0,0 +1,113 @@
+"""
+Cursor-paginated feeds
+
+Cursor encoding, page continuity, seen-post skipping, expiry after a model
+refresh and that cursors are only issued for lists stored in Redis.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.fakes import FakeRedis
+from models.feed import FeedExpired, InvalidCursor, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def recommender(build_recommender):
+    """Recommender whose cache writes go to an in-memory Redis (no L1)"""
+    recommender = build_recommender()
+    recommender.cache.enabled = True
+    recommender.cache.client = FakeRedis(decode_responses=True)
+    # The model was refreshed before Redis was attached; carry its generation over
+    recommender.cache.client.set(recommender.cache.GENERATION_KEY, recommender.cache.generation)
+    return recommender
+
+
+@pytest.fixture
+def user_id(recommender) -> int:
+    """Most active user"""
+    return max(recommender.db.user_rows, key=lambda user_id: len(recommender.db.user_rows[user_id]))
+
+
+def page(recommender, user_id: int, cursor=None, limit: int = 10, exclude_seen: bool = False):
+    return asyncio.run(recommender.recommend_feed(user_id, limit, cursor, exclude_seen))
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor('abc123', 40, 7)) == ('abc123', 40, 7)
+
+
+@pytest.mark.parametrize('cursor', ['!!', 'bm90LWEtY3Vyc29y', encode_cursor('abc', -1, 0), encode_cursor('a-b', 1, 0)])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_pages_cover_the_feed_without_duplicates(recommender, user_id):
+    post_ids, cursor, pages = [], None, 0
+    while True:
+        recommendations, cursor = page(recommender, user_id, cursor, limit=50)
+        post_ids += [rec['post_id'] for rec in recommendations]
+        pages += 1
+        if cursor is None:
+            break
+
+    seen = {row['item_id'] for row in recommender.db.user_rows[user_id]}
+    assert pages > 1
+    assert len(post_ids) == len(set(post_ids))
+    assert not set(post_ids) & seen
+
+
+def test_exclude_seen_skips_posts_seen_after_the_build(recommender, user_id):
+    _, cursor = page(recommender, user_id)
+    second, _ = page(recommender, user_id, cursor)
+    seen = second[0]['post_id']
+
+    recommender.record_interaction(user_id, seen, 'view')
+    again, _ = page(recommender, user_id, cursor, exclude_seen=True)
+
+    assert seen not in [rec['post_id'] for rec in again]
+    assert again[0]['post_id'] == second[1]['post_id']
+    assert page(recommender, user_id, cursor)[0] == second
+
+
+def test_model_refresh_expires_open_feeds(recommender, user_id):
+    _, cursor = page(recommender, user_id)
+
+    recommender.cache.invalidate_all_recommendations()
+
+    with pytest.raises(FeedExpired):
+        page(recommender, user_id, cursor)
+
+
+def test_cursor_belongs_to_its_user(recommender, user_id):
+    _, cursor = page(recommender, user_id)
+
+    with pytest.raises(FeedExpired):
+        page(recommender, user_id + 1, cursor)
+
+
+def test_no_cursor_without_redis(recommender, user_id):
+    recommender.cache.client = None
+
+    recommendations, cursor = page(recommender, user_id)
+
+    assert len(recommendations) == 10
+    assert cursor is None
+
+
+def test_endpoint_status_codes(monkeypatch, recommender, user_id):
+    monkeypatch.setattr(main, 'recommender', recommender)
+    client = TestClient(main.app)
+
+    first = client.get('/api/recommend/feed', params={'user_id': user_id, 'limit': 5})
+    assert first.status_code == 200
+    cursor = first.json()['next_cursor']
+    assert client.get('/api/recommend/feed', params={'user_id': user_id, 'cursor': '!!'}).status_code == 400
+
+    recommender.cache.bump_generation()
+
+    assert client.get('/api/recommend/feed', params={'user_id': user_id, 'cursor': cursor}).status_code == 410
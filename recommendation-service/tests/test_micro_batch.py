@@ -0,0 +1,51 @@
+"""
+Micro-batched post scoring
+
+A batch scores every candidate source with one product for all of its users;
+a single miss is a batch of one, so both paths must return identical lists.
+"""
+
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+SAMPLE = 48
+
+
+async def score_concurrently(recommender, user_ids: List[int], exclude_viewed: bool) -> List[List[Dict]]:
+    """Submit every user at once so the misses share micro-batches"""
+    return await asyncio.gather(*(
+        recommender._compute_post_recommendations(user_id, exclude_viewed)
+        for user_id in user_ids
+    ))
+
+
+@pytest.mark.parametrize('cf_algorithm', ['neighbourhood', 'als'])
+@pytest.mark.parametrize('exclude_viewed', [True, False])
+def test_batched_matches_unbatched(build_recommender, exclude_viewed, cf_algorithm):
+    recommender = build_recommender(
+        MICRO_BATCH_ENABLED='true', MICRO_BATCH_MAX_SIZE=16, CF_ALGORITHM=cf_algorithm
+    )
+    batcher = recommender.post_batcher
+    user_ids = [
+        int(user_id) for user_id in recommender.user_item_matrix.index
+        if not recommender._is_cold_start(int(user_id))
+    ][:SAMPLE]
+
+    batched = asyncio.run(score_concurrently(recommender, user_ids, exclude_viewed))
+    assert batcher.stats['requests'] == len(user_ids)
+    assert batcher.stats['batches'] < len(user_ids)
+
+    recommender.post_batcher = None
+    unbatched = [
+        asyncio.run(recommender._compute_post_recommendations(user_id, exclude_viewed))
+        for user_id in user_ids
+    ]
+
+    for batched_recs, unbatched_recs in zip(batched, unbatched):
+        assert batched_recs
+        assert [rec['post_id'] for rec in batched_recs] == [rec['post_id'] for rec in unbatched_recs]
+        assert [rec['score'] for rec in batched_recs] == pytest.approx(
+            [rec['score'] for rec in unbatched_recs]
+        )
@@ -0,0 +1,41 @@
+"""
+Precompute job
+
+Precomputed entries must equal what a cache miss would compute, whether the
+chunks are scored in the main process or in pool workers.
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.fakes import FakeRedis
+from jobs.precompute import PrecomputeJob
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_precomputed_lists_match_the_online_path(build_recommender, workers):
+    recommender = build_recommender(ENABLE_CACHE='true', CACHE_GENERATION_SYNC_INTERVAL=0)
+    cache = recommender.cache
+    cache.client = FakeRedis(decode_responses=True)
+
+    summary = asyncio.run(PrecomputeJob(recommender, workers=workers, chunk_size=64, max_users=150).run())
+    assert summary['users'] == 150
+    assert summary['keys_written'] == 3 * 150
+
+    user_ids = [int(user_id) for user_id in recommender.user_item_matrix.index]
+    warmed = 0
+    for user_id in user_ids:
+        posts = cache.get(cache.get_recommendation_cache_key(user_id, 'posts'))
+        if posts is None:
+            continue
+        warmed += 1
+        cold_start = recommender._is_cold_start(user_id)
+        for rec_type, exclude_viewed in (('posts', True), ('posts_all', False)):
+            expected = recommender._rank_posts(
+                (user_id, [], exclude_viewed), recommender.max_recommendations, cold_start
+            )
+            cached = cache.get(cache.get_recommendation_cache_key(user_id, rec_type))
+            assert [rec['post_id'] for rec in cached] == [rec['post_id'] for rec in expected]
+        assert cache.get(cache.get_recommendation_cache_key(user_id, 'users')) is not None
+    assert warmed == 150
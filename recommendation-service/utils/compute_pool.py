@@ -0,0 +1,159 @@
+"""
+Worker pool for CPU-bound model work
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from utils.metrics import COMPUTE_QUEUE_DEPTH, COMPUTE_REJECTED, COMPUTE_WAIT_SECONDS
+
+
+class ComputePoolSaturated(Exception):
+    """More compute calls are queued than COMPUTE_QUEUE_LIMIT allows"""
+
+
+class ComputePool:
+    """
+    Run scoring and model builds off the event loop
+
+    Shared calls (request scoring) run concurrently on a thread pool; the
+    heavy NumPy/SciPy kernels release the GIL. Exclusive calls (model
+    refreshes, which replace model arrays one by one) wait for running shared
+    calls and hold off new ones, so scoring never sees a half-built snapshot.
+    Calls beyond the queue limit are rejected instead of piling up. With
+    COMPUTE_POOL_WORKERS=0 scoring runs inline on the event loop and model
+    builds on the loop's default executor.
+    """
+
+    def __init__(self, name: str = 'compute'):
+        self.name = name
+        self.workers = int(os.getenv('COMPUTE_POOL_WORKERS', str(min(4, os.cpu_count() or 1))))
+        self.queue_limit = int(os.getenv('COMPUTE_QUEUE_LIMIT', '256'))
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+            if self.workers > 0 else None
+        )
+        self._queued = 0
+        self._shared = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+        self._waiters: List[asyncio.Future] = []
+        self.stats = {
+            'completed': 0,
+            'rejected': 0,
+            'exclusive': 0
+        }
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run a scoring call (concurrently with other shared calls)
+
+        Args:
+            fn: Function reading the model snapshot
+            *args: Positional arguments for fn
+
+        Returns:
+            fn's result
+
+        Raises:
+            ComputePoolSaturated: The queue limit is reached
+        """
+        return await self._submit(fn, args, exclusive=False)
+
+    async def run_exclusive(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run a model build with no scoring calls in flight
+
+        Args:
+            fn: Function replacing model state
+            *args: Positional arguments for fn
+
+        Returns:
+            fn's result
+        """
+        return await self._submit(fn, args, exclusive=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'depth': self._queued
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    async def _submit(self, fn: Callable[..., Any], args: tuple, exclusive: bool) -> Any:
+        mode = 'exclusive' if exclusive else 'shared'
+        if not exclusive and 0 < self.queue_limit <= self._queued:
+            self.stats['rejected'] += 1
+            COMPUTE_REJECTED.labels(self.name).inc()
+            raise ComputePoolSaturated(
+                f"{self.name} pool has {self._queued} calls queued (limit {self.queue_limit})"
+            )
+
+        submitted = time.perf_counter()
+        self._queued += 1
+        COMPUTE_QUEUE_DEPTH.labels(self.name).set(self._queued)
+        try:
+            await self._acquire(exclusive)
+        except BaseException:
+            self._finish()
+            raise
+
+        def call():
+            COMPUTE_WAIT_SECONDS.labels(self.name, mode).observe(time.perf_counter() - submitted)
+            return fn(*args)
+
+        if self._executor is None and not exclusive:
+            try:
+                return call()
+            finally:
+                self._release(exclusive)
+
+        # Without a pool, exclusive calls use the loop's default executor
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+        # A cancelled caller does not stop its thread; keep the slot until the call ends
+        future.add_done_callback(lambda _: self._release(exclusive))
+        return await asyncio.shield(future)
+
+    async def _acquire(self, exclusive: bool):
+        """Wait for a shared slot or for sole use of the model (exclusive calls go first)"""
+        if exclusive:
+            self._exclusive_waiting += 1
+            try:
+                await self._wait_until(lambda: not self._exclusive and self._shared == 0)
+            finally:
+                self._exclusive_waiting -= 1
+            self._exclusive = True
+            self.stats['exclusive'] += 1
+        else:
+            await self._wait_until(lambda: not self._exclusive and not self._exclusive_waiting)
+            self._shared += 1
+
+    def _release(self, exclusive: bool):
+        if exclusive:
+            self._exclusive = False
+        else:
+            self._shared -= 1
+        self.stats['completed'] += 1
+        self._finish()
+
+    def _finish(self):
+        self._queued -= 1
+        COMPUTE_QUEUE_DEPTH.labels(self.name).set(self._queued)
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _wait_until(self, ready: Callable[[], bool]):
+        while not ready():
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
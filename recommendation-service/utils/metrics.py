@@ -0,0 +1,110 @@
+"""
+Prometheus metrics for the recommendation service
+
+Per-stage latency histograms, cache hit/miss counters and model gauges,
+exposed by main.py at /metrics.
+"""
+
+import functools
+from typing import Awaitable, Callable, Tuple
+
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Request path: sub-millisecond cache hits to multi-second cold scoring
+REQUEST_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+# Model build: tens of milliseconds to minutes
+BUILD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'recommendation_http_request_seconds', 'HTTP request latency including response rendering',
+    ['method', 'route', 'status'], buckets=REQUEST_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    'recommendation_db_query_seconds', 'Database query latency per DatabaseService method',
+    ['method'], buckets=REQUEST_BUCKETS + (30.0, 60.0)
+)
+MODEL_BUILD_SECONDS = Histogram(
+    'recommendation_model_build_seconds',
+    'Model build time per stage (pivot, similarity, tfidf, als, embed, ann_index, activity_index)',
+    ['stage'], buckets=BUILD_BUCKETS
+)
+SCORING_SECONDS = Histogram(
+    'recommendation_scoring_seconds', 'Scoring time per recommendation type on cache misses',
+    ['type'], buckets=REQUEST_BUCKETS
+)
+SERIALIZATION_SECONDS = Histogram(
+    'recommendation_serialization_seconds', 'JSON encoding/decoding time (responses and cache values)',
+    ['operation'], buckets=REQUEST_BUCKETS
+)
+PIPELINE_STAGE_SECONDS = Histogram(
+    'recommendation_pipeline_stage_seconds',
+    'Candidate pipeline time per stage (context, filter, candidates, candidates_<source>, rank)',
+    ['stage'], buckets=REQUEST_BUCKETS
+)
+CANDIDATE_COUNT = Histogram(
+    'recommendation_candidate_count', 'Candidates returned per source and request',
+    ['source'], buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+MICRO_BATCH_SIZE = Histogram(
+    'recommendation_micro_batch_size', 'Requests fused into one scoring pass per micro-batcher',
+    ['batcher'], buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+COMPUTE_QUEUE_DEPTH = Gauge(
+    'recommendation_compute_queue_depth', 'Compute pool calls queued or running',
+    ['pool']
+)
+COMPUTE_WAIT_SECONDS = Histogram(
+    'recommendation_compute_wait_seconds', 'Time compute pool calls wait for a worker or the model',
+    ['pool', 'mode'], buckets=REQUEST_BUCKETS
+)
+COMPUTE_REJECTED = Counter(
+    'recommendation_compute_rejected_total', 'Compute pool calls rejected at the queue limit',
+    ['pool']
+)
+CACHE_LOOKUPS = Counter(
+    'recommendation_cache_lookups_total', 'Cache lookups per tier, key family and result',
+    ['tier', 'family', 'result']
+)
+MODEL_SIZE_BYTES = Gauge(
+    'recommendation_model_size_bytes', 'Memory held per model component',
+    ['component']
+)
+MODEL_SNAPSHOT_AGE_SECONDS = Gauge(
+    'recommendation_model_snapshot_age_seconds', 'Seconds since the models were last refreshed'
+)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records its rendering time"""
+
+    def render(self, content) -> bytes:
+        with SERIALIZATION_SECONDS.labels('response').time():
+            return super().render(content)
+
+
+def observe_query(func: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """
+    Record the latency of an async DatabaseService method
+
+    Args:
+        func: Query coroutine function (its name becomes the 'method' label)
+
+    Returns:
+        Wrapped coroutine function
+    """
+    histogram = DB_QUERY_SECONDS.labels(method=func.__name__)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with histogram.time():
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def render() -> Tuple[bytes, str]:
+    """Metrics in the Prometheus text format (body, content type)"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,103 @@
+"""
+Micro-batching of concurrent scoring requests
+"""
+
+import asyncio
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from utils.logger import get_logger
+from utils.metrics import MICRO_BATCH_SIZE
+
+logger = get_logger(__name__)
+
+
+class MicroBatcher:
+    """
+    Fuse concurrent requests into one batch call
+
+    The first request opens a batch; it is flushed when ``max_size`` requests
+    have joined or ``window`` seconds have passed, whichever comes first.
+    ``fn`` receives every input of the batch at once and returns one result
+    per input, which is handed back to the coroutine that submitted it. A
+    failing batch fails all of its requests. With a compute pool, batches run
+    on its workers instead of the event loop.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], List[Any]],
+        window: float = 0.002,
+        max_size: int = 64,
+        name: str = 'batch',
+        pool: Optional[Any] = None
+    ):
+        self.fn = fn
+        self.window = window
+        self.max_size = max(1, max_size)
+        self.name = name
+        self.pool = pool
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self.stats = {
+            'batches': 0,
+            'requests': 0,
+            'largest_batch': 0
+        }
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Add one request to the open batch and wait for its result
+
+        Args:
+            item: Input for fn
+
+        Returns:
+            fn's result for this input
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        """Close the open batch and start scoring it"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        batch = [(item, future) for item, future in batch if not future.cancelled()]
+        if not batch:
+            return
+
+        self.stats['batches'] += 1
+        self.stats['requests'] += len(batch)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+        MICRO_BATCH_SIZE.labels(self.name).observe(len(batch))
+
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Run fn over a batch and resolve its futures"""
+        items = [item for item, _ in batch]
+        try:
+            if self.pool is not None:
+                results = await self.pool.run(self.fn, items)
+            else:
+                results = self.fn(items)
+        except Exception as e:
+            logger.error(f"Micro-batch {self.name} of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,121 @@
+"""
+Single-flight request coalescing for cache misses
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent computations of the same key
+
+    The first caller for a key runs the computation; every caller arriving
+    while it is in flight awaits the same result. With a cache service and
+    SINGLE_FLIGHT_REDIS_LOCK enabled, a Redis lock extends this across worker
+    processes: losers poll the cache until the lock holder has written it.
+    """
+
+    def __init__(self, cache: Optional[Any] = None):
+        self.cache = cache
+        self.distributed = os.getenv('SINGLE_FLIGHT_REDIS_LOCK', 'false').lower() == 'true'
+        self.lock_ttl = int(os.getenv('SINGLE_FLIGHT_LOCK_TTL', '30'))
+        self.wait_timeout = float(os.getenv('SINGLE_FLIGHT_WAIT_TIMEOUT', '10'))
+        self.poll_interval = 0.05
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            'leaders': 0,
+            'coalesced': 0,
+            'remote_waits': 0
+        }
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        lookup: Optional[Callable[[], Any]] = None
+    ) -> Any:
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key: Coalescing key
+            fn: Coroutine function computing the value
+            lookup: Cache lookup used while another process holds the lock
+
+        Returns:
+            Result of fn (shared by all concurrent callers)
+        """
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            self.stats['coalesced'] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Leader was cancelled; retry as a new leader
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.stats['leaders'] += 1
+        try:
+            result = await self._run(key, fn, lookup)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged twice
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _run(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        lookup: Optional[Callable[[], Any]]
+    ) -> Any:
+        """Run fn, holding the cross-process lock when enabled"""
+        if not self.distributed or self.cache is None or lookup is None:
+            return await fn()
+
+        lock_name = f"lock:{key}"
+        token = self.cache.acquire_lock(lock_name, self.lock_ttl)
+        if token is None:
+            self.stats['remote_waits'] += 1
+            result = await self._wait_for_peer(lock_name, lookup)
+            if result is not None:
+                return result
+            logger.warning(f"Timed out waiting for peer computing {key}")
+            return await fn()
+
+        try:
+            return await fn()
+        finally:
+            self.cache.release_lock(lock_name, token)
+
+    async def _wait_for_peer(self, lock_name: str, lookup: Callable[[], Any]) -> Any:
+        """Poll the cache until the lock holder publishes a value"""
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            value = lookup()
+            if value is not None:
+                return value
+            if not self.cache.is_locked(lock_name):
+                return lookup()
+            await asyncio.sleep(self.poll_interval)
+        return None